@@ -3,40 +3,65 @@ Configuration settings for eCFR Scraper
 """
 
 import os
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 
 # Base paths
-PROJECT_ROOT = Path(__file__).parent.parent
-DATA_DIR = PROJECT_ROOT / "data"
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_DATA_DIR = PROJECT_ROOT / "data"
 LOGS_DIR = PROJECT_ROOT / "logs"
-DB_DIR = DATA_DIR
 
 # Database settings
-DB_PATH = DB_DIR / "ecfr.db"
+DB_FILENAME = "ecfr.db"
 DB_SCHEMA_PATH = PROJECT_ROOT / "database_schema.sql"
+WAL_CHECKPOINT_INTERVAL = 1  # titles ingested between WAL checkpoints
+
+# SQLite connection PRAGMAs applied by every ECFRDatabase connection
+SQLITE_JOURNAL_MODE = "WAL"  # readers don't block the scrape writer
+SQLITE_SYNCHRONOUS = "NORMAL"  # fsync at checkpoints rather than every commit
+SQLITE_CACHE_SIZE_KIB = 262144  # page cache, 256 MiB
+SQLITE_MMAP_SIZE = 256 * 1024 * 1024  # bytes of memory-mapped reads
+SQLITE_TEMP_STORE = "MEMORY"
+SQLITE_BUSY_TIMEOUT_MS = 30000
 
 # eCFR data source settings
 GOVINFO_BASE_URL = "https://www.govinfo.gov/bulkdata/ECFR"
-CFR_TITLES = list(range(1, 51))  # CFR Titles 1-50
+CFR_TITLES = tuple(range(1, 51))  # CFR Titles 1-50
+CFR_TITLES_SET = frozenset(CFR_TITLES)
 
 # HTTP settings
 REQUEST_TIMEOUT = 30
 MAX_RETRIES = 3
 RETRY_DELAY = 1  # seconds
+RETRY_BACKOFF_FACTOR = 0.5  # urllib3 retry backoff: 0.5s, 1s, 2s, ...
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
 USER_AGENT = "eCFR-Scraper/1.0 (Educational/Research Purpose)"
 
 # Rate limiting
 REQUESTS_PER_SECOND = 2
 DELAY_BETWEEN_REQUESTS = 0.5  # seconds
+DOWNLOAD_WORKERS = 4  # concurrent title downloads during a scrape
+UPDATE_CHECK_WORKERS = 16  # concurrent HEAD requests in check-updates
+# Processes parsing titles during a scrape. 1 parses on the main process, where
+# memory is bounded by the largest part; each extra worker holds a whole parsed
+# title in memory and sends it back at once, so more than 1 is opt-in
+PARSE_WORKERS = 1
+HTTP_POOL_SIZE = 20  # pooled connections kept per host by the HTTP session
+# Titles at least this large are fetched as parallel byte ranges when the server allows it
+RANGE_DOWNLOAD_MIN_SIZE = 32 * 1024 * 1024
+RANGE_DOWNLOAD_PARTS = 4  # concurrent range requests per title; 1 disables range downloads
 
 # Logging settings
-LOG_LEVEL = "INFO"
+DEFAULT_LOG_LEVEL = "INFO"
 LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 LOG_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+LOG_MAX_BYTES = 100 * 1024 * 1024  # rotate log files at 100MB
+LOG_BACKUP_COUNT = 5
 
 # Processing settings
-BATCH_SIZE = 100
-CHUNK_SIZE = 8192  # bytes for file downloads
+BATCH_SIZE = 5000  # sections buffered per bulk insert during a scrape
+CHUNK_SIZE = 1024 * 1024  # bytes read per iteration when streaming downloads
 
 # Validation settings
 VALIDATE_XML = True
@@ -45,14 +70,28 @@ SKIP_EXISTING = True  # Skip already processed files if hash matches
 # Progress tracking
 SHOW_PROGRESS = True
 PROGRESS_UPDATE_INTERVAL = 10  # sections
+DOWNLOAD_LOG_INTERVAL = 16 * 1024 * 1024  # bytes between download log lines without a terminal
 
-# Environment-specific overrides
-if os.getenv("ECFR_DEBUG"):
-    LOG_LEVEL = "DEBUG"
-    
-if os.getenv("ECFR_DB_PATH"):
-    DB_PATH = Path(os.getenv("ECFR_DB_PATH"))
 
-if os.getenv("ECFR_DATA_DIR"):
-    DATA_DIR = Path(os.getenv("ECFR_DATA_DIR"))
-    DB_DIR = DATA_DIR
\ No newline at end of file
+@dataclass(frozen=True)
+class Settings:
+    """Settings that can be overridden from the environment"""
+    debug: bool
+    log_level: str
+    data_dir: Path
+    db_path: Path
+
+
+@lru_cache(maxsize=None)
+def settings() -> Settings:
+    """Resolve environment overrides once and return the shared settings"""
+    debug = bool(os.getenv("ECFR_DEBUG"))
+    data_dir = Path(os.getenv("ECFR_DATA_DIR") or DEFAULT_DATA_DIR)
+    db_path = os.getenv("ECFR_DB_PATH")
+    
+    return Settings(
+        debug=debug,
+        log_level="DEBUG" if debug else DEFAULT_LOG_LEVEL,
+        data_dir=data_dir,
+        db_path=Path(db_path) if db_path else data_dir / DB_FILENAME,
+    )
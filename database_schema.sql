@@ -1,21 +1,29 @@
 -- Electronic Code of Federal Regulations (eCFR) Database Schema
 -- SQLite database schema for storing complete CFR hierarchy and content
 
+-- Every statement is idempotent so the script can be re-applied to an
+-- existing database; ECFRDatabase tracks the version in PRAGMA user_version
+
 -- Create tables in dependency order
 
 -- Titles table (top level - CFR Title 1-50)
-CREATE TABLE titles (
+CREATE TABLE IF NOT EXISTS titles (
     id INTEGER PRIMARY KEY,
     title_number INTEGER UNIQUE NOT NULL,
     title_name TEXT NOT NULL,
-    last_updated DATE,
+    last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     file_path TEXT,
+    -- Descendant counts, maintained by the title counter triggers below
+    chapters_count INTEGER NOT NULL DEFAULT 0,
+    subchapters_count INTEGER NOT NULL DEFAULT 0,
+    parts_count INTEGER NOT NULL DEFAULT 0,
+    sections_count INTEGER NOT NULL DEFAULT 0,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
 -- Chapters table (Chapter I, II, III, etc.)
-CREATE TABLE chapters (
+CREATE TABLE IF NOT EXISTS chapters (
     id INTEGER PRIMARY KEY,
     title_id INTEGER NOT NULL,
     chapter_number TEXT NOT NULL, -- Roman numerals like 'I', 'II', 'III'
@@ -27,7 +35,7 @@ CREATE TABLE chapters (
 );
 
 -- Subchapters table (Subchapter A, B, C, etc.)
-CREATE TABLE subchapters (
+CREATE TABLE IF NOT EXISTS subchapters (
     id INTEGER PRIMARY KEY,
     chapter_id INTEGER NOT NULL,
     subchapter_letter TEXT NOT NULL, -- 'A', 'B', 'C', etc.
@@ -39,7 +47,7 @@ CREATE TABLE subchapters (
 );
 
 -- Parts table (Part 1, 2, 3, etc.)
-CREATE TABLE parts (
+CREATE TABLE IF NOT EXISTS parts (
     id INTEGER PRIMARY KEY,
     subchapter_id INTEGER,
     chapter_id INTEGER NOT NULL, -- Some parts may not have subchapters
@@ -55,7 +63,7 @@ CREATE TABLE parts (
 );
 
 -- Sections table (§ 1.1, 1.2, etc.)
-CREATE TABLE sections (
+CREATE TABLE IF NOT EXISTS sections (
     id INTEGER PRIMARY KEY,
     part_id INTEGER NOT NULL,
     section_number TEXT NOT NULL, -- e.g., '1.1', '1.2', '100.1'
@@ -72,7 +80,7 @@ CREATE TABLE sections (
 );
 
 -- Subsections/Paragraphs table (for complex nested content)
-CREATE TABLE paragraphs (
+CREATE TABLE IF NOT EXISTS paragraphs (
     id INTEGER PRIMARY KEY,
     section_id INTEGER NOT NULL,
     parent_paragraph_id INTEGER, -- For nested paragraphs
@@ -85,7 +93,7 @@ CREATE TABLE paragraphs (
 );
 
 -- Cross-references table (for citations between sections)
-CREATE TABLE cross_references (
+CREATE TABLE IF NOT EXISTS cross_references (
     id INTEGER PRIMARY KEY,
     source_section_id INTEGER NOT NULL,
     target_section_id INTEGER,
@@ -97,7 +105,7 @@ CREATE TABLE cross_references (
 );
 
 -- Amendments/Changes tracking table
-CREATE TABLE amendments (
+CREATE TABLE IF NOT EXISTS amendments (
     id INTEGER PRIMARY KEY,
     section_id INTEGER NOT NULL,
     amendment_date DATE NOT NULL,
@@ -110,12 +118,14 @@ CREATE TABLE amendments (
 );
 
 -- Scraping metadata table
-CREATE TABLE scraping_metadata (
+CREATE TABLE IF NOT EXISTS scraping_metadata (
     id INTEGER PRIMARY KEY,
     title_number INTEGER NOT NULL,
-    last_scraped TIMESTAMP NOT NULL,
+    last_scraped TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
     file_size INTEGER,
-    file_hash TEXT, -- MD5/SHA256 hash for change detection
+    file_hash TEXT, -- SHA-256 hash for change detection
+    etag TEXT, -- ETag of the downloaded file, for conditional requests
+    file_mtime_ns INTEGER, -- st_mtime_ns of the parsed file, so an unchanged file need not be rehashed
     scraping_status TEXT DEFAULT 'pending', -- 'pending', 'in_progress', 'completed', 'failed'
     error_message TEXT,
     records_processed INTEGER DEFAULT 0,
@@ -124,68 +134,192 @@ CREATE TABLE scraping_metadata (
     UNIQUE(title_number)
 );
 
+-- Row counts per table, maintained by triggers so stats avoid full scans
+CREATE TABLE IF NOT EXISTS table_counts (
+    name TEXT PRIMARY KEY,
+    n INTEGER NOT NULL DEFAULT 0
+);
+
+-- Seeded from existing rows the first time the table is created
+INSERT OR IGNORE INTO table_counts (name, n)
+    SELECT 'titles', COUNT(*) FROM titles
+    UNION ALL SELECT 'chapters', COUNT(*) FROM chapters
+    UNION ALL SELECT 'subchapters', COUNT(*) FROM subchapters
+    UNION ALL SELECT 'parts', COUNT(*) FROM parts
+    UNION ALL SELECT 'sections', COUNT(*) FROM sections
+    UNION ALL SELECT 'paragraphs', COUNT(*) FROM paragraphs;
+
 -- Create indexes for performance
-CREATE INDEX idx_titles_number ON titles(title_number);
-CREATE INDEX idx_chapters_title ON chapters(title_id);
-CREATE INDEX idx_subchapters_chapter ON subchapters(chapter_id);
-CREATE INDEX idx_parts_chapter ON parts(chapter_id);
-CREATE INDEX idx_parts_subchapter ON parts(subchapter_id);
-CREATE INDEX idx_sections_part ON sections(part_id);
-CREATE INDEX idx_sections_number ON sections(section_number);
-CREATE INDEX idx_paragraphs_section ON paragraphs(section_id);
-CREATE INDEX idx_paragraphs_order ON paragraphs(paragraph_order);
-CREATE INDEX idx_crossrefs_source ON cross_references(source_section_id);
-CREATE INDEX idx_amendments_section ON amendments(section_id);
-CREATE INDEX idx_amendments_date ON amendments(amendment_date);
-CREATE INDEX idx_scraping_status ON scraping_metadata(scraping_status);
+-- Lookups by title_number and by a parent id use the UNIQUE constraint
+-- indexes, which lead with those columns; a separate copy only slows writes
+CREATE INDEX IF NOT EXISTS idx_parts_subchapter ON parts(subchapter_id);
+CREATE INDEX IF NOT EXISTS idx_parts_search_covering ON parts(id, chapter_id, part_name); -- search result joins
+CREATE INDEX IF NOT EXISTS idx_sections_number ON sections(section_number);
+CREATE INDEX IF NOT EXISTS idx_paragraphs_section ON paragraphs(section_id);
+CREATE INDEX IF NOT EXISTS idx_paragraphs_order ON paragraphs(paragraph_order);
+CREATE INDEX IF NOT EXISTS idx_crossrefs_source ON cross_references(source_section_id);
+CREATE INDEX IF NOT EXISTS idx_amendments_section ON amendments(section_id);
+CREATE INDEX IF NOT EXISTS idx_amendments_date ON amendments(amendment_date);
+CREATE INDEX IF NOT EXISTS idx_scraping_status ON scraping_metadata(scraping_status);
+CREATE INDEX IF NOT EXISTS idx_scraping_last_scraped ON scraping_metadata(last_scraped DESC);
 
 -- Full-text search virtual table for sections content
-CREATE VIRTUAL TABLE sections_fts USING fts5(
+-- Trigram tokens serve substring and prefix queries straight from the index
+CREATE VIRTUAL TABLE IF NOT EXISTS sections_fts USING fts5(
     section_heading,
     section_content,
     content='sections',
-    content_rowid='id'
+    content_rowid='id',
+    tokenize='trigram',
+    columnsize=0
 );
 
 -- Triggers to keep FTS table in sync
-CREATE TRIGGER sections_fts_insert AFTER INSERT ON sections BEGIN
+CREATE TRIGGER IF NOT EXISTS sections_fts_insert AFTER INSERT ON sections BEGIN
     INSERT INTO sections_fts(rowid, section_heading, section_content) 
     VALUES (new.id, new.section_heading, new.section_content);
 END;
 
-CREATE TRIGGER sections_fts_update AFTER UPDATE ON sections BEGIN
+-- Only indexed columns: the updated_at trigger below must not re-index rows
+CREATE TRIGGER IF NOT EXISTS sections_fts_update AFTER UPDATE OF section_heading, section_content ON sections BEGIN
     INSERT INTO sections_fts(sections_fts, rowid, section_heading, section_content) 
     VALUES('delete', old.id, old.section_heading, old.section_content);
     INSERT INTO sections_fts(rowid, section_heading, section_content) 
     VALUES (new.id, new.section_heading, new.section_content);
 END;
 
-CREATE TRIGGER sections_fts_delete AFTER DELETE ON sections BEGIN
+CREATE TRIGGER IF NOT EXISTS sections_fts_delete AFTER DELETE ON sections BEGIN
     INSERT INTO sections_fts(sections_fts, rowid, section_heading, section_content) 
     VALUES('delete', old.id, old.section_heading, old.section_content);
 END;
 
+-- Row count triggers
+CREATE TRIGGER IF NOT EXISTS titles_count_insert AFTER INSERT ON titles BEGIN
+    UPDATE table_counts SET n = n + 1 WHERE name = 'titles';
+END;
+
+CREATE TRIGGER IF NOT EXISTS titles_count_delete AFTER DELETE ON titles BEGIN
+    UPDATE table_counts SET n = n - 1 WHERE name = 'titles';
+END;
+
+CREATE TRIGGER IF NOT EXISTS chapters_count_insert AFTER INSERT ON chapters BEGIN
+    UPDATE table_counts SET n = n + 1 WHERE name = 'chapters';
+END;
+
+CREATE TRIGGER IF NOT EXISTS chapters_count_delete AFTER DELETE ON chapters BEGIN
+    UPDATE table_counts SET n = n - 1 WHERE name = 'chapters';
+END;
+
+CREATE TRIGGER IF NOT EXISTS subchapters_count_insert AFTER INSERT ON subchapters BEGIN
+    UPDATE table_counts SET n = n + 1 WHERE name = 'subchapters';
+END;
+
+CREATE TRIGGER IF NOT EXISTS subchapters_count_delete AFTER DELETE ON subchapters BEGIN
+    UPDATE table_counts SET n = n - 1 WHERE name = 'subchapters';
+END;
+
+CREATE TRIGGER IF NOT EXISTS parts_count_insert AFTER INSERT ON parts BEGIN
+    UPDATE table_counts SET n = n + 1 WHERE name = 'parts';
+END;
+
+CREATE TRIGGER IF NOT EXISTS parts_count_delete AFTER DELETE ON parts BEGIN
+    UPDATE table_counts SET n = n - 1 WHERE name = 'parts';
+END;
+
+CREATE TRIGGER IF NOT EXISTS sections_count_insert AFTER INSERT ON sections BEGIN
+    UPDATE table_counts SET n = n + 1 WHERE name = 'sections';
+END;
+
+CREATE TRIGGER IF NOT EXISTS sections_count_delete AFTER DELETE ON sections BEGIN
+    UPDATE table_counts SET n = n - 1 WHERE name = 'sections';
+END;
+
+CREATE TRIGGER IF NOT EXISTS paragraphs_count_insert AFTER INSERT ON paragraphs BEGIN
+    UPDATE table_counts SET n = n + 1 WHERE name = 'paragraphs';
+END;
+
+CREATE TRIGGER IF NOT EXISTS paragraphs_count_delete AFTER DELETE ON paragraphs BEGIN
+    UPDATE table_counts SET n = n - 1 WHERE name = 'paragraphs';
+END;
+
+-- Per-title counter triggers
+-- Deletes subtract a row's whole subtree before it goes: cascaded child
+-- deletes run after their parent is gone, so their own triggers match nothing
+CREATE TRIGGER IF NOT EXISTS chapters_title_count_insert AFTER INSERT ON chapters BEGIN
+    UPDATE titles SET chapters_count = chapters_count + 1 WHERE id = NEW.title_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS chapters_title_count_delete BEFORE DELETE ON chapters BEGIN
+    UPDATE titles SET
+        chapters_count = chapters_count - 1,
+        subchapters_count = subchapters_count
+            - (SELECT COUNT(*) FROM subchapters WHERE chapter_id = OLD.id),
+        parts_count = parts_count
+            - (SELECT COUNT(*) FROM parts WHERE chapter_id = OLD.id),
+        sections_count = sections_count
+            - (SELECT COUNT(*) FROM sections s JOIN parts p ON p.id = s.part_id
+               WHERE p.chapter_id = OLD.id)
+    WHERE id = OLD.title_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS subchapters_title_count_insert AFTER INSERT ON subchapters BEGIN
+    UPDATE titles SET subchapters_count = subchapters_count + 1
+    WHERE id = (SELECT title_id FROM chapters WHERE id = NEW.chapter_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS subchapters_title_count_delete BEFORE DELETE ON subchapters BEGIN
+    UPDATE titles SET subchapters_count = subchapters_count - 1
+    WHERE id = (SELECT title_id FROM chapters WHERE id = OLD.chapter_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS parts_title_count_insert AFTER INSERT ON parts BEGIN
+    UPDATE titles SET parts_count = parts_count + 1
+    WHERE id = (SELECT title_id FROM chapters WHERE id = NEW.chapter_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS parts_title_count_delete BEFORE DELETE ON parts BEGIN
+    UPDATE titles SET
+        parts_count = parts_count - 1,
+        sections_count = sections_count
+            - (SELECT COUNT(*) FROM sections WHERE part_id = OLD.id)
+    WHERE id = (SELECT title_id FROM chapters WHERE id = OLD.chapter_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS sections_title_count_insert AFTER INSERT ON sections BEGIN
+    UPDATE titles SET sections_count = sections_count + 1
+    WHERE id = (SELECT c.title_id FROM parts p JOIN chapters c ON c.id = p.chapter_id
+                WHERE p.id = NEW.part_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS sections_title_count_delete BEFORE DELETE ON sections BEGIN
+    UPDATE titles SET sections_count = sections_count - 1
+    WHERE id = (SELECT c.title_id FROM parts p JOIN chapters c ON c.id = p.chapter_id
+                WHERE p.id = OLD.part_id);
+END;
+
 -- Update timestamp triggers
-CREATE TRIGGER update_titles_timestamp AFTER UPDATE ON titles FOR EACH ROW BEGIN
+-- Counter columns are excluded so the counter triggers don't rewrite the row twice
+CREATE TRIGGER IF NOT EXISTS update_titles_timestamp
+AFTER UPDATE OF title_number, title_name, last_updated, file_path ON titles FOR EACH ROW BEGIN
     UPDATE titles SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
 END;
 
-CREATE TRIGGER update_chapters_timestamp AFTER UPDATE ON chapters FOR EACH ROW BEGIN
+CREATE TRIGGER IF NOT EXISTS update_chapters_timestamp AFTER UPDATE ON chapters FOR EACH ROW BEGIN
     UPDATE chapters SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
 END;
 
-CREATE TRIGGER update_subchapters_timestamp AFTER UPDATE ON subchapters FOR EACH ROW BEGIN
+CREATE TRIGGER IF NOT EXISTS update_subchapters_timestamp AFTER UPDATE ON subchapters FOR EACH ROW BEGIN
     UPDATE subchapters SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
 END;
 
-CREATE TRIGGER update_parts_timestamp AFTER UPDATE ON parts FOR EACH ROW BEGIN
+CREATE TRIGGER IF NOT EXISTS update_parts_timestamp AFTER UPDATE ON parts FOR EACH ROW BEGIN
     UPDATE parts SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
 END;
 
-CREATE TRIGGER update_sections_timestamp AFTER UPDATE ON sections FOR EACH ROW BEGIN
+CREATE TRIGGER IF NOT EXISTS update_sections_timestamp AFTER UPDATE ON sections FOR EACH ROW BEGIN
     UPDATE sections SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
 END;
 
-CREATE TRIGGER update_scraping_metadata_timestamp AFTER UPDATE ON scraping_metadata FOR EACH ROW BEGIN
+CREATE TRIGGER IF NOT EXISTS update_scraping_metadata_timestamp AFTER UPDATE ON scraping_metadata FOR EACH ROW BEGIN
     UPDATE scraping_metadata SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
 END;
\ No newline at end of file
@@ -4,11 +4,28 @@ Test runner for eCFR scraper
 Provides different ways to run the test suite
 """
 
+import os
 import sys
 import subprocess
 import argparse
+import importlib.util
+import tempfile
 from pathlib import Path
 
+PROJECT_DIR = Path(__file__).parent
+
+
+def use_tmpfs_for_temp_dirs():
+    """Create test directories on /dev/shm when TMPDIR is not already set
+    
+    Every test builds its SQLite files under tempfile.mkdtemp(); on tmpfs
+    their writes and fsyncs never reach the disk. Set TMPDIR to opt out.
+    """
+    shm = Path('/dev/shm')
+    if 'TMPDIR' not in os.environ and shm.is_dir() and os.access(shm, os.W_OK):
+        os.environ['TMPDIR'] = str(shm)
+        tempfile.tempdir = None  # re-read TMPDIR, also inherited by unittest subprocesses
+
 
 def run_unittest_suite():
     """Run tests using Python's unittest framework"""
@@ -18,24 +35,49 @@ def run_unittest_suite():
     result = subprocess.run([
         sys.executable, '-m', 'unittest', 'discover', 
         '-s', 'tests', '-p', 'test_*.py', '-v'
-    ], cwd=Path(__file__).parent)
+    ], cwd=PROJECT_DIR)
     
     return result.returncode
 
 
-def run_pytest_suite(args=None):
-    """Run tests using pytest"""
+def _xdist_args():
+    """Arguments that shard tests across cores, leaving two cores of headroom
+    
+    Each test class runs whole on one worker, so its setUp state and
+    temporary databases never cross processes.
+    """
+    workers = max(1, (os.cpu_count() or 1) - 2)
+    return ['-n', str(workers), '--dist', 'loadscope']
+
+
+def _run_pytest(args):
+    """Run pytest once in this interpreter"""
+    import pytest
+    
+    return int(pytest.main(args))
+
+
+def run_pytest_suite(args=None, markers=None, parallel=True):
+    """Run tests using pytest
+    
+    When pytest-xdist is installed and parallel is set, tests run sharded
+    across cores.
+    """
     print("Running tests with pytest...")
     
-    cmd = [sys.executable, '-m', 'pytest']
+    os.chdir(PROJECT_DIR)
+    args = list(args) if args else ['-v', 'tests/']
+    markers = list(markers or [])
     
-    if args:
-        cmd.extend(args)
-    else:
-        cmd.extend(['-v', 'tests/'])
+    if parallel and importlib.util.find_spec('xdist') is None:
+        print("pytest-xdist not available, running serially")
+        parallel = False
     
-    result = subprocess.run(cmd, cwd=Path(__file__).parent)
-    return result.returncode
+    if parallel:
+        args.extend(_xdist_args())
+    if markers:
+        args.extend(['-m', ' and '.join(markers)])
+    return _run_pytest(args)
 
 
 def run_specific_test_file(test_file, framework='unittest'):
@@ -43,11 +85,11 @@ def run_specific_test_file(test_file, framework='unittest'):
     print(f"Running {test_file} with {framework}...")
     
     if framework == 'pytest':
-        cmd = [sys.executable, '-m', 'pytest', '-v', f'tests/{test_file}']
-    else:
-        cmd = [sys.executable, '-m', 'unittest', f'tests.{test_file[:-3]}', '-v']
+        os.chdir(PROJECT_DIR)
+        return _run_pytest(['-v', f'tests/{test_file}'])
     
-    result = subprocess.run(cmd, cwd=Path(__file__).parent)
+    cmd = [sys.executable, '-m', 'unittest', f'tests.{test_file[:-3]}', '-v']
+    result = subprocess.run(cmd, cwd=PROJECT_DIR)
     return result.returncode
 
 
@@ -84,11 +126,17 @@ def main():
         action='store_true',
         help='Run with coverage report (pytest only)'
     )
+    parser.add_argument(
+        '--serial', 
+        action='store_true',
+        help='Do not shard tests across cores with pytest-xdist (pytest only)'
+    )
     
     args = parser.parse_args()
+    use_tmpfs_for_temp_dirs()
     
     # Check if pytest is available for pytest-specific options
-    if args.framework == 'pytest' or any([args.unit_only, args.integration_only, args.fast, args.coverage]):
+    if args.framework == 'pytest' or any([args.unit_only, args.integration_only, args.fast, args.coverage, args.serial]):
         try:
             import pytest
         except ImportError:
@@ -106,19 +154,21 @@ def main():
     
     # Run with pytest
     pytest_args = ['-v', 'tests/']
+    markers = []
     
     if args.unit_only:
-        pytest_args.extend(['-m', 'unit'])
+        markers.append('unit')
     elif args.integration_only:
-        pytest_args.extend(['-m', 'integration'])
+        markers.append('integration')
     
     if args.fast:
-        pytest_args.extend(['-m', 'not slow'])
+        markers.append('not slow')
     
     if args.coverage:
+        # pytest-cov collects coverage from xdist workers as well
         pytest_args.extend(['--cov=src', '--cov-report=html', '--cov-report=term-missing'])
     
-    return run_pytest_suite(pytest_args)
+    return run_pytest_suite(pytest_args, markers, parallel=not args.serial)
 
 
 if __name__ == '__main__':
@@ -6,6 +6,7 @@ Automated setup for virtual environment and dependencies
 
 import os
 import sys
+import shutil
 import subprocess
 import platform
 
@@ -13,14 +14,10 @@ def run_command(command, check=True):
     """Run a shell command and return the result."""
     print(f"Running: {command}")
     try:
-        result = subprocess.run(command, shell=True, check=check, capture_output=True, text=True)
-        if result.stdout:
-            print(result.stdout)
-        return result
+        # Output streams straight to the terminal
+        return subprocess.run(command, shell=True, check=check)
     except subprocess.CalledProcessError as e:
         print(f"Error: {e}")
-        if e.stderr:
-            print(f"Error output: {e.stderr}")
         sys.exit(1)
 
 def main():
@@ -54,27 +51,14 @@ def main():
         pip_cmd = f"{venv_path}/bin/pip"
         python_cmd = f"{venv_path}/bin/python"
     
-    # Upgrade pip
-    print("\nUpgrading pip...")
-    run_command(f"{pip_cmd} install --upgrade pip")
-    
-    # Install requirements
+    # Install requirements in a single resolver pass, preferring uv when present
     print("\nInstalling requirements...")
-    run_command(f"{pip_cmd} install -r requirements.txt")
-    
-    # Create directories
-    directories = [
-        "data",
-        "logs",
-        "src",
-        "tests",
-        "config"
-    ]
+    if shutil.which("uv"):
+        run_command(f"uv pip install --python {python_cmd} -r requirements.txt")
+    else:
+        run_command(f"{pip_cmd} install --upgrade pip -r requirements.txt")
     
-    print("\nCreating project directories...")
-    for directory in directories:
-        os.makedirs(directory, exist_ok=True)
-        print(f"Created: {directory}/")
+    # data/ and logs/ are created on first use by the scraper
     
     print("\n" + "=" * 40)
     print("Setup completed successfully!")
@@ -3,30 +3,247 @@ Database operations for eCFR scraper
 Handles SQLite database connections, schema creation, and data operations
 """
 
+import os
 import sqlite3
 import logging
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional, List, Dict, Any, Tuple
+from typing import Optional, Callable, Iterable, Iterator, List, Dict, Any, Tuple
 from datetime import datetime
 import hashlib
+import json
+import mmap
 
-from config.settings import DB_PATH, DB_SCHEMA_PATH
+from config.settings import (
+    DB_SCHEMA_PATH,
+    SQLITE_JOURNAL_MODE, SQLITE_SYNCHRONOUS, SQLITE_CACHE_SIZE_KIB, SQLITE_MMAP_SIZE,
+    SQLITE_TEMP_STORE, SQLITE_BUSY_TIMEOUT_MS, settings,
+)
 
 logger = logging.getLogger(__name__)
 
+# Timestamps default to CURRENT_TIMESTAMP in the schema; store any datetimes
+# passed explicitly as ISO strings without the deprecated default adapter
+sqlite3.register_adapter(datetime, datetime.isoformat)
+
+# Stored in PRAGMA user_version; bump when database_schema.sql changes
+SCHEMA_VERSION = 7
+
+# Steps that bring an older database up to each version. They run before
+# database_schema.sql, which then adds any new tables, indexes and triggers.
+_MIGRATIONS = {
+    2: """
+        ALTER TABLE titles ADD COLUMN chapters_count INTEGER NOT NULL DEFAULT 0;
+        ALTER TABLE titles ADD COLUMN subchapters_count INTEGER NOT NULL DEFAULT 0;
+        ALTER TABLE titles ADD COLUMN parts_count INTEGER NOT NULL DEFAULT 0;
+        ALTER TABLE titles ADD COLUMN sections_count INTEGER NOT NULL DEFAULT 0;
+        DROP TRIGGER IF EXISTS update_titles_timestamp;
+        UPDATE titles SET
+            chapters_count = (SELECT COUNT(*) FROM chapters c WHERE c.title_id = titles.id),
+            subchapters_count = (SELECT COUNT(*) FROM subchapters sc
+                                 JOIN chapters c ON c.id = sc.chapter_id
+                                 WHERE c.title_id = titles.id),
+            parts_count = (SELECT COUNT(*) FROM parts p
+                           JOIN chapters c ON c.id = p.chapter_id
+                           WHERE c.title_id = titles.id),
+            sections_count = (SELECT COUNT(*) FROM sections s
+                              JOIN parts p ON p.id = s.part_id
+                              JOIN chapters c ON c.id = p.chapter_id
+                              WHERE c.title_id = titles.id);
+    """,
+    3: """
+        ALTER TABLE scraping_metadata ADD COLUMN etag TEXT;
+    """,
+    4: "",  # idx_scraping_last_scraped, created by the schema script
+    5: """
+        ALTER TABLE scraping_metadata ADD COLUMN file_mtime_ns INTEGER;
+    """,
+    6: """
+        DROP INDEX IF EXISTS idx_titles_number;
+        DROP INDEX IF EXISTS idx_chapters_title;
+        DROP INDEX IF EXISTS idx_subchapters_chapter;
+        DROP INDEX IF EXISTS idx_parts_chapter;
+        DROP INDEX IF EXISTS idx_sections_part;
+    """,
+    # Recreated as trigram with column-filtered triggers by the schema script
+    7: """
+        DROP TRIGGER IF EXISTS sections_fts_insert;
+        DROP TRIGGER IF EXISTS sections_fts_update;
+        DROP TRIGGER IF EXISTS sections_fts_delete;
+        DROP TABLE IF EXISTS sections_fts;
+    """,
+}
+
+# Steps for each version that run after database_schema.sql
+_POST_SCHEMA_MIGRATIONS = {
+    7: "INSERT INTO sections_fts(sections_fts) VALUES('rebuild');",
+}
+
+# PRAGMA auto_vacuum value for INCREMENTAL
+AUTO_VACUUM_INCREMENTAL = 2
+
+# Pages copied per step of an online backup, between progress reports
+BACKUP_PAGES_PER_STEP = 1000
+
+# Rank FTS hits first so LIMIT applies before joining parent tables.
+# ORDER BY rank (bm25 by default) is sorted inside FTS5; ordering by a
+# bm25() expression would need a separate temp B-tree sort.
+_SEARCH_TEMPLATE = """WITH hits AS (
+                          SELECT rowid, rank AS score
+                          FROM sections_fts
+                          WHERE sections_fts MATCH ?
+                          ORDER BY rank
+                          LIMIT ?
+                      )
+                      SELECT s.id, s.part_id, s.section_number, s.section_heading,
+                             {content}, p.part_name, t.title_name
+                      FROM hits
+                      JOIN sections s ON s.id = hits.rowid
+                      JOIN parts p ON s.part_id = p.id
+                      JOIN chapters c ON p.chapter_id = c.id
+                      JOIN titles t ON c.title_id = t.id
+                      ORDER BY hits.score"""
+_SEARCH_SQL = _SEARCH_TEMPLATE.format(content="s.section_content")
+# Only the first characters of each section leave SQLite when previewing
+_SEARCH_PREVIEW_SQL = _SEARCH_TEMPLATE.format(
+    content="substr(s.section_content, 1, ?) AS section_content_preview, "
+            "length(s.section_content) > ? AS is_truncated"
+)
+
+_STATS_TABLES = ('titles', 'chapters', 'subchapters', 'parts', 'sections', 'paragraphs')
+_STATS_SQL = "SELECT name, n FROM table_counts"
+
+# WAL pages between automatic checkpoints, normally and during bulk ingest
+WAL_AUTOCHECKPOINT = 1000
+BULK_WAL_AUTOCHECKPOINT = 10000
+
+_VIRTUAL_TABLES_SQL = """SELECT name FROM sqlite_master
+                         WHERE type = 'table' AND sql LIKE 'CREATE VIRTUAL TABLE%'"""
+_TABLES_SQL = """SELECT name FROM sqlite_master
+                 WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"""
+
+# Lookups behind the upserts' conflict targets; each must be an index probe
+_INDEX_PROBES = (
+    "SELECT id FROM titles WHERE title_number = ?",
+    "SELECT id FROM chapters WHERE title_id = ? AND chapter_number = ?",
+    "SELECT id FROM subchapters WHERE chapter_id = ? AND subchapter_letter = ?",
+    "SELECT id FROM parts WHERE chapter_id = ? AND part_number = ?",
+    "SELECT id FROM sections WHERE part_id = ? AND section_number = ?",
+    "SELECT * FROM scraping_metadata WHERE title_number = ?",
+    # stats command
+    "SELECT scraping_status, COUNT(*) FROM scraping_metadata GROUP BY scraping_status",
+    "SELECT title_number FROM scraping_metadata ORDER BY last_scraped DESC LIMIT 10",
+)
+
+# Connection settings applied to every new connection
+_PRAGMAS = (
+    f"main.journal_mode={SQLITE_JOURNAL_MODE}",  # leave the temp schema alone
+    f"synchronous={SQLITE_SYNCHRONOUS}",
+    "page_size=4096",  # only takes effect before the first write
+    f"cache_size=-{SQLITE_CACHE_SIZE_KIB}",  # negative: bounded by size, not page count
+    f"mmap_size={SQLITE_MMAP_SIZE}",
+    f"temp_store={SQLITE_TEMP_STORE}",
+    f"busy_timeout={SQLITE_BUSY_TIMEOUT_MS}",
+    f"wal_autocheckpoint={WAL_AUTOCHECKPOINT}",
+    "foreign_keys=ON",
+)
+_PRAGMA_SCRIPT = "".join(f"PRAGMA {pragma};" for pragma in _PRAGMAS)
+
+# Hot-path statements; identical strings let the connection's statement cache hit
+_UPSERT_TITLE_SQL = """INSERT INTO titles (title_number, title_name)
+                 VALUES (?, ?)
+                 ON CONFLICT(title_number) DO UPDATE SET
+                     title_name = excluded.title_name,
+                     last_updated = CURRENT_TIMESTAMP
+                 RETURNING id"""
+
+_UPSERT_CHAPTER_SQL = """INSERT INTO chapters (title_id, chapter_number, chapter_name)
+                 VALUES (?, ?, ?)
+                 ON CONFLICT(title_id, chapter_number) DO UPDATE SET
+                     chapter_name = excluded.chapter_name
+                 RETURNING id"""
+
+_UPSERT_SUBCHAPTER_SQL = """INSERT INTO subchapters (chapter_id, subchapter_letter, subchapter_name)
+                 VALUES (?, ?, ?)
+                 ON CONFLICT(chapter_id, subchapter_letter) DO UPDATE SET
+                     subchapter_name = excluded.subchapter_name
+                 RETURNING id"""
+
+_UPSERT_PART_SQL = """INSERT INTO parts (chapter_id, subchapter_id, part_number, part_name,
+                                   authority_citation, source_citation)
+                 VALUES (?, ?, ?, ?, ?, ?)
+                 ON CONFLICT(chapter_id, part_number) DO UPDATE SET
+                     part_name = excluded.part_name,
+                     authority_citation = excluded.authority_citation,
+                     source_citation = excluded.source_citation
+                 RETURNING id"""
+
+_UPSERT_SECTION_SQL = """INSERT INTO sections (part_id, section_number, section_heading,
+                                     section_content, authority_citation, source_citation, xml_node_id)
+                 VALUES (?, ?, ?, ?, ?, ?, ?)
+                 ON CONFLICT(part_id, section_number) DO UPDATE SET
+                     section_heading = excluded.section_heading,
+                     section_content = excluded.section_content,
+                     authority_citation = excluded.authority_citation,
+                     source_citation = excluded.source_citation,
+                     xml_node_id = excluded.xml_node_id"""
+_UPSERT_SECTION_RETURNING_SQL = _UPSERT_SECTION_SQL + " RETURNING id"
+
+# Bulk section loads go through a temp staging table and one merge statement
+_CREATE_STAGING_SQL = """CREATE TEMP TABLE IF NOT EXISTS _staging_sections (
+                             part_id INTEGER, section_number TEXT, section_heading TEXT,
+                             section_content TEXT, authority_citation TEXT,
+                             source_citation TEXT, xml_node_id TEXT
+                         )"""
+_INSERT_STAGING_SQL = "INSERT INTO temp._staging_sections VALUES (?, ?, ?, ?, ?, ?, ?)"
+_MERGE_STAGING_SQL = """INSERT INTO sections (part_id, section_number, section_heading,
+                                          section_content, authority_citation, source_citation, xml_node_id)
+                        SELECT * FROM temp._staging_sections WHERE true
+                        ON CONFLICT(part_id, section_number) DO UPDATE SET
+                            section_heading = excluded.section_heading,
+                            section_content = excluded.section_content,
+                            authority_citation = excluded.authority_citation,
+                            source_citation = excluded.source_citation,
+                            xml_node_id = excluded.xml_node_id"""
+_FTS_TRIGGERS_SQL = """SELECT name, sql FROM sqlite_master
+                       WHERE type = 'trigger' AND tbl_name = 'sections'
+                         AND name LIKE 'sections_fts_%'"""
+
 
 class DatabaseError(Exception):
     """Custom exception for database operations"""
     pass
 
 
+def _open_connection(db_path: Path) -> sqlite3.Connection:
+    """Open a SQLite connection with the scraper's standard settings"""
+    connection = sqlite3.connect(
+        db_path,
+        timeout=30.0,
+        check_same_thread=False,
+        cached_statements=256,  # room for every hot statement
+        isolation_level=None  # transactions are explicit, see bulk_transaction
+    )
+    connection.executescript(_PRAGMA_SCRIPT)
+    connection.row_factory = sqlite3.Row
+    return connection
+
+
+def _rows_to_dicts(cursor: sqlite3.Cursor) -> List[Dict[str, Any]]:
+    """Build result dicts from a plain-tuple cursor, resolving column names once"""
+    columns = [column[0] for column in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
 class ECFRDatabase:
     """Main database class for eCFR scraper"""
     
     def __init__(self, db_path: Optional[Path] = None):
         """Initialize database connection"""
-        self.db_path = db_path or DB_PATH
+        self.db_path = db_path or settings().db_path
         self.connection: Optional[sqlite3.Connection] = None
+        self._cursor: Optional[sqlite3.Cursor] = None
+        self._savepoint_depth = 0
         self._ensure_data_dir()
     
     def _ensure_data_dir(self):
@@ -36,25 +253,8 @@ class ECFRDatabase:
     def connect(self) -> sqlite3.Connection:
         """Create database connection with optimizations"""
         try:
-            self.connection = sqlite3.connect(
-                self.db_path,
-                timeout=30.0,
-                check_same_thread=False
-            )
-            
-            # Enable WAL mode for better concurrent access
-            self.connection.execute("PRAGMA journal_mode=WAL")
-            
-            # Optimize for performance
-            self.connection.execute("PRAGMA synchronous=NORMAL")
-            self.connection.execute("PRAGMA cache_size=10000")
-            self.connection.execute("PRAGMA temp_store=MEMORY")
-            
-            # Enable foreign keys
-            self.connection.execute("PRAGMA foreign_keys=ON")
-            
-            self.connection.row_factory = sqlite3.Row
-            
+            self.connection = _open_connection(self.db_path)
+            self._cursor = self.connection.cursor()
             logger.info(f"Connected to database: {self.db_path}")
             return self.connection
             
@@ -64,7 +264,16 @@ class ECFRDatabase:
     
     def disconnect(self):
         """Close database connection"""
+        if self._cursor:
+            self._cursor.close()
+            self._cursor = None
+        
         if self.connection:
+            try:
+                # Let SQLite refresh statistics the session showed would help
+                self.connection.execute("PRAGMA optimize")
+            except sqlite3.Error as e:
+                logger.warning(f"PRAGMA optimize failed: {e}")
             self.connection.close()
             self.connection = None
             logger.info("Database connection closed")
@@ -78,18 +287,37 @@ class ECFRDatabase:
         """Context manager exit"""
         self.disconnect()
     
-    def initialize_schema(self) -> bool:
-        """Create database schema from SQL file"""
+    def initialize_schema(self, force: bool = False) -> bool:
+        """Create database schema from SQL file
+        
+        Skipped when the database already carries the current SCHEMA_VERSION.
+        With force, all existing tables are dropped and recreated.
+        """
         try:
+            version = self.connection.execute("PRAGMA user_version").fetchone()[0]
+            if version == SCHEMA_VERSION and not force:
+                logger.info(f"Database schema is up to date (version {version})")
+                return True
+            
             if not DB_SCHEMA_PATH.exists():
                 raise DatabaseError(f"Schema file not found: {DB_SCHEMA_PATH}")
             
-            with open(DB_SCHEMA_PATH, 'r', encoding='utf-8') as f:
-                schema_sql = f.read()
+            schema_sql = DB_SCHEMA_PATH.read_text(encoding='utf-8')
+            migrations, post_migrations = self._migration_scripts(version, force)
             
             # Execute schema in transaction
-            with self.connection:
-                self.connection.executescript(schema_sql)
+            try:
+                self.connection.executescript(
+                    f"BEGIN IMMEDIATE;\n{migrations}\n{schema_sql}\n{post_migrations}\n"
+                    f"PRAGMA user_version={SCHEMA_VERSION};\nCOMMIT;"
+                )
+            except sqlite3.Error:
+                if self.connection.in_transaction:
+                    self.connection.rollback()
+                raise
+            
+            if settings().debug:
+                self._assert_indexes()
             
             logger.info("Database schema initialized successfully")
             return True
@@ -98,30 +326,186 @@ class ECFRDatabase:
             logger.error(f"Schema initialization error: {e}")
             raise DatabaseError(f"Failed to initialize schema: {e}")
     
+    def _migration_scripts(self, version: int, force: bool) -> Tuple[str, str]:
+        """Return the SQL to run before and after the schema script to reach SCHEMA_VERSION
+        
+        version is the database's user_version. With force the existing
+        tables are dropped first; a new or dropped database gets
+        incremental auto-vacuum and needs no migrations.
+        """
+        if force:
+            self._drop_schema()
+            version = 0
+        elif version == 0 and self._has_table('titles'):
+            # Created before the schema was versioned
+            version = 1
+        
+        if version == 0:
+            self._enable_auto_vacuum()
+            return "", ""
+        
+        targets = range(version + 1, SCHEMA_VERSION + 1)
+        logger.info(f"Migrating database schema from version {version} to {SCHEMA_VERSION}")
+        return (
+            "".join(_MIGRATIONS[target] for target in targets),
+            "".join(_POST_SCHEMA_MIGRATIONS.get(target, "") for target in targets),
+        )
+    
+    def _enable_auto_vacuum(self):
+        """Switch an empty database to incremental auto-vacuum
+        
+        auto_vacuum only takes effect before the first table is created or
+        through a VACUUM, which is cheap while the database is empty.
+        """
+        self.connection.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        if self.connection.execute("PRAGMA auto_vacuum").fetchone()[0] != AUTO_VACUUM_INCREMENTAL:
+            self.connection.execute("VACUUM")
+    
+    def is_initialized(self) -> bool:
+        """Check whether the schema has been created, without touching table data"""
+        return self._has_table('titles')
+    
+    def _has_table(self, name: str) -> bool:
+        """Check whether a table exists"""
+        return self.connection.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+        ).fetchone() is not None
+    
+    def _drop_schema(self):
+        """Drop every table, with its indexes and triggers"""
+        connection = self.connection
+        
+        # Foreign keys can only be toggled outside a transaction
+        connection.execute("PRAGMA foreign_keys=OFF")
+        try:
+            with self.bulk_transaction():
+                # Virtual tables first; dropping them removes their shadow tables
+                for (name,) in connection.execute(_VIRTUAL_TABLES_SQL).fetchall():
+                    connection.execute(f'DROP TABLE "{name}"')
+                for (name,) in connection.execute(_TABLES_SQL).fetchall():
+                    connection.execute(f'DROP TABLE "{name}"')
+                connection.execute("PRAGMA user_version=0")
+        finally:
+            connection.execute("PRAGMA foreign_keys=ON")
+        
+        logger.info("Dropped existing database schema")
+    
+    def _assert_indexes(self):
+        """Check with EXPLAIN QUERY PLAN that hot lookups use an index"""
+        for query in _INDEX_PROBES:
+            params = (None,) * query.count("?")
+            plan = self.connection.execute(f"EXPLAIN QUERY PLAN {query}", params).fetchall()
+            details = " ".join(row[-1] for row in plan)
+            if "USING" not in details:
+                raise DatabaseError(f"Query is not index-backed: {query} ({details})")
+            logger.debug(f"Query plan for {query!r}: {details}")
+    
+    @contextmanager
+    def bulk_transaction(self):
+        """Run a block of writes in one IMMEDIATE transaction
+        
+        Nested use opens a savepoint, so an inner block can roll back
+        without aborting the enclosing transaction.
+        """
+        connection = self.connection
+        
+        if connection.in_transaction:
+            self._savepoint_depth += 1
+            savepoint = f"bulk_{self._savepoint_depth}"
+            connection.execute(f"SAVEPOINT {savepoint}")
+            try:
+                yield
+            except BaseException:
+                connection.execute(f"ROLLBACK TO {savepoint}")
+                connection.execute(f"RELEASE {savepoint}")
+                raise
+            else:
+                connection.execute(f"RELEASE {savepoint}")
+            finally:
+                self._savepoint_depth -= 1
+            return
+        
+        # Fewer checkpoints while the WAL grows during ingest
+        connection.execute(f"PRAGMA wal_autocheckpoint={BULK_WAL_AUTOCHECKPOINT}")
+        try:
+            try:
+                connection.execute("BEGIN IMMEDIATE")
+            except sqlite3.Error as e:
+                logger.error(f"Could not start transaction: {e}")
+                raise DatabaseError(f"Failed to begin transaction: {e}")
+            
+            try:
+                yield
+            except BaseException:
+                connection.rollback()
+                raise
+            else:
+                connection.commit()
+        finally:
+            connection.execute(f"PRAGMA wal_autocheckpoint={WAL_AUTOCHECKPOINT}")
+    
+    @contextmanager
+    def fast_ingest(self):
+        """Skip fsync while ingesting, keeping the WAL so failed titles still roll back
+        
+        A crash inside this block can lose the most recent commits but not
+        corrupt the database. The configured synchronous mode is always restored.
+        """
+        connection = self.connection
+        if connection.in_transaction:
+            raise DatabaseError("fast_ingest cannot start inside a transaction")
+        
+        connection.execute("PRAGMA main.synchronous=OFF")
+        try:
+            yield
+        finally:
+            if connection.in_transaction:
+                connection.rollback()
+            connection.execute(f"PRAGMA main.synchronous={SQLITE_SYNCHRONOUS}")
+            self.checkpoint()
+    
+    @contextmanager
+    def full_rebuild(self):
+        """Disable journaling and fsync while recreating the schema from scratch
+        
+        Without a journal SQLite cannot reliably roll back, so only use this
+        on an empty or just-dropped schema where recovery is to rerun the
+        rebuild. Ingest into an existing database should use fast_ingest.
+        Normal settings are always restored.
+        """
+        connection = self.connection
+        if connection.in_transaction:
+            raise DatabaseError("full_rebuild cannot start inside a transaction")
+        
+        connection.executescript(
+            "PRAGMA main.journal_mode=OFF;PRAGMA main.synchronous=OFF;PRAGMA foreign_keys=OFF;"
+        )
+        logger.info("Journaling disabled for full rebuild")
+        try:
+            yield
+        finally:
+            if connection.in_transaction:
+                connection.rollback()
+            connection.executescript(
+                f"PRAGMA main.synchronous={SQLITE_SYNCHRONOUS};"
+                "PRAGMA foreign_keys=ON;"
+                f"PRAGMA main.journal_mode={SQLITE_JOURNAL_MODE};"
+            )
+            self.checkpoint()
+            logger.info("Journaling restored after full rebuild")
+    
     def get_or_create_title(self, title_number: int, title_name: str) -> int:
         """Get existing title or create new one"""
         try:
-            cursor = self.connection.cursor()
-            
-            # Try to get existing title
+            cursor = self._cursor
             cursor.execute(
-                "SELECT id FROM titles WHERE title_number = ?",
-                (title_number,)
+                _UPSERT_TITLE_SQL,
+                (title_number, title_name)
             )
-            row = cursor.fetchone()
             
-            if row:
-                return row['id']
-                
-            # Create new title
-            cursor.execute(
-                """INSERT INTO titles (title_number, title_name, last_updated)
-                   VALUES (?, ?, ?)""",
-                (title_number, title_name, datetime.now())
-            )
-            
-            title_id = cursor.lastrowid
-            logger.debug(f"Created title {title_number}: {title_name}")
+            title_id = cursor.fetchall()[0]['id']
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Stored title {title_number}: {title_name}")
             return title_id
             
         except sqlite3.Error as e:
@@ -131,25 +515,15 @@ class ECFRDatabase:
     def get_or_create_chapter(self, title_id: int, chapter_number: str, chapter_name: str) -> int:
         """Get existing chapter or create new one"""
         try:
-            cursor = self.connection.cursor()
-            
+            cursor = self._cursor
             cursor.execute(
-                "SELECT id FROM chapters WHERE title_id = ? AND chapter_number = ?",
-                (title_id, chapter_number)
-            )
-            row = cursor.fetchone()
-            
-            if row:
-                return row['id']
-            
-            cursor.execute(
-                """INSERT INTO chapters (title_id, chapter_number, chapter_name)
-                   VALUES (?, ?, ?)""",
+                _UPSERT_CHAPTER_SQL,
                 (title_id, chapter_number, chapter_name)
             )
             
-            chapter_id = cursor.lastrowid
-            logger.debug(f"Created chapter {chapter_number}: {chapter_name}")
+            chapter_id = cursor.fetchall()[0]['id']
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Stored chapter {chapter_number}: {chapter_name}")
             return chapter_id
             
         except sqlite3.Error as e:
@@ -159,25 +533,15 @@ class ECFRDatabase:
     def get_or_create_subchapter(self, chapter_id: int, subchapter_letter: str, subchapter_name: str) -> int:
         """Get existing subchapter or create new one"""
         try:
-            cursor = self.connection.cursor()
-            
-            cursor.execute(
-                "SELECT id FROM subchapters WHERE chapter_id = ? AND subchapter_letter = ?",
-                (chapter_id, subchapter_letter)
-            )
-            row = cursor.fetchone()
-            
-            if row:
-                return row['id']
-            
+            cursor = self._cursor
             cursor.execute(
-                """INSERT INTO subchapters (chapter_id, subchapter_letter, subchapter_name)
-                   VALUES (?, ?, ?)""",
+                _UPSERT_SUBCHAPTER_SQL,
                 (chapter_id, subchapter_letter, subchapter_name)
             )
             
-            subchapter_id = cursor.lastrowid
-            logger.debug(f"Created subchapter {subchapter_letter}: {subchapter_name}")
+            subchapter_id = cursor.fetchall()[0]['id']
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Stored subchapter {subchapter_letter}: {subchapter_name}")
             return subchapter_id
             
         except sqlite3.Error as e:
@@ -189,26 +553,15 @@ class ECFRDatabase:
                           authority: Optional[str] = None, source: Optional[str] = None) -> int:
         """Get existing part or create new one"""
         try:
-            cursor = self.connection.cursor()
-            
+            cursor = self._cursor
             cursor.execute(
-                "SELECT id FROM parts WHERE chapter_id = ? AND part_number = ?",
-                (chapter_id, part_number)
-            )
-            row = cursor.fetchone()
-            
-            if row:
-                return row['id']
-            
-            cursor.execute(
-                """INSERT INTO parts (chapter_id, subchapter_id, part_number, part_name, 
-                                     authority_citation, source_citation)
-                   VALUES (?, ?, ?, ?, ?, ?)""",
+                _UPSERT_PART_SQL,
                 (chapter_id, subchapter_id, part_number, part_name, authority, source)
             )
             
-            part_id = cursor.lastrowid
-            logger.debug(f"Created part {part_number}: {part_name}")
+            part_id = cursor.fetchall()[0]['id']
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Stored part {part_number}: {part_name}")
             return part_id
             
         except sqlite3.Error as e:
@@ -220,58 +573,76 @@ class ECFRDatabase:
                       source: Optional[str] = None, xml_node_id: Optional[str] = None) -> int:
         """Insert or update a section"""
         try:
-            cursor = self.connection.cursor()
-            
-            # Check if section exists
+            cursor = self._cursor
             cursor.execute(
-                "SELECT id FROM sections WHERE part_id = ? AND section_number = ?",
-                (part_id, section_number)
+                _UPSERT_SECTION_RETURNING_SQL,
+                (part_id, section_number, section_heading, section_content, authority, source, xml_node_id)
             )
-            row = cursor.fetchone()
-            
-            if row:
-                # Update existing section
-                cursor.execute(
-                    """UPDATE sections 
-                       SET section_heading = ?, section_content = ?, 
-                           authority_citation = ?, source_citation = ?, xml_node_id = ?
-                       WHERE id = ?""",
-                    (section_heading, section_content, authority, source, xml_node_id, row['id'])
-                )
-                section_id = row['id']
-                logger.debug(f"Updated section {section_number}")
-            else:
-                # Insert new section
-                cursor.execute(
-                    """INSERT INTO sections (part_id, section_number, section_heading, 
-                                           section_content, authority_citation, source_citation, xml_node_id)
-                       VALUES (?, ?, ?, ?, ?, ?, ?)""",
-                    (part_id, section_number, section_heading, section_content, authority, source, xml_node_id)
-                )
-                section_id = cursor.lastrowid
-                logger.debug(f"Created section {section_number}")
             
+            section_id = cursor.fetchall()[0]['id']
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Stored section {section_number}")
             return section_id
             
         except sqlite3.Error as e:
             logger.error(f"Error with section {section_number}: {e}")
             raise DatabaseError(f"Section operation failed: {e}")
     
+    def bulk_insert_sections(self, rows: Iterable[Tuple], rebuild_fts: bool = False) -> int:
+        """Insert or update many sections in a single transaction
+        
+        Each row is (part_id, section_number, section_heading, section_content,
+        authority, source, xml_node_id). Rows are staged in a temporary table
+        and merged into sections with one statement. With rebuild_fts the
+        FTS triggers are suspended and the index is rebuilt once at the end,
+        which is cheaper when loading most of the table.
+        """
+        try:
+            connection = self.connection
+            with self.bulk_transaction():
+                connection.execute(_CREATE_STAGING_SQL)
+                staged = connection.executemany(_INSERT_STAGING_SQL, rows).rowcount
+                
+                fts_triggers = []
+                if rebuild_fts:
+                    fts_triggers = connection.execute(_FTS_TRIGGERS_SQL).fetchall()
+                    for name, _ in fts_triggers:
+                        connection.execute(f"DROP TRIGGER {name}")
+                
+                connection.execute(_MERGE_STAGING_SQL)
+                connection.execute("DELETE FROM temp._staging_sections")
+                
+                if rebuild_fts:
+                    connection.execute("INSERT INTO sections_fts(sections_fts) VALUES('rebuild')")
+                    for _, trigger_sql in fts_triggers:
+                        connection.execute(trigger_sql)
+            
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Stored {staged} sections")
+            return staged
+            
+        except sqlite3.Error as e:
+            logger.error(f"Error with bulk section insert: {e}")
+            raise DatabaseError(f"Bulk section operation failed: {e}")
+    
     def update_scraping_metadata(self, title_number: int, status: str, 
                                file_size: Optional[int] = None, 
                                file_hash: Optional[str] = None,
                                error_message: Optional[str] = None,
-                               records_processed: int = 0):
+                               records_processed: int = 0,
+                               etag: Optional[str] = None,
+                               file_mtime_ns: Optional[int] = None):
         """Update scraping metadata for a title"""
         try:
             cursor = self.connection.cursor()
             
             cursor.execute(
                 """INSERT OR REPLACE INTO scraping_metadata 
-                   (title_number, last_scraped, file_size, file_hash, scraping_status, 
-                    error_message, records_processed)
-                   VALUES (?, ?, ?, ?, ?, ?, ?)""",
-                (title_number, datetime.now(), file_size, file_hash, status, error_message, records_processed)
+                   (title_number, file_size, file_hash, scraping_status, 
+                    error_message, records_processed, etag, file_mtime_ns)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                (title_number, file_size, file_hash, status, error_message, records_processed,
+                 etag, file_mtime_ns)
             )
             
             logger.debug(f"Updated metadata for title {title_number}: {status}")
@@ -284,86 +655,186 @@ class ECFRDatabase:
         """Get scraping metadata for a title"""
         try:
             cursor = self.connection.cursor()
+            cursor.row_factory = None
             cursor.execute(
                 "SELECT * FROM scraping_metadata WHERE title_number = ?",
                 (title_number,)
             )
-            row = cursor.fetchone()
-            return dict(row) if row else None
+            rows = _rows_to_dicts(cursor)
+            return rows[0] if rows else None
             
         except sqlite3.Error as e:
             logger.error(f"Error getting metadata for title {title_number}: {e}")
             return None
     
+    def get_all_scraping_metadata(self, title_numbers: Optional[Iterable[int]] = None) -> Dict[int, Dict[str, Any]]:
+        """Get scraping metadata for many titles in one query, keyed by title number"""
+        try:
+            cursor = self.connection.cursor()
+            cursor.row_factory = None
+            if title_numbers is None:
+                cursor.execute("SELECT * FROM scraping_metadata")
+            else:
+                # json_each binds the whole list as one parameter
+                cursor.execute(
+                    "SELECT * FROM scraping_metadata WHERE title_number IN "
+                    "(SELECT value FROM json_each(?))",
+                    (json.dumps(list(title_numbers)),)
+                )
+            return {row['title_number']: row for row in _rows_to_dicts(cursor)}
+            
+        except sqlite3.Error as e:
+            logger.error(f"Error getting scraping metadata: {e}")
+            return {}
+    
     def get_database_stats(self) -> Dict[str, int]:
         """Get database statistics"""
         try:
             cursor = self.connection.cursor()
-            
-            stats = {}
-            tables = ['titles', 'chapters', 'subchapters', 'parts', 'sections', 'paragraphs']
-            
-            for table in tables:
-                cursor.execute(f"SELECT COUNT(*) as count FROM {table}")
-                stats[table] = cursor.fetchone()['count']
-            
-            return stats
+            cursor.row_factory = None
+            cursor.execute(_STATS_SQL)
+            counts = dict(cursor.fetchall())
+            return {table: counts.get(table, 0) for table in _STATS_TABLES}
             
         except sqlite3.Error as e:
             logger.error(f"Error getting database stats: {e}")
             return {}
     
-    def search_sections(self, query: str, limit: int = 100) -> List[Dict[str, Any]]:
+    def search_sections(self, query: str, limit: int = 100,
+                        preview_length: Optional[int] = None) -> List[Dict[str, Any]]:
         """Full-text search in sections"""
+        return list(self.iter_search_sections(query, limit, preview_length))
+    
+    def iter_search_sections(self, query: str, limit: int = 100,
+                             preview_length: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Full-text search in sections, yielding rows as SQLite steps through them
+        
+        Uses its own cursor, so other queries on the connection can run while
+        the results are being consumed. With preview_length, rows carry
+        section_content_preview and is_truncated instead of section_content.
+        """
         try:
             cursor = self.connection.cursor()
-            cursor.execute(
-                """SELECT s.*, p.part_name, t.title_name 
-                   FROM sections_fts sf
-                   JOIN sections s ON sf.rowid = s.id
-                   JOIN parts p ON s.part_id = p.id
-                   JOIN chapters c ON p.chapter_id = c.id
-                   JOIN titles t ON c.title_id = t.id
-                   WHERE sections_fts MATCH ?
-                   ORDER BY rank
-                   LIMIT ?""",
-                (query, limit)
-            )
+            cursor.row_factory = None
+            if preview_length is None:
+                cursor.execute(_SEARCH_SQL, (query, limit))
+            else:
+                cursor.execute(_SEARCH_PREVIEW_SQL, (query, limit, preview_length, preview_length))
+            columns = [column[0] for column in cursor.description]
             
-            return [dict(row) for row in cursor.fetchall()]
+            for row in cursor:
+                yield dict(zip(columns, row))
             
         except sqlite3.Error as e:
             logger.error(f"Search error: {e}")
-            return []
     
-    def vacuum_database(self):
-        """Optimize database"""
+    def checkpoint(self):
+        """Checkpoint the WAL into the database file and truncate it"""
         try:
-            self.connection.execute("VACUUM")
-            logger.info("Database vacuumed successfully")
+            busy, log_pages, checkpointed = self.connection.execute(
+                "PRAGMA main.wal_checkpoint(TRUNCATE)"
+            ).fetchone()
+            if busy:
+                logger.warning("WAL checkpoint could not complete; readers are active")
+            elif logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Checkpointed {checkpointed} of {log_pages} WAL pages")
+        except sqlite3.Error as e:
+            logger.error(f"Checkpoint error: {e}")
+            raise DatabaseError(f"Checkpoint failed: {e}")
+    
+    def vacuum_database(self, full: bool = False, pages: Optional[int] = None):
+        """Optimize database
+        
+        Releases free pages from the end of the file with incremental_vacuum
+        (up to pages, or all of them) without rewriting it. A full VACUUM
+        rewrites and defragments the whole file under an exclusive lock; it
+        also runs for databases created before auto_vacuum was enabled, to
+        convert them.
+        """
+        try:
+            connection = self.connection
+            auto_vacuum = connection.execute("PRAGMA auto_vacuum").fetchone()[0]
+            if full or auto_vacuum != AUTO_VACUUM_INCREMENTAL:
+                connection.execute("PRAGMA auto_vacuum=INCREMENTAL")
+                connection.execute("VACUUM")
+                logger.info("Database vacuumed successfully")
+            else:
+                # executescript steps the pragma to completion; execute() frees one page
+                limit = f"({int(pages)})" if pages else ""
+                connection.executescript(f"PRAGMA incremental_vacuum{limit};")
+                logger.info("Free pages released with incremental vacuum")
+            connection.execute("PRAGMA optimize")
         except sqlite3.Error as e:
             logger.error(f"Vacuum error: {e}")
     
-    def backup_database(self, backup_path: Path):
-        """Create database backup"""
+    def backup_database(self, backup_path: Path,
+                        progress: Optional[Callable[[int, int], None]] = None):
+        """Create database backup
+        
+        By default writes a compacted copy with VACUUM INTO after folding
+        the WAL into the main file. With a progress callback, pages are
+        copied incrementally with the online backup API instead, and
+        progress(copied, total) is called after each step. The copy is
+        written beside backup_path and only replaces an existing backup
+        once it is complete.
+        """
+        backup_path = Path(backup_path).resolve()
+        if backup_path == self.db_path.resolve():
+            raise DatabaseError(f"Backup path is the live database: {backup_path}")
+        if self.connection.in_transaction:
+            raise DatabaseError("Backup cannot run inside a transaction")
+        
+        temp_path = backup_path.with_suffix(backup_path.suffix + '.tmp')
         try:
-            backup_conn = sqlite3.connect(backup_path)
-            self.connection.backup(backup_conn)
-            backup_conn.close()
+            self.checkpoint()
+            # VACUUM INTO refuses to write over an existing database
+            temp_path.unlink(missing_ok=True)
+            if progress is None:
+                self.connection.execute("VACUUM INTO ?", (str(temp_path),))
+            else:
+                self._online_backup(temp_path, progress)
+            os.replace(temp_path, backup_path)
             logger.info(f"Database backed up to: {backup_path}")
-        except sqlite3.Error as e:
+        except (sqlite3.Error, OSError) as e:
             logger.error(f"Backup error: {e}")
             raise DatabaseError(f"Backup failed: {e}")
+        finally:
+            temp_path.unlink(missing_ok=True)
+    
+    def _online_backup(self, backup_path: Path, progress: Callable[[int, int], None]):
+        """Copy the database page by page, BACKUP_PAGES_PER_STEP pages at a time"""
+        backup_conn = sqlite3.connect(backup_path, isolation_level=None)
+        try:
+            # The copy is only trusted once complete, so skip journaling it
+            backup_conn.executescript("PRAGMA journal_mode=OFF;PRAGMA synchronous=OFF;")
+            self.connection.backup(
+                backup_conn,
+                pages=BACKUP_PAGES_PER_STEP,
+                progress=lambda status, remaining, total: progress(total - remaining, total),
+                sleep=0,
+            )
+        finally:
+            backup_conn.close()
+
+
+def new_file_hash():
+    """Hash object used for file hashes, for hashing data while it is written"""
+    return hashlib.sha256()
 
 
 def calculate_file_hash(file_path: Path) -> str:
-    """Calculate MD5 hash of a file"""
-    hash_md5 = hashlib.md5()
+    """Calculate SHA-256 hash of a file"""
+    file_hash = new_file_hash()
     try:
+        # The whole mapping goes to one update() call, which hashes straight
+        # from the page cache; an empty file cannot be mapped
         with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                hash_md5.update(chunk)
-        return hash_md5.hexdigest()
+            if os.fstat(f.fileno()).st_size:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    if hasattr(mmap, "MADV_SEQUENTIAL"):
+                        mapped.madvise(mmap.MADV_SEQUENTIAL)
+                    file_hash.update(mapped)
+        return file_hash.hexdigest()
     except Exception as e:
         logger.error(f"Error calculating hash for {file_path}: {e}")
         return ""
\ No newline at end of file
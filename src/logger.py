@@ -2,70 +2,112 @@
 Logging configuration for eCFR scraper
 """
 
+import atexit
 import logging
 import logging.handlers
+import queue
 from pathlib import Path
+from typing import Optional
 from datetime import datetime
-import colorlog
 
-from config.settings import LOGS_DIR, LOG_LEVEL, LOG_FORMAT, LOG_DATE_FORMAT
+from config.settings import (
+    LOGS_DIR, LOG_FORMAT, LOG_DATE_FORMAT, LOG_MAX_BYTES, LOG_BACKUP_COUNT, settings
+)
 
+# Background thread writing log files; replaced on each setup_logging call
+_queue_listener: Optional[logging.handlers.QueueListener] = None
 
-def setup_logging(log_level: str = LOG_LEVEL, log_to_file: bool = True) -> None:
-    """Configure logging for the application"""
+
+def _stop_queue_listener() -> None:
+    """Flush queued records and stop the file logging thread"""
+    global _queue_listener
+    if _queue_listener is not None:
+        _queue_listener.stop()
+        for handler in _queue_listener.handlers:
+            handler.close()
+        _queue_listener = None
+
+
+atexit.register(_stop_queue_listener)
+
+
+def setup_logging(log_level: Optional[str] = None, log_to_file: bool = True) -> None:
+    """Configure logging for the application
+    
+    log_level defaults to the level resolved from the environment.
+    """
+    global _queue_listener
     
     # Ensure logs directory exists
     LOGS_DIR.mkdir(parents=True, exist_ok=True)
     
+    level = getattr(logging, (log_level or settings().log_level).upper())
+    
     # Root logger configuration
     root_logger = logging.getLogger()
-    root_logger.setLevel(getattr(logging, log_level.upper()))
+    root_logger.setLevel(level)
     
     # Clear existing handlers
     root_logger.handlers.clear()
+    _stop_queue_listener()
     
-    # Console handler with colors
-    console_handler = colorlog.StreamHandler()
-    console_formatter = colorlog.ColoredFormatter(
-        '%(log_color)s%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt=LOG_DATE_FORMAT,
-        log_colors={
-            'DEBUG': 'cyan',
-            'INFO': 'green',
-            'WARNING': 'yellow',
-            'ERROR': 'red',
-            'CRITICAL': 'red,bg_white',
-        }
-    )
+    # Console handler, with colors when colorlog is available
+    try:
+        import colorlog
+        console_handler = colorlog.StreamHandler()
+        console_formatter = colorlog.ColoredFormatter(
+            '%(log_color)s%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+            datefmt=LOG_DATE_FORMAT,
+            log_colors={
+                'DEBUG': 'cyan',
+                'INFO': 'green',
+                'WARNING': 'yellow',
+                'ERROR': 'red',
+                'CRITICAL': 'red,bg_white',
+            }
+        )
+    except ImportError:
+        console_handler = logging.StreamHandler()
+        console_formatter = logging.Formatter(LOG_FORMAT, datefmt=LOG_DATE_FORMAT)
     console_handler.setFormatter(console_formatter)
-    console_handler.setLevel(getattr(logging, log_level.upper()))
+    console_handler.setLevel(level)
     root_logger.addHandler(console_handler)
     
     if log_to_file:
+        date_suffix = datetime.now().strftime('%Y%m%d')
+        
         # File handler for all logs
-        log_file = LOGS_DIR / f"ecfr_scraper_{datetime.now().strftime('%Y%m%d')}.log"
+        log_file = LOGS_DIR / f"ecfr_scraper_{date_suffix}.log"
         file_handler = logging.handlers.RotatingFileHandler(
             log_file,
-            maxBytes=10*1024*1024,  # 10MB
-            backupCount=5,
-            encoding='utf-8'
+            maxBytes=LOG_MAX_BYTES,
+            backupCount=LOG_BACKUP_COUNT,
+            encoding='utf-8',
+            delay=True  # open on first record
         )
         file_formatter = logging.Formatter(LOG_FORMAT, datefmt=LOG_DATE_FORMAT)
         file_handler.setFormatter(file_formatter)
         file_handler.setLevel(logging.DEBUG)  # File gets all levels
-        root_logger.addHandler(file_handler)
         
         # Error file handler
-        error_file = LOGS_DIR / f"ecfr_scraper_errors_{datetime.now().strftime('%Y%m%d')}.log"
+        error_file = LOGS_DIR / f"ecfr_scraper_errors_{date_suffix}.log"
         error_handler = logging.handlers.RotatingFileHandler(
             error_file,
-            maxBytes=10*1024*1024,  # 10MB
-            backupCount=5,
-            encoding='utf-8'
+            maxBytes=LOG_MAX_BYTES,
+            backupCount=LOG_BACKUP_COUNT,
+            encoding='utf-8',
+            delay=True  # open on first record
         )
         error_handler.setFormatter(file_formatter)
         error_handler.setLevel(logging.ERROR)
-        root_logger.addHandler(error_handler)
+        
+        # File I/O happens on a listener thread; loggers only enqueue records
+        log_queue = queue.Queue(-1)
+        root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+        _queue_listener = logging.handlers.QueueListener(
+            log_queue, file_handler, error_handler, respect_handler_level=True
+        )
+        _queue_listener.start()
     
     # Set specific loggers
     logging.getLogger('urllib3').setLevel(logging.WARNING)
@@ -73,11 +115,40 @@ def setup_logging(log_level: str = LOG_LEVEL, log_to_file: bool = True) -> None:
     
     # Log startup message
     logger = logging.getLogger(__name__)
-    logger.info(f"Logging initialized - Level: {log_level.upper()}")
+    logger.info(f"Logging initialized - Level: {logging.getLevelName(level)}")
     if log_to_file:
         logger.info(f"Log files: {LOGS_DIR}")
 
 
 def get_logger(name: str) -> logging.Logger:
     """Get a logger instance with the given name"""
-    return logging.getLogger(name)
\ No newline at end of file
+    return logging.getLogger(name)
+
+
+class _ReplayHandler(logging.Handler):
+    """Hand a record from another process to the logger of the same name here"""
+    
+    def emit(self, record: logging.LogRecord) -> None:
+        logger = logging.getLogger(record.name)
+        if logger.isEnabledFor(record.levelno):
+            logger.handle(record)
+
+
+def start_worker_log_listener(log_queue) -> logging.handlers.QueueListener:
+    """Replay records that worker processes put on log_queue through this process's handlers
+    
+    Workers configured with setup_worker_logging then reach the console and
+    the log files set up by setup_logging. Stop the listener once the workers
+    have exited.
+    """
+    listener = logging.handlers.QueueListener(log_queue, _ReplayHandler())
+    listener.start()
+    return listener
+
+
+def setup_worker_logging(log_queue, log_level: int) -> None:
+    """Send a worker process's log records to the parent over log_queue"""
+    root_logger = logging.getLogger()
+    root_logger.handlers.clear()
+    root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    root_logger.setLevel(log_level)
@@ -4,18 +4,93 @@ Main entry point for the Electronic Code of Federal Regulations scraper
 """
 
 import click
+import functools
+import logging
 import sys
 from pathlib import Path
 from typing import List, Optional
 import json
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from src.logger import setup_logging, get_logger
 from src.database import ECFRDatabase, DatabaseError
 from src.scraper import ECFRScraper, ScrapingError
-from config.settings import CFR_TITLES, DB_PATH
+from config.settings import (
+    BATCH_SIZE, CFR_TITLES, CFR_TITLES_SET, DOWNLOAD_WORKERS, PARSE_WORKERS,
+    SQLITE_JOURNAL_MODE, SQLITE_SYNCHRONOUS, settings,
+)
 
 logger = get_logger(__name__)
 
+# Characters of section content shown per text search result
+SEARCH_PREVIEW_LENGTH = 200
+
+
+class CFRTitleList(click.ParamType):
+    """Comma-separated list of CFR title numbers"""
+    name = 'titles'
+    
+    def convert(self, value, param, ctx):
+        if isinstance(value, list):
+            return value
+        
+        try:
+            title_numbers = [int(x.strip()) for x in value.split(',')]
+        except ValueError:
+            self.fail(f"Invalid CFR titles: {value!r} is not a comma-separated list of numbers", param, ctx)
+        
+        invalid_titles = [t for t in title_numbers if t not in CFR_TITLES_SET]
+        if invalid_titles:
+            self.fail(f"Invalid CFR titles: {invalid_titles}", param, ctx)
+        return title_numbers
+
+
+def _require_initialized(db: ECFRDatabase):
+    """Exit with an error if the database schema has not been created"""
+    if not db.is_initialized():
+        logger.error("Database not initialized. Run 'init-db' first.")
+        sys.exit(1)
+
+
+def _json_bytes(obj) -> bytes:
+    """Indented JSON as UTF-8, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2, default=str)
+    return json.dumps(obj, indent=2, default=str).encode('utf-8')
+
+
+def get_db(ctx: click.Context, require_schema: bool = True) -> ECFRDatabase:
+    """Database shared by the whole CLI invocation, opened on first use"""
+    root = ctx.find_root()
+    db = root.obj.get('db')
+    if db is None:
+        db = ECFRDatabase()
+        db.connect()
+        root.call_on_close(db.disconnect)
+        root.obj['db'] = db
+    
+    if require_schema:
+        _require_initialized(db)
+    return db
+
+
+def handle_errors(message: str):
+    """Log scraping and database errors raised by a command and exit with status 1"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            try:
+                return fn(*args, **kwargs)
+            except (ScrapingError, DatabaseError) as e:
+                logger.error("%s: %s", message, e)
+                sys.exit(1)
+        return wrapper
+    return decorator
+
 
 @click.group()
 @click.option('--debug', is_flag=True, help='Enable debug logging')
@@ -35,194 +110,173 @@ def cli(ctx, debug, log_file):
 
 @cli.command()
 @click.option('--force', is_flag=True, help='Force re-creation of database schema')
-def init_db(force):
+@click.pass_context
+@handle_errors("Database initialization failed")
+def init_db(ctx, force):
     """Initialize the database schema"""
-    try:
-        logger.info("Initializing database...")
-        
-        if DB_PATH.exists() and not force:
-            if not click.confirm(f"Database already exists at {DB_PATH}. Overwrite?"):
-                logger.info("Database initialization cancelled")
-                return
-        
-        with ECFRDatabase() as db:
-            db.initialize_schema()
-        
-        logger.info(f"Database initialized successfully at {DB_PATH}")
-        
-    except DatabaseError as e:
-        logger.error(f"Database initialization failed: {e}")
-        sys.exit(1)
+    logger.info("Initializing database...")
+    
+    db_path = settings().db_path
+    exists = db_path.exists()
+    if exists and not force:
+        if not click.confirm(f"Database already exists at {db_path}. Overwrite?"):
+            logger.info("Database initialization cancelled")
+            return
+    
+    db = get_db(ctx, require_schema=False)
+    if exists:
+        with db.full_rebuild():
+            db.initialize_schema(force=True)
+    else:
+        db.initialize_schema()
+    
+    click.echo(f"Database initialized successfully at {db_path}")
+    click.echo(
+        f"SQLite: journal_mode={SQLITE_JOURNAL_MODE}, synchronous={SQLITE_SYNCHRONOUS} "
+        "(configured in config/settings.py)"
+    )
 
 
 @cli.command()
-@click.option('--titles', help='Comma-separated list of CFR titles to scrape (1-50)')
+@click.option('--titles', type=CFRTitleList(), help='Comma-separated list of CFR titles to scrape (1-50)')
 @click.option('--force', is_flag=True, help='Force re-download and re-processing of files')
 @click.option('--incremental', is_flag=True, help='Only process titles that have been updated')
-def scrape(titles, force, incremental):
+@click.option('--workers', type=click.IntRange(min=1), default=DOWNLOAD_WORKERS, show_default=True,
+              help='Number of concurrent title downloads')
+@click.option('--parse-workers', type=click.IntRange(min=1), default=PARSE_WORKERS, show_default=True,
+              help='Processes parsing titles. 1 parses on the main process; with more, '
+                   'each worker holds a whole parsed title in memory')
+@click.option('--batch-size', type=click.IntRange(min=1), default=BATCH_SIZE, show_default=True,
+              help='Sections written per bulk insert')
+@click.pass_context
+@handle_errors("Scraping failed")
+def scrape(ctx, titles, force, incremental, workers, parse_workers, batch_size):
     """Scrape eCFR data and store in database"""
+    title_numbers = titles
+    db = get_db(ctx)
+    scraper = ECFRScraper(db, batch_size=batch_size)
+    
     try:
-        # Parse title numbers
-        title_numbers = None
-        if titles:
-            try:
-                title_numbers = [int(x.strip()) for x in titles.split(',')]
-                # Validate title numbers
-                invalid_titles = [t for t in title_numbers if t not in CFR_TITLES]
-                if invalid_titles:
-                    raise ValueError(f"Invalid CFR titles: {invalid_titles}")
-            except ValueError as e:
-                logger.error(f"Invalid titles parameter: {e}")
-                sys.exit(1)
+        if incremental:
+            logger.info("Starting incremental update...")
+            results = scraper.incremental_update()
+        elif title_numbers is None:
+            logger.info("Starting full scrape...")
+            with db.fast_ingest():
+                results = scraper.scrape_all_titles(title_numbers, force, workers, parse_workers)
+        else:
+            logger.info("Starting scrape...")
+            results = scraper.scrape_all_titles(title_numbers, force, workers, parse_workers)
         
-        # Initialize database connection
-        with ECFRDatabase() as db:
-            # Check if database is initialized
-            try:
-                stats = db.get_database_stats()
-            except DatabaseError:
-                logger.error("Database not initialized. Run 'init-db' first.")
-                sys.exit(1)
+        # Print results
+        if results:
+            total_records = sum(results.values())
+            successful_titles = sum(1 for count in results.values() if count > 0)
+            failed_titles = [t for t, count in results.items() if count == 0]
             
-            # Initialize scraper
-            scraper = ECFRScraper(db)
+            click.echo(f"\nScraping Results:")
+            click.echo(f"  Successful titles: {successful_titles}/{len(results)}")
+            click.echo(f"  Total records processed: {total_records}")
             
-            try:
-                if incremental:
-                    logger.info("Starting incremental update...")
-                    results = scraper.incremental_update()
-                else:
-                    logger.info("Starting full scrape...")
-                    results = scraper.scrape_all_titles(title_numbers, force)
-                
-                # Print results
-                if results:
-                    total_records = sum(results.values())
-                    successful_titles = sum(1 for count in results.values() if count > 0)
-                    failed_titles = [t for t, count in results.items() if count == 0]
-                    
-                    click.echo(f"\nScraping Results:")
-                    click.echo(f"  Successful titles: {successful_titles}/{len(results)}")
-                    click.echo(f"  Total records processed: {total_records}")
-                    
-                    if failed_titles:
-                        click.echo(f"  Failed titles: {failed_titles}")
-                    
-                    # Show detailed results if debug mode
-                    if logger.isEnabledFor(10):  # DEBUG level
-                        click.echo(f"\nDetailed Results:")
-                        for title_num, record_count in sorted(results.items()):
-                            status = "✓" if record_count > 0 else "✗"
-                            click.echo(f"  Title {title_num:2d}: {status} {record_count:6d} records")
-                else:
-                    click.echo("No titles were processed.")
-                    
-            finally:
-                scraper.close()
-        
-        logger.info("Scraping completed successfully")
+            if failed_titles:
+                click.echo(f"  Failed titles: {failed_titles}")
+            
+            # Show detailed results if debug mode
+            if logger.isEnabledFor(logging.DEBUG):
+                click.echo(f"\nDetailed Results:")
+                for title_num, record_count in sorted(results.items()):
+                    status = "✓" if record_count > 0 else "✗"
+                    click.echo(f"  Title {title_num:2d}: {status} {record_count:6d} records")
+        else:
+            click.echo("No titles were processed.")
         
-    except (ScrapingError, DatabaseError) as e:
-        logger.error(f"Scraping failed: {e}")
-        sys.exit(1)
     except KeyboardInterrupt:
         logger.info("Scraping interrupted by user")
         sys.exit(1)
+    finally:
+        scraper.close()
+    
+    logger.info("Scraping completed successfully")
 
 
 @cli.command()
-@click.option('--titles', help='Comma-separated list of CFR titles to check (1-50)')
-def check_updates(titles):
+@click.option('--titles', type=CFRTitleList(), help='Comma-separated list of CFR titles to check (1-50)')
+@click.pass_context
+@handle_errors("Update check failed")
+def check_updates(ctx, titles):
     """Check which titles have been updated since last scrape"""
+    title_numbers = titles or CFR_TITLES
+    scraper = ECFRScraper(get_db(ctx))
+    
     try:
-        # Parse title numbers
-        title_numbers = CFR_TITLES
-        if titles:
-            try:
-                title_numbers = [int(x.strip()) for x in titles.split(',')]
-                invalid_titles = [t for t in title_numbers if t not in CFR_TITLES]
-                if invalid_titles:
-                    raise ValueError(f"Invalid CFR titles: {invalid_titles}")
-            except ValueError as e:
-                logger.error(f"Invalid titles parameter: {e}")
-                sys.exit(1)
+        updated_titles = []
+        click.echo("Checking for updates...")
         
-        with ECFRDatabase() as db:
-            scraper = ECFRScraper(db)
+        updates = scraper.check_titles_for_updates(title_numbers)
+        for title_number, updated in updates.items():
+            if updated:
+                updated_titles.append(title_number)
+                click.echo(f"Title {title_number}: Updated")
+            else:
+                click.echo(f"Title {title_number}: Current")
+        
+        if updated_titles:
+            click.echo(f"\nTitles needing update: {updated_titles}")
+        else:
+            click.echo("\nAll titles are up to date.")
             
-            try:
-                updated_titles = []
-                click.echo("Checking for updates...")
-                
-                for title_number in title_numbers:
-                    if scraper.check_for_updates(title_number):
-                        updated_titles.append(title_number)
-                        click.echo(f"Title {title_number}: Updated")
-                    else:
-                        click.echo(f"Title {title_number}: Current")
-                
-                if updated_titles:
-                    click.echo(f"\nTitles needing update: {updated_titles}")
-                else:
-                    click.echo("\nAll titles are up to date.")
-                    
-            finally:
-                scraper.close()
-                
-    except (ScrapingError, DatabaseError) as e:
-        logger.error(f"Update check failed: {e}")
-        sys.exit(1)
+    finally:
+        scraper.close()
 
 
 @cli.command()
-def stats():
+@click.pass_context
+@handle_errors("Stats retrieval failed")
+def stats(ctx):
     """Show database statistics"""
-    try:
-        with ECFRDatabase() as db:
-            stats = db.get_database_stats()
-            
-            if not stats:
-                click.echo("Database appears to be empty or not initialized.")
-                return
-            
-            click.echo("Database Statistics:")
-            click.echo("=" * 20)
-            for table, count in stats.items():
-                click.echo(f"  {table.capitalize():12}: {count:,}")
-            
-            # Show scraping metadata
-            click.echo("\nScraping Status:")
-            click.echo("=" * 16)
-            
-            cursor = db.connection.cursor()
-            cursor.execute("""
-                SELECT scraping_status, COUNT(*) as count 
-                FROM scraping_metadata 
-                GROUP BY scraping_status
-            """)
-            
-            for row in cursor.fetchall():
-                click.echo(f"  {row['scraping_status'].capitalize():12}: {row['count']}")
-            
-            # Show recent scraping activity
-            cursor.execute("""
-                SELECT title_number, last_scraped, scraping_status, records_processed
-                FROM scraping_metadata 
-                ORDER BY last_scraped DESC 
-                LIMIT 10
-            """)
-            
-            recent_scrapes = cursor.fetchall()
-            if recent_scrapes:
-                click.echo("\nRecent Scraping Activity:")
-                click.echo("=" * 25)
-                for row in recent_scrapes:
-                    click.echo(f"  Title {row['title_number']:2d}: {row['last_scraped']} "
-                              f"({row['scraping_status']}) - {row['records_processed']} records")
-                              
-    except DatabaseError as e:
-        logger.error(f"Stats retrieval failed: {e}")
-        sys.exit(1)
+    db = get_db(ctx)
+    stats = db.get_database_stats()
+    
+    if not stats:
+        click.echo("Database appears to be empty or not initialized.")
+        return
+    
+    # Output is collected and written once rather than flushed per line
+    out = ["Database Statistics:", "=" * 20]
+    for table, count in stats.items():
+        out.append(f"  {table.capitalize():12}: {count:,}")
+    
+    # Show scraping metadata
+    out.append("\nScraping Status:")
+    out.append("=" * 16)
+    
+    cursor = db.connection.cursor()
+    cursor.execute("""
+        SELECT scraping_status, COUNT(*) as count 
+        FROM scraping_metadata 
+        GROUP BY scraping_status
+    """)
+    
+    for row in cursor.fetchall():
+        out.append(f"  {row['scraping_status'].capitalize():12}: {row['count']}")
+    
+    # Show recent scraping activity
+    cursor.execute("""
+        SELECT title_number, last_scraped, scraping_status, records_processed
+        FROM scraping_metadata 
+        ORDER BY last_scraped DESC 
+        LIMIT 10
+    """)
+    
+    recent_scrapes = cursor.fetchall()
+    if recent_scrapes:
+        out.append("\nRecent Scraping Activity:")
+        out.append("=" * 25)
+        for row in recent_scrapes:
+            out.append(f"  Title {row['title_number']:2d}: {row['last_scraped']} "
+                       f"({row['scraping_status']}) - {row['records_processed']} records")
+    
+    click.echo("\n".join(out))
 
 
 @cli.command()
@@ -230,140 +284,136 @@ def stats():
 @click.option('--limit', default=10, help='Maximum number of results to return')
 @click.option('--format', 'output_format', type=click.Choice(['text', 'json']), 
               default='text', help='Output format')
-def search(query, limit, output_format):
+@click.pass_context
+@handle_errors("Search failed")
+def search(ctx, query, limit, output_format):
     """Search sections content using full-text search"""
-    try:
-        with ECFRDatabase() as db:
-            results = db.search_sections(query, limit)
-            
-            if not results:
-                click.echo("No results found.")
-                return
-            
-            if output_format == 'json':
-                # Convert datetime objects to strings for JSON serialization
-                for result in results:
-                    for key, value in result.items():
-                        if hasattr(value, 'isoformat'):
-                            result[key] = value.isoformat()
-                
-                click.echo(json.dumps(results, indent=2))
-            else:
-                click.echo(f"Found {len(results)} results for '{query}':")
-                click.echo("=" * 50)
-                
-                for i, result in enumerate(results, 1):
-                    click.echo(f"\n{i}. {result['title_name']} - {result['part_name']}")
-                    click.echo(f"   Section {result['section_number']}: {result['section_heading']}")
-                    
-                    # Show content preview
-                    content = result['section_content'] or ""
-                    if len(content) > 200:
-                        content = content[:200] + "..."
-                    click.echo(f"   {content}")
-                    
-    except DatabaseError as e:
-        logger.error(f"Search failed: {e}")
-        sys.exit(1)
+    db = get_db(ctx)
+    
+    if output_format == 'json':
+        # Emit rows as SQLite produces them, as bytes straight to stdout
+        click.echo(b"[")
+        for i, result in enumerate(db.iter_search_sections(query, limit)):
+            prefix = b"," if i else b""
+            click.echo(prefix + _json_bytes(result))
+        click.echo(b"]")
+        return
+    
+    results = db.search_sections(query, limit, preview_length=SEARCH_PREVIEW_LENGTH)
+    
+    if not results:
+        click.echo("No results found.")
+        return
+    
+    out = [f"Found {len(results)} results for '{query}':", "=" * 50]
+    
+    for i, result in enumerate(results, 1):
+        out.append(f"\n{i}. {result['title_name']} - {result['part_name']}")
+        out.append(f"   Section {result['section_number']}: {result['section_heading']}")
+        
+        # Show content preview
+        content = result['section_content_preview'] or ""
+        if result['is_truncated']:
+            content += "..."
+        out.append(f"   {content}")
+    
+    click.echo("\n".join(out))
 
 
 @cli.command()
 @click.argument('backup_path', type=click.Path())
-def backup(backup_path):
+@click.option('--online', is_flag=True,
+              help='Copy pages incrementally with a progress bar instead of writing a compacted copy')
+@click.pass_context
+@handle_errors("Backup failed")
+def backup(ctx, backup_path, online):
     """Create a backup of the database"""
-    try:
-        backup_file = Path(backup_path)
-        
-        with ECFRDatabase() as db:
-            db.backup_database(backup_file)
-        
-        click.echo(f"Database backed up to: {backup_file}")
-        
-    except DatabaseError as e:
-        logger.error(f"Backup failed: {e}")
-        sys.exit(1)
+    backup_file = Path(backup_path)
+    db = get_db(ctx, require_schema=False)
+    
+    if online:
+        with click.progressbar(length=0, label='Backing up', file=sys.stderr) as bar:
+            def report(copied, total):
+                bar.length = total
+                bar.update(copied - bar.pos)
+            
+            db.backup_database(backup_file, progress=report)
+    else:
+        db.backup_database(backup_file)
+    
+    click.echo(f"Database backed up to: {backup_file}")
 
 
 @cli.command()
-def vacuum():
-    """Optimize database (VACUUM)"""
-    try:
-        with ECFRDatabase() as db:
-            db.vacuum_database()
-        
-        click.echo("Database optimized successfully")
-        
-    except DatabaseError as e:
-        logger.error(f"Database optimization failed: {e}")
-        sys.exit(1)
+@click.option('--full', is_flag=True, help='Rewrite the whole file (exclusive lock) instead of releasing free pages')
+@click.pass_context
+@handle_errors("Database optimization failed")
+def vacuum(ctx, full):
+    """Optimize database (incremental VACUUM)"""
+    get_db(ctx, require_schema=False).vacuum_database(full=full)
+    click.echo("Database optimized successfully")
 
 
 @cli.command()
 @click.option('--title', type=int, help='Show details for specific CFR title')
-def list_titles(title):
+@click.pass_context
+@handle_errors("List operation failed")
+def list_titles(ctx, title):
     """List all CFR titles in database"""
-    try:
-        with ECFRDatabase() as db:
-            cursor = db.connection.cursor()
-            
-            if title:
-                # Show detailed information for specific title
-                cursor.execute("""
-                    SELECT t.*, 
-                           COUNT(DISTINCT c.id) as chapters,
-                           COUNT(DISTINCT sc.id) as subchapters,
-                           COUNT(DISTINCT p.id) as parts,
-                           COUNT(DISTINCT s.id) as sections
-                    FROM titles t
-                    LEFT JOIN chapters c ON c.title_id = t.id
-                    LEFT JOIN subchapters sc ON sc.chapter_id = c.id
-                    LEFT JOIN parts p ON p.chapter_id = c.id
-                    LEFT JOIN sections s ON s.part_id = p.id
-                    WHERE t.title_number = ?
-                    GROUP BY t.id
-                """, (title,))
-                
-                row = cursor.fetchone()
-                if not row:
-                    click.echo(f"Title {title} not found in database.")
-                    return
-                
-                click.echo(f"CFR Title {row['title_number']}: {row['title_name']}")
-                click.echo("=" * 60)
-                click.echo(f"  Chapters: {row['chapters']}")
-                click.echo(f"  Subchapters: {row['subchapters']}")
-                click.echo(f"  Parts: {row['parts']}")
-                click.echo(f"  Sections: {row['sections']}")
-                click.echo(f"  Last Updated: {row['last_updated']}")
-                
-            else:
-                # List all titles
-                cursor.execute("""
-                    SELECT t.title_number, t.title_name, 
-                           COUNT(DISTINCT s.id) as sections,
-                           sm.last_scraped, sm.scraping_status
-                    FROM titles t
-                    LEFT JOIN chapters c ON c.title_id = t.id
-                    LEFT JOIN parts p ON p.chapter_id = c.id
-                    LEFT JOIN sections s ON s.part_id = p.id
-                    LEFT JOIN scraping_metadata sm ON sm.title_number = t.title_number
-                    GROUP BY t.id
-                    ORDER BY t.title_number
-                """)
-                
-                click.echo("CFR Titles in Database:")
-                click.echo("=" * 60)
-                click.echo(f"{'Title':<6} {'Sections':<10} {'Status':<12} {'Name'}")
-                click.echo("-" * 60)
-                
-                for row in cursor.fetchall():
-                    status = row['scraping_status'] or 'not_scraped'
-                    click.echo(f"{row['title_number']:<6} {row['sections']:<10} "
-                              f"{status:<12} {row['title_name']}")
-                              
-    except DatabaseError as e:
-        logger.error(f"List operation failed: {e}")
-        sys.exit(1)
+    db = get_db(ctx)
+    cursor = db.connection.cursor()
+    
+    if title:
+        # Show detailed information for specific title
+        cursor.execute("""
+            SELECT t.*,
+                   t.chapters_count as chapters,
+                   t.subchapters_count as subchapters,
+                   t.parts_count as parts,
+                   t.sections_count as sections
+            FROM titles t
+            WHERE t.title_number = ?
+        """, (title,))
+        
+        row = cursor.fetchone()
+        if not row:
+            click.echo(f"Title {title} not found in database.")
+            return
+        
+        click.echo("\n".join([
+            f"CFR Title {row['title_number']}: {row['title_name']}",
+            "=" * 60,
+            f"  Chapters: {row['chapters']}",
+            f"  Subchapters: {row['subchapters']}",
+            f"  Parts: {row['parts']}",
+            f"  Sections: {row['sections']}",
+            f"  Last Updated: {row['last_updated']}",
+        ]))
+        
+    else:
+        # List all titles
+        cursor.execute("""
+            SELECT t.title_number, t.title_name,
+                   t.sections_count as sections,
+                   sm.last_scraped, sm.scraping_status
+            FROM titles t
+            LEFT JOIN scraping_metadata sm ON sm.title_number = t.title_number
+            ORDER BY t.title_number
+        """)
+        
+        out = [
+            "CFR Titles in Database:",
+            "=" * 60,
+            f"{'Title':<6} {'Sections':<10} {'Status':<12} {'Name'}",
+            "-" * 60,
+        ]
+        
+        for row in cursor.fetchall():
+            status = row['scraping_status'] or 'not_scraped'
+            out.append(f"{row['title_number']:<6} {row['sections']:<10} "
+                       f"{status:<12} {row['title_name']}")
+        
+        click.echo("\n".join(out))
 
 
 def main():
@@ -374,7 +424,7 @@ def main():
         logger.info("Program interrupted by user")
         sys.exit(1)
     except Exception as e:
-        logger.error(f"Unexpected error: {e}")
+        logger.error("Unexpected error: %s", e)
         sys.exit(1)
 
 
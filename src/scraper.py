@@ -4,195 +4,297 @@ Downloads and processes CFR XML files from GovInfo bulk data repository
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+from urllib3.util.request import ACCEPT_ENCODING
+import os
+import sys
+import threading
 import time
-import xml.etree.ElementTree as ET
+from lxml import etree
 from pathlib import Path
-from typing import Optional, Dict, List, Any, Tuple
+from typing import Optional, Dict, List, Any, Tuple, Union, BinaryIO
 import re
 from urllib.parse import urljoin
-from datetime import datetime
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
 import logging
+import multiprocessing
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
 from tqdm import tqdm
 
 from config.settings import (
     GOVINFO_BASE_URL, CFR_TITLES, REQUEST_TIMEOUT, MAX_RETRIES, 
-    RETRY_DELAY, USER_AGENT, REQUESTS_PER_SECOND, DELAY_BETWEEN_REQUESTS,
-    DATA_DIR, VALIDATE_XML, SKIP_EXISTING, CHUNK_SIZE
+    RETRY_BACKOFF_FACTOR, RETRY_STATUS_CODES, USER_AGENT,
+    REQUESTS_PER_SECOND,
+    VALIDATE_XML, SKIP_EXISTING, CHUNK_SIZE, WAL_CHECKPOINT_INTERVAL, DOWNLOAD_WORKERS,
+    SHOW_PROGRESS, DOWNLOAD_LOG_INTERVAL, RANGE_DOWNLOAD_MIN_SIZE, RANGE_DOWNLOAD_PARTS,
+    UPDATE_CHECK_WORKERS, PARSE_WORKERS, HTTP_POOL_SIZE, BATCH_SIZE,
+    settings
 )
-from src.database import ECFRDatabase, calculate_file_hash, DatabaseError
+from src.logger import setup_worker_logging, start_worker_log_listener
+from src.database import ECFRDatabase, calculate_file_hash, new_file_hash, DatabaseError
 
 logger = logging.getLogger(__name__)
 
+# Elements parse_title_xml is told about; everything else is built into the tree silently
+_STRUCTURE_TAGS = ('HEAD', 'TITLE', 'DIV3', 'DIV4', 'DIV5')
+
+# Patterns applied to every chapter, part and section heading
+_CHAPTER_RE = re.compile(r'CHAPTER\s+([IVXLCDM]+)', re.IGNORECASE)
+_SUBCHAPTER_RE = re.compile(r'SUBCHAPTER\s+([A-Z])', re.IGNORECASE)
+_PART_RE = re.compile(r'PART\s+(\d+)', re.IGNORECASE)
+_SECTION_NUMBER_RE = re.compile(r'§\s*([\d.]+)')
+_SECTION_PREFIX_RE = re.compile(r'§\s*[\d.]+\s*')
+_ENTITIES = {'amp': '&', 'lt': '<', 'gt': '>', 'quot': '"', 'apos': "'"}
+_ENTITY_RE = re.compile(r'&(amp|lt|gt|quot|apos);')
+
+
+# Lookups for every part and section; find() would run its path through ElementPath
+def _child(element, tag: str):
+    """First direct child of element with the given tag, or None"""
+    return next((child for child in element if child.tag == tag), None)
+
+
+def _descendant(element, tag: str):
+    """First element below element with the given tag, or None"""
+    return next(element.iter(tag), None)
+
 
 class ScrapingError(Exception):
     """Custom exception for scraping operations"""
     pass
 
 
-class ECFRScraper:
-    """Main scraper class for eCFR data"""
+class RateLimiter:
+    """Spaces calls to wait() at least interval seconds apart across threads"""
     
-    def __init__(self, database: ECFRDatabase):
-        """Initialize scraper with database connection"""
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+    
+    def wait(self):
+        """Block until this caller's slot comes up"""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class TitleRecords:
+    """Stand-in for ECFRDatabase that keeps one title's rows in memory
+    
+    Used when a title is parsed in a worker process. Ids handed out are
+    1-based positions in the lists below; replay() writes the rows to the
+    real database and maps them to the ids it assigns.
+    """
+    
+    def __init__(self):
+        self.titles: List[Tuple] = []
+        self.chapters: List[Tuple] = []
+        self.subchapters: List[Tuple] = []
+        self.parts: List[Tuple] = []
+        self.sections: List[Tuple] = []
+        self.records_processed = 0
+        # Set instead of raising, so any parse failure crosses the process boundary
+        self.error: Optional[str] = None
+    
+    def get_or_create_title(self, title_number: int, title_name: str) -> int:
+        """Record a title and return its local id"""
+        self.titles.append((title_number, title_name))
+        return len(self.titles)
+    
+    def get_or_create_chapter(self, title_id: int, chapter_number: str, chapter_name: str) -> int:
+        """Record a chapter and return its local id"""
+        self.chapters.append((title_id, chapter_number, chapter_name))
+        return len(self.chapters)
+    
+    def get_or_create_subchapter(self, chapter_id: int, subchapter_letter: str, subchapter_name: str) -> int:
+        """Record a subchapter and return its local id"""
+        self.subchapters.append((chapter_id, subchapter_letter, subchapter_name))
+        return len(self.subchapters)
+    
+    def get_or_create_part(self, chapter_id: int, subchapter_id: Optional[int],
+                           part_number: int, part_name: str,
+                           authority: Optional[str] = None, source: Optional[str] = None) -> int:
+        """Record a part and return its local id"""
+        self.parts.append((chapter_id, subchapter_id, part_number, part_name, authority, source))
+        return len(self.parts)
+    
+    def insert_section(self, *row):
+        """Record one section row"""
+        self.sections.append(row)
+    
+    def bulk_insert_sections(self, rows: List[Tuple]):
+        """Record a batch of section rows"""
+        self.sections.extend(rows)
+    
+    def replay(self, database: ECFRDatabase, batch_size: int = BATCH_SIZE):
+        """Write the collected rows through the real database, parents first"""
+        title_ids = [database.get_or_create_title(*row) for row in self.titles]
+        chapter_ids = [
+            database.get_or_create_chapter(title_ids[title_id - 1], number, name)
+            for title_id, number, name in self.chapters
+        ]
+        subchapter_ids = [
+            database.get_or_create_subchapter(chapter_ids[chapter_id - 1], letter, name)
+            for chapter_id, letter, name in self.subchapters
+        ]
+        part_ids = [
+            database.get_or_create_part(
+                chapter_ids[chapter_id - 1],
+                subchapter_ids[subchapter_id - 1] if subchapter_id else None,
+                *rest
+            )
+            for chapter_id, subchapter_id, *rest in self.parts
+        ]
+        for start in range(0, len(self.sections), batch_size):
+            database.bulk_insert_sections([
+                (part_ids[row[0] - 1],) + tuple(row[1:])
+                for row in self.sections[start:start + batch_size]
+            ])
+
+
+class _TitleWalk:
+    """Where TitleParser._stream_title is in a title
+    
+    Holds the open chapter and subchapter, the ids stored for them and the
+    sections counted so far.
+    """
+    
+    def __init__(self, title_number: int):
+        self.title_number = title_number
+        # Text of the first TITLE and HEAD elements, for naming the title
+        self.heads: Dict[str, Optional[str]] = {}
+        self.title_id: Optional[int] = None
+        self.chapter_elem = self.subchapter_elem = None
+        self.chapter_id: Optional[int] = None
+        self.subchapter_id: Optional[int] = None
+        self.open_parts = 0
+        self.records_count = 0
+
+
+class TitleParser:
+    """Turns title XML into chapters, subchapters, parts and sections
+    
+    Rows are written through self.database, which is an ECFRDatabase or,
+    in a parse worker process, a TitleRecords.
+    """
+    
+    def __init__(self, database, batch_size: int = BATCH_SIZE):
         self.database = database
-        self.session = self._create_session()
-        self.download_dir = DATA_DIR / "xml_files"
-        self.download_dir.mkdir(parents=True, exist_ok=True)
-        
-    def _create_session(self) -> requests.Session:
-        """Create configured requests session"""
-        session = requests.Session()
-        session.headers.update({
-            'User-Agent': USER_AGENT,
-            'Accept': 'application/xml, text/xml, */*',
-            'Accept-Encoding': 'gzip, deflate'
-        })
-        return session
+        self.batch_size = batch_size
+        # Sections waiting for bulk insert; None outside a parse
+        self._section_buffer: Optional[List[Tuple]] = None
     
-    def _make_request(self, url: str, stream: bool = False) -> requests.Response:
-        """Make HTTP request with retry logic"""
-        last_exception = None
+    def _stream_title(self, xml_file: Path, title_number: int) -> int:
+        """Walk the title with iterparse, storing each part as soon as it closes
         
-        for attempt in range(MAX_RETRIES):
-            try:
-                logger.debug(f"Requesting {url} (attempt {attempt + 1})")
-                
-                response = self.session.get(
-                    url, 
-                    timeout=REQUEST_TIMEOUT,
-                    stream=stream
-                )
-                response.raise_for_status()
-                
-                # Rate limiting
-                time.sleep(DELAY_BETWEEN_REQUESTS)
-                
-                return response
-                
-            except requests.exceptions.RequestException as e:
-                last_exception = e
-                logger.warning(f"Request failed (attempt {attempt + 1}): {e}")
-                
-                if attempt < MAX_RETRIES - 1:
-                    time.sleep(RETRY_DELAY * (attempt + 1))
-                    
-        raise ScrapingError(f"Failed to fetch {url} after {MAX_RETRIES} attempts: {last_exception}")
-    
-    def download_title_xml(self, title_number: int, force_download: bool = False) -> Optional[Path]:
-        """Download XML file for a specific CFR title"""
-        try:
-            xml_url = f"{GOVINFO_BASE_URL}/title-{title_number}/ECFR-title{title_number}.xml"
-            xml_file = self.download_dir / f"ECFR-title{title_number}.xml"
-            
-            # Check if file exists and skip if not forcing
-            if xml_file.exists() and not force_download:
-                if SKIP_EXISTING:
-                    logger.info(f"XML file for title {title_number} already exists, skipping download")
-                    return xml_file
-            
-            logger.info(f"Downloading XML for CFR Title {title_number}")
-            
-            # Download with progress bar
-            response = self._make_request(xml_url, stream=True)
-            
-            total_size = int(response.headers.get('content-length', 0))
-            
-            with open(xml_file, 'wb') as f:
-                if total_size > 0:
-                    with tqdm(total=total_size, unit='B', unit_scale=True, desc=f"Title {title_number}") as pbar:
-                        for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
-                            if chunk:
-                                f.write(chunk)
-                                pbar.update(len(chunk))
+        Chapters and subchapters are created when their HEAD closes. Processed
+        parts are cleared and dropped from the tree, so memory is bounded by
+        the largest part rather than the whole title.
+        """
+        walk = _TitleWalk(title_number)
+        with open(xml_file, 'rb') as f:
+            events = etree.iterparse(f, events=('start', 'end'), tag=_STRUCTURE_TAGS,
+                                     remove_comments=True, remove_pis=True, huge_tree=True)
+            for event, elem in events:
+                if event == 'start':
+                    self._start_division(walk, elem)
+                elif elem.tag == 'TITLE':
+                    walk.heads.setdefault('TITLE', elem.text)
+                elif elem.tag == 'HEAD':
+                    self._end_head(walk, elem)
+                elif elem.tag == 'DIV5':
+                    self._end_part(walk, elem)
                 else:
-                    for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
-                        if chunk:
-                            f.write(chunk)
-            
-            # Validate XML if enabled
-            if VALIDATE_XML:
-                if not self._validate_xml(xml_file):
-                    raise ScrapingError(f"Invalid XML file for title {title_number}")
-            
-            logger.info(f"Downloaded XML for title {title_number}: {xml_file}")
-            return xml_file
-            
-        except Exception as e:
-            logger.error(f"Error downloading title {title_number}: {e}")
-            raise ScrapingError(f"Download failed for title {title_number}: {e}")
+                    self._end_division(walk, elem)
+        
+        if walk.title_id is None:
+            self._store_title(walk)
+        return walk.records_count
     
-    def _validate_xml(self, xml_file: Path) -> bool:
-        """Validate XML file structure"""
-        try:
-            ET.parse(xml_file)
-            return True
-        except ET.ParseError as e:
-            logger.error(f"XML validation failed for {xml_file}: {e}")
-            return False
+    def _store_title(self, walk: '_TitleWalk') -> int:
+        """Create the title, named by the first HEAD in the document, else the first TITLE"""
+        heads = walk.heads
+        tag = 'HEAD' if 'HEAD' in heads else 'TITLE'
+        title_name = self._clean_text(heads[tag]) if tag in heads else f"Title {walk.title_number}"
+        walk.title_id = self.database.get_or_create_title(walk.title_number, title_name)
+        return walk.title_id
     
-    def parse_title_xml(self, xml_file: Path, title_number: int) -> int:
-        """Parse XML file and extract CFR structure"""
-        try:
-            logger.info(f"Parsing XML file: {xml_file}")
-            
-            # Update scraping metadata
-            file_size = xml_file.stat().st_size
-            file_hash = calculate_file_hash(xml_file)
-            
-            self.database.update_scraping_metadata(
-                title_number, 'in_progress', file_size, file_hash
-            )
-            
-            # Parse XML
-            tree = ET.parse(xml_file)
-            root = tree.getroot()
-            
-            records_processed = 0
-            
-            # Extract title information
-            title_element = root.find('.//HEAD')
-            if title_element is None:
-                title_element = root.find('.//TITLE')
-            title_name = self._clean_text(title_element.text) if title_element is not None else f"Title {title_number}"
-            
-            title_id = self.database.get_or_create_title(title_number, title_name)
-            
-            # Process chapters (DIV3 elements with TYPE="CHAPTER")
-            for chapter_elem in root.findall('.//DIV3[@TYPE="CHAPTER"]'):
-                chapter_id = self._process_chapter(chapter_elem, title_id)
-                if chapter_id:
-                    records_processed += self._process_chapter_content(chapter_elem, chapter_id)
-            
-            # Update successful completion
-            self.database.update_scraping_metadata(
-                title_number, 'completed', file_size, file_hash, None, records_processed
-            )
-            
-            # Commit all changes for this title
-            self.database.connection.commit()
-            
-            logger.info(f"Successfully parsed title {title_number}: {records_processed} records")
-            return records_processed
-            
-        except Exception as e:
-            logger.error(f"Error parsing XML file {xml_file}: {e}")
-            self.database.update_scraping_metadata(
-                title_number, 'failed', None, None, str(e), 0
-            )
-            raise ScrapingError(f"XML parsing failed: {e}")
+    def _start_division(self, walk: '_TitleWalk', elem):
+        """Note a chapter or subchapter being entered and count open parts"""
+        tag = elem.tag
+        if tag == 'DIV3' and elem.get('TYPE') == 'CHAPTER':
+            walk.chapter_elem, walk.chapter_id = elem, None
+        elif tag == 'DIV4' and elem.get('TYPE') == 'SUBCHAP' and walk.chapter_elem is not None:
+            walk.subchapter_elem, walk.subchapter_id = elem, None
+        elif tag == 'DIV5':
+            walk.open_parts += 1
+    
+    def _end_head(self, walk: '_TitleWalk', elem):
+        """Create the chapter or subchapter whose HEAD just closed"""
+        walk.heads.setdefault('HEAD', elem.text)
+        parent = elem.getparent()
+        if parent is None:
+            return
+        if parent is walk.subchapter_elem and walk.subchapter_id is None and walk.chapter_id:
+            walk.subchapter_id = self._process_subchapter(parent, walk.chapter_id)
+        elif parent is walk.chapter_elem and walk.chapter_id is None:
+            title_id = walk.title_id if walk.title_id is not None else self._store_title(walk)
+            walk.chapter_id = self._process_chapter(parent, title_id)
+    
+    def _end_part(self, walk: '_TitleWalk', elem):
+        """Store a closed part and its sections, then free it"""
+        walk.open_parts -= 1
+        if elem.get('TYPE') == 'PART':
+            if walk.subchapter_elem is not None:
+                if walk.subchapter_id:
+                    walk.records_count += self._process_part(elem, walk.chapter_id, walk.subchapter_id)
+            elif walk.chapter_id and elem.getparent() is walk.chapter_elem:
+                walk.records_count += self._process_part(elem, walk.chapter_id, None)
+        # A part nested in another is still part of the enclosing one's content
+        if not walk.open_parts:
+            self._release(elem)
+    
+    def _end_division(self, walk: '_TitleWalk', elem):
+        """Leave a closed chapter or subchapter and free it"""
+        if elem is walk.subchapter_elem:
+            walk.subchapter_elem = walk.subchapter_id = None
+            self._release(elem)
+        elif elem is walk.chapter_elem:
+            walk.chapter_elem = walk.chapter_id = None
+            self._release(elem)
     
-    def _process_chapter(self, chapter_elem: ET.Element, title_id: int) -> Optional[int]:
+    def _release(self, elem):
+        """Free a processed element and the already-processed siblings before it"""
+        elem.clear()
+        parent = elem.getparent()
+        if parent is not None:
+            while elem.getprevious() is not None:
+                del parent[0]
+    
+    def _flush_sections(self):
+        """Write buffered sections with one bulk insert"""
+        if self._section_buffer:
+            self.database.bulk_insert_sections(self._section_buffer)
+            self._section_buffer.clear()
+    
+    def _process_chapter(self, chapter_elem: etree._Element, title_id: int) -> Optional[int]:
         """Process a chapter element"""
         try:
             # Extract chapter number and name from HEAD element
-            chapter_hd = chapter_elem.find('HEAD')
+            chapter_hd = _child(chapter_elem, 'HEAD')
             if chapter_hd is None:
                 return None
                 
             chapter_text = self._clean_text(chapter_hd.text) if chapter_hd.text else ""
             
             # Parse chapter number (Roman numerals) - handle different formats
-            chapter_match = re.search(r'CHAPTER\s+([IVXLCDM]+)', chapter_text, re.IGNORECASE)
+            chapter_match = _CHAPTER_RE.search(chapter_text)
             if not chapter_match:
                 # Try to get from the N attribute
                 chapter_number = chapter_elem.get('N')
@@ -210,33 +312,17 @@ class ECFRScraper:
             logger.error(f"Error processing chapter: {e}")
             return None
     
-    def _process_chapter_content(self, chapter_elem: ET.Element, chapter_id: int) -> int:
-        """Process all content within a chapter"""
-        records_count = 0
-        
-        # Process subchapters (DIV4 elements with TYPE="SUBCHAP")
-        for subchapter_elem in chapter_elem.findall('.//DIV4[@TYPE="SUBCHAP"]'):
-            subchapter_id = self._process_subchapter(subchapter_elem, chapter_id)
-            if subchapter_id:
-                records_count += self._process_subchapter_content(subchapter_elem, chapter_id, subchapter_id)
-        
-        # Process parts that are directly under chapter (no subchapter) - DIV5 with TYPE="PART"
-        for part_elem in chapter_elem.findall('./DIV5[@TYPE="PART"]'):
-            records_count += self._process_part(part_elem, chapter_id, None)
-        
-        return records_count
-    
-    def _process_subchapter(self, subchapter_elem: ET.Element, chapter_id: int) -> Optional[int]:
+    def _process_subchapter(self, subchapter_elem: etree._Element, chapter_id: int) -> Optional[int]:
         """Process a subchapter element"""
         try:
-            subchap_hd = subchapter_elem.find('HEAD')
+            subchap_hd = _child(subchapter_elem, 'HEAD')
             if subchap_hd is None:
                 return None
                 
             subchapter_text = self._clean_text(subchap_hd.text) if subchap_hd.text else ""
             
             # Parse subchapter letter - handle different formats
-            subchapter_match = re.search(r'SUBCHAPTER\s+([A-Z])', subchapter_text, re.IGNORECASE)
+            subchapter_match = _SUBCHAPTER_RE.search(subchapter_text)
             if not subchapter_match:
                 # Try to get from the N attribute
                 subchapter_letter = subchapter_elem.get('N')
@@ -254,27 +340,18 @@ class ECFRScraper:
             logger.error(f"Error processing subchapter: {e}")
             return None
     
-    def _process_subchapter_content(self, subchapter_elem: ET.Element, chapter_id: int, subchapter_id: int) -> int:
-        """Process all parts within a subchapter"""
-        records_count = 0
-        
-        for part_elem in subchapter_elem.findall('.//DIV5[@TYPE="PART"]'):
-            records_count += self._process_part(part_elem, chapter_id, subchapter_id)
-            
-        return records_count
-    
-    def _process_part(self, part_elem: ET.Element, chapter_id: int, subchapter_id: Optional[int]) -> int:
+    def _process_part(self, part_elem: etree._Element, chapter_id: int, subchapter_id: Optional[int]) -> int:
         """Process a part element"""
         try:
             # Extract part number and name from HEAD element
-            part_hd = part_elem.find('HEAD')
+            part_hd = _child(part_elem, 'HEAD')
             if part_hd is None:
                 return 0
                 
             part_text = self._clean_text(part_hd.text) if part_hd.text else ""
             
             # Parse part number - handle different formats
-            part_match = re.search(r'PART\s+(\d+)', part_text, re.IGNORECASE)
+            part_match = _PART_RE.search(part_text)
             if not part_match:
                 # Try to get from the N attribute
                 part_number_str = part_elem.get('N')
@@ -297,9 +374,11 @@ class ECFRScraper:
             )
             
             # Process sections (DIV8 elements with TYPE="SECTION")
+            # Bound once; a part can hold thousands of sections
+            process_section = self._process_section
             sections_count = 0
-            for section_elem in part_elem.findall('.//DIV8[@TYPE="SECTION"]'):
-                if self._process_section(section_elem, part_id):
+            for section_elem in part_elem.iter('DIV8'):
+                if section_elem.get('TYPE') == 'SECTION' and process_section(section_elem, part_id):
                     sections_count += 1
             
             logger.debug(f"Processed part {part_number}: {sections_count} sections")
@@ -309,7 +388,7 @@ class ECFRScraper:
             logger.error(f"Error processing part: {e}")
             return 0
     
-    def _process_section(self, section_elem: ET.Element, part_id: int) -> bool:
+    def _process_section(self, section_elem: etree._Element, part_id: int) -> bool:
         """Process a section element"""
         try:
             # Extract section number from N attribute or HEAD element
@@ -317,25 +396,23 @@ class ECFRScraper:
             if section_number.startswith('§ '):
                 section_number = section_number[2:].strip()
             
+            head_elem = _child(section_elem, 'HEAD')
+            head_text = self._clean_text(head_elem.text) if head_elem is not None else ""
+            
             # If no N attribute, try to extract from HEAD
             if not section_number:
-                head_elem = section_elem.find('HEAD')
-                if head_elem is not None:
-                    head_text = self._clean_text(head_elem.text) if head_elem.text else ""
-                    section_match = re.search(r'§\s*([\d.]+)', head_text)
-                    if section_match:
-                        section_number = section_match.group(1)
+                section_match = _SECTION_NUMBER_RE.search(head_text)
+                if section_match:
+                    section_number = section_match.group(1)
                 
             if not section_number:
                 logger.warning("Could not extract section number")
                 return False
             
             # Extract section heading from HEAD element
-            head_elem = section_elem.find('HEAD')
             if head_elem is not None:
-                head_text = self._clean_text(head_elem.text) if head_elem.text else ""
                 # Remove the section number part to get just the heading
-                section_heading = re.sub(r'§\s*[\d.]+\s*', '', head_text).strip()
+                section_heading = _SECTION_PREFIX_RE.sub('', head_text).strip()
             else:
                 section_heading = ""
             
@@ -349,10 +426,15 @@ class ECFRScraper:
             # Get XML node ID if available
             xml_node_id = section_elem.get('NODE', None)
             
-            self.database.insert_section(
-                part_id, section_number, section_heading, section_content,
-                authority, source, xml_node_id
-            )
+            row = (part_id, section_number, section_heading, section_content,
+                   authority, source, xml_node_id)
+            buffer = self._section_buffer
+            if buffer is None:
+                self.database.insert_section(*row)
+            else:
+                buffer.append(row)
+                if len(buffer) >= self.batch_size:
+                    self._flush_sections()
             
             return True
             
@@ -360,43 +442,38 @@ class ECFRScraper:
             logger.error(f"Error processing section: {e}")
             return False
     
-    def _extract_section_content(self, section_elem: ET.Element) -> str:
+    def _extract_section_content(self, section_elem: etree._Element) -> str:
         """Extract full text content from a section"""
         content_parts = []
+        append = content_parts.append
         
-        # Get all paragraph elements
-        for para_elem in section_elem.findall('.//P'):
-            para_text = self._extract_element_text(para_elem)
-            if para_text.strip():
-                content_parts.append(para_text.strip())
+        # Get all paragraph elements; same text as _extract_element_text
+        # without a method call per paragraph
+        for para_elem in section_elem.iter('P'):
+            para_text = ''.join(para_elem.itertext()).strip()
+            if para_text:
+                append(para_text)
         
         return '\n\n'.join(content_parts)
     
-    def _extract_element_text(self, element: ET.Element) -> str:
+    def _extract_element_text(self, element: etree._Element) -> str:
         """Extract text from element including nested elements"""
         if element is None:
             return ""
-            
-        # Get direct text
-        text_parts = [element.text or ""]
-        
-        # Get text from all child elements
-        for child in element:
-            text_parts.append(self._extract_element_text(child))
-            text_parts.append(child.tail or "")
         
-        return " ".join(text_parts).strip()
+        # Text and tails in document order; inline markup adds no extra spaces
+        return ''.join(element.itertext()).strip()
     
-    def _extract_authority(self, element: ET.Element) -> Optional[str]:
+    def _extract_authority(self, element: etree._Element) -> Optional[str]:
         """Extract authority citation from element"""
-        auth_elem = element.find('.//AUTH')
+        auth_elem = _descendant(element, 'AUTH')
         if auth_elem is not None:
             return self._clean_text(self._extract_element_text(auth_elem))
         return None
     
-    def _extract_source(self, element: ET.Element) -> Optional[str]:
+    def _extract_source(self, element: etree._Element) -> Optional[str]:
         """Extract source citation from element"""
-        source_elem = element.find('.//SOURCE')
+        source_elem = _descendant(element, 'SOURCE')
         if source_elem is not None:
             return self._clean_text(self._extract_element_text(source_elem))
         return None
@@ -406,50 +483,449 @@ class ECFRScraper:
         if not text:
             return ""
             
-        # Remove excessive whitespace
-        text = re.sub(r'\s+', ' ', text)
+        # Collapse and trim whitespace
+        text = ' '.join(text.split())
         
-        # Remove common XML artifacts
-        text = text.replace('&amp;', '&')
-        text = text.replace('&lt;', '<')
-        text = text.replace('&gt;', '>')
-        text = text.replace('&quot;', '"')
-        text = text.replace('&apos;', "'")
+        # Decode entities left in the text when the source escaped them twice
+        if '&' in text:
+            text = _ENTITY_RE.sub(lambda m: _ENTITIES[m.group(1)], text)
         
-        return text.strip()
+        return text
+
+
+def _init_parse_worker(log_queue, log_level: int):
+    """Route a spawned parse worker's logging to the parent, at the parent's level"""
+    setup_worker_logging(log_queue, log_level)
+
+
+def parse_title_records(xml_file: Path, title_number: int) -> TitleRecords:
+    """Parse a title into memory without a database; run in a parse worker process"""
+    records = TitleRecords()
+    parser = TitleParser(records)
+    parser._section_buffer = []
+    try:
+        records.records_processed = parser._stream_title(xml_file, title_number)
+        parser._flush_sections()
+    except Exception as e:
+        records.error = str(e)
+    return records
+
+
+class ECFRScraper(TitleParser):
+    """Main scraper class for eCFR data"""
+    
+    def __init__(self, database: ECFRDatabase, batch_size: int = BATCH_SIZE):
+        """Initialize scraper with database connection"""
+        super().__init__(database, batch_size)
+        self.session = self._create_session()
+        # Shared by download threads, so the rate holds for the whole scrape
+        self._rate_limiter = RateLimiter(1.0 / REQUESTS_PER_SECOND)
+        self.download_dir = settings().data_dir / "xml_files"
+        self.download_dir.mkdir(parents=True, exist_ok=True)
+        self._titles_since_checkpoint = 0
+        # ETags and hashes of files downloaded in this run, keyed by title number
+        self._etags: Dict[int, str] = {}
+        self._file_hashes: Dict[int, str] = {}
+        
+    def _create_session(self) -> requests.Session:
+        """Create configured requests session"""
+        session = requests.Session()
+        # Keep enough pooled connections for concurrent downloads and HEAD checks;
+        # transient failures are retried on the pooled connection
+        retries = Retry(
+            total=MAX_RETRIES,
+            backoff_factor=RETRY_BACKOFF_FACTOR,
+            status_forcelist=RETRY_STATUS_CODES,
+            allowed_methods=frozenset(['GET', 'HEAD']),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE, max_retries=retries
+        )
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.headers.update({
+            'User-Agent': USER_AGENT,
+            'Accept': 'application/xml, text/xml, */*',
+            # Includes br when a brotli decoder is installed
+            'Accept-Encoding': ACCEPT_ENCODING,
+        })
+        return session
+    
+    def _make_request(self, url: str, stream: bool = False,
+                      headers: Optional[Dict[str, str]] = None) -> requests.Response:
+        """Make HTTP request; transient failures are retried by the session adapter"""
+        try:
+            # Rate limiting
+            self._rate_limiter.wait()
+            logger.debug(f"Requesting {url}")
+            
+            response = self.session.get(
+                url, 
+                timeout=REQUEST_TIMEOUT,
+                stream=stream,
+                headers=headers
+            )
+            response.raise_for_status()
+            
+            return response
+            
+        except requests.exceptions.RequestException as e:
+            logger.warning(f"Request failed: {e}")
+            raise ScrapingError(f"Failed to fetch {url} after {MAX_RETRIES} retries: {e}")
+    
+    def _title_xml_url(self, title_number: int) -> str:
+        """Bulk data URL of the XML file for a CFR title"""
+        return f"{GOVINFO_BASE_URL}/title-{title_number}/ECFR-title{title_number}.xml"
+    
+    def download_title_xml(self, title_number: int, force_download: bool = False,
+                           validate: bool = VALIDATE_XML) -> Optional[Path]:
+        """Download XML file for a specific CFR title
+        
+        Pass validate=False when the file is parsed next: the parse fails
+        on malformed XML anyway, so checking it here reads it twice.
+        """
+        try:
+            xml_url = self._title_xml_url(title_number)
+            xml_file = self.download_dir / f"ECFR-title{title_number}.xml"
+            
+            # Check if file exists and skip if not forcing
+            if xml_file.exists() and not force_download:
+                if SKIP_EXISTING:
+                    logger.info(f"XML file for title {title_number} already exists, skipping download")
+                    return xml_file
+            
+            logger.info(f"Downloading XML for CFR Title {title_number}")
+            
+            # Written beside the target and moved over it only once complete,
+            # so a failed download never leaves a partial file for SKIP_EXISTING
+            part_file = xml_file.with_name(xml_file.name + '.part')
+            try:
+                self._file_hashes[title_number] = self._download_file(xml_url, part_file, title_number)
+                
+                # Validate XML if enabled
+                if validate:
+                    if not self._validate_xml(part_file):
+                        raise ScrapingError(f"Invalid XML file for title {title_number}")
+                
+                os.replace(part_file, xml_file)
+            finally:
+                part_file.unlink(missing_ok=True)
+            
+            logger.info(f"Downloaded XML for title {title_number}: {xml_file}")
+            return xml_file
+            
+        except Exception as e:
+            logger.error(f"Error downloading title {title_number}: {e}")
+            raise ScrapingError(f"Download failed for title {title_number}: {e}")
+    
+    def _download_file(self, url: str, xml_file: Path, title_number: int) -> str:
+        """Download url into xml_file and return its hash
+        
+        Raises ScrapingError if the file written is shorter or longer than
+        the Content-Length the server announced.
+        """
+        response = self._make_request(url, stream=True)
+        etag = response.headers.get('ETag')
+        if etag:
+            self._etags[title_number] = etag
+        
+        total_size = int(response.headers.get('content-length', 0))
+        # Content-Length counts encoded bytes; the file holds decoded ones
+        identity = 'Content-Encoding' not in response.headers
+        
+        # Large uncompressed files are re-fetched as parallel byte ranges;
+        # a compressed stream is already smaller than the ranges would be
+        file_hash = None
+        if (RANGE_DOWNLOAD_PARTS > 1 and total_size >= RANGE_DOWNLOAD_MIN_SIZE
+                and response.headers.get('Accept-Ranges') == 'bytes' and identity):
+            response.close()
+            file_hash = self._download_ranges(url, xml_file, total_size, etag)
+            if file_hash is None:
+                logger.info(f"Byte ranges not served for title {title_number}, downloading as one stream")
+                response = self._make_request(url, stream=True)
+                total_size = int(response.headers.get('content-length', 0))
+                identity = 'Content-Encoding' not in response.headers
+        if file_hash is None:
+            file_hash = self._write_stream(response, xml_file, title_number, total_size)
+        
+        if identity and total_size and xml_file.stat().st_size != total_size:
+            raise ScrapingError(f"Incomplete download of title {title_number}: "
+                                f"{xml_file.stat().st_size} of {total_size} bytes")
+        return file_hash
+    
+    def _write_stream(self, response: requests.Response, xml_file: Path,
+                      title_number: int, total_size: int) -> str:
+        """Write a streamed response to xml_file and return its hash"""
+        # The bar only redraws on a terminal; background runs log every
+        # DOWNLOAD_LOG_INTERVAL bytes instead of touching tqdm per chunk
+        show_bar = SHOW_PROGRESS and sys.stderr.isatty()
+        downloaded = 0
+        next_log = DOWNLOAD_LOG_INTERVAL
+        
+        # Hashed as it is written so parsing need not read the file again
+        file_hash = new_file_hash()
+        with open(xml_file, 'wb') as f, \
+                tqdm(total=total_size or None, unit='B', unit_scale=True,
+                     desc=f"Title {title_number}", mininterval=1.0,
+                     miniters=CHUNK_SIZE, smoothing=0.1, disable=not show_bar) as pbar:
+            for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                if not chunk:
+                    continue
+                f.write(chunk)
+                file_hash.update(chunk)
+                downloaded += len(chunk)
+                if show_bar:
+                    pbar.update(len(chunk))
+                elif downloaded >= next_log:
+                    logger.info(f"Title {title_number}: {downloaded // (1024 * 1024)} MB downloaded"
+                                + (f" of {total_size // (1024 * 1024)} MB" if total_size else ""))
+                    next_log += DOWNLOAD_LOG_INTERVAL
+        return file_hash.hexdigest()
+    
+    def _download_ranges(self, url: str, xml_file: Path, total_size: int,
+                         etag: Optional[str] = None) -> Optional[str]:
+        """Download a file as RANGE_DOWNLOAD_PARTS concurrent byte ranges
+        
+        Each range is written at its own offset of xml_file, preallocated
+        to total_size, so xml_file is only complete once this returns a
+        hash. Returns None if the server answered any range with the whole
+        file, in which case the caller should stream it instead.
+        """
+        part_size = -(-total_size // RANGE_DOWNLOAD_PARTS)
+        ranges = [(start, min(start + part_size, total_size) - 1)
+                  for start in range(0, total_size, part_size)]
+        with open(xml_file, 'wb') as f:
+            f.truncate(total_size)
+        
+        with ThreadPoolExecutor(max_workers=len(ranges), thread_name_prefix="range") as executor:
+            served = list(executor.map(
+                lambda byte_range: self._fetch_range(url, xml_file, *byte_range, etag=etag), ranges
+            ))
+        if not all(served):
+            return None
+        # Ranges arrive out of order, so the hash is taken once they are all written
+        return calculate_file_hash(xml_file)
+    
+    def _fetch_range(self, url: str, xml_file: Path, start: int, end: int,
+                     etag: Optional[str] = None) -> bool:
+        """Write bytes start..end of url into xml_file at the same offset
+        
+        Returns False if the server sent the whole file instead of the
+        range. With an etag, If-Range makes a changed file come back whole
+        rather than mixing two versions.
+        """
+        headers = {'Range': f'bytes={start}-{end}', 'Accept-Encoding': 'identity'}
+        if etag:
+            headers['If-Range'] = etag
+        
+        response = self._make_request(url, stream=True, headers=headers)
+        try:
+            if response.status_code != 206:
+                return False
+            with open(xml_file, 'r+b') as f:
+                f.seek(start)
+                for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                    f.write(chunk)
+                if f.tell() != end + 1:
+                    raise ScrapingError(f"Incomplete range {start}-{end} from {url}")
+            return True
+        finally:
+            response.close()
+    
+    def _validate_xml(self, source: Union[Path, BinaryIO]) -> bool:
+        """Validate XML structure of a file path or binary file object
+        
+        Streams the XML through lxml's C parser and discards each element
+        once it closes, so no tree is kept for the whole title.
+        """
+        try:
+            if hasattr(source, 'read'):
+                self._iterparse_discard(source)
+            else:
+                with open(source, 'rb') as f:
+                    self._iterparse_discard(f)
+            return True
+        except etree.XMLSyntaxError as e:
+            logger.error(f"XML validation failed for {getattr(source, 'name', source)}: {e}")
+            return False
+    
+    @staticmethod
+    def _iterparse_discard(f: BinaryIO):
+        """Parse XML from f without keeping the tree"""
+        for _, elem in etree.iterparse(f, huge_tree=True):
+            elem.clear()
+    
+    def parse_title_xml(self, xml_file: Path, title_number: int,
+                        records: Optional[TitleRecords] = None) -> int:
+        """Parse XML file and extract CFR structure
+        
+        With records from parse_title_records, the title was already parsed
+        in a worker process and its rows are only written here.
+        """
+        try:
+            if records is not None and records.error:
+                raise ScrapingError(records.error)
+            logger.info(f"Parsing XML file: {xml_file}")
+            
+            stat = xml_file.stat()
+            file_size = stat.st_size
+            file_hash = (self._file_hashes.pop(title_number, None)
+                         or self._stored_file_hash(title_number, stat)
+                         or calculate_file_hash(xml_file))
+            
+            etag = self._file_etag(title_number, file_hash)
+            
+            # All rows for this title are written in a single transaction, so
+            # other connections only ever see the completed or failed status
+            self._section_buffer = []
+            with self.database.bulk_transaction():
+                if records is None:
+                    records_processed = self._stream_title(xml_file, title_number)
+                    self._flush_sections()
+                else:
+                    records.replay(self.database, self.batch_size)
+                    records_processed = records.records_processed
+                
+                # Update successful completion
+                self.database.update_scraping_metadata(
+                    title_number, 'completed', file_size, file_hash, None, records_processed, etag,
+                    stat.st_mtime_ns
+                )
+            
+            logger.info(f"Successfully parsed title {title_number}: {records_processed} records")
+            self._title_ingested()
+            return records_processed
+            
+        except Exception as e:
+            logger.error(f"Error parsing XML file {xml_file}: {e}")
+            with self.database.bulk_transaction():
+                self.database.update_scraping_metadata(
+                    title_number, 'failed', None, None, str(e), 0
+                )
+            raise ScrapingError(f"XML parsing failed: {e}")
+        
+        finally:
+            self._section_buffer = None
+    
+    def _stored_file_hash(self, title_number: int, stat: os.stat_result) -> Optional[str]:
+        """Hash recorded by the last scrape, if the file's size and mtime are unchanged since"""
+        metadata = self.database.get_scraping_metadata(title_number)
+        if (metadata and metadata.get('file_mtime_ns') == stat.st_mtime_ns
+                and metadata.get('file_size') == stat.st_size):
+            return metadata.get('file_hash')
+        return None
+    
+    def _file_etag(self, title_number: int, file_hash: str) -> Optional[str]:
+        """ETag of the local XML file, from this run's download or the last scrape of the same file"""
+        etag = self._etags.get(title_number)
+        if etag is None:
+            metadata = self.database.get_scraping_metadata(title_number)
+            if metadata and metadata.get('file_hash') == file_hash:
+                etag = metadata.get('etag')
+        return etag
+    
+    def _title_ingested(self):
+        """Checkpoint the WAL every WAL_CHECKPOINT_INTERVAL titles to bound its size"""
+        self._titles_since_checkpoint += 1
+        if self._titles_since_checkpoint >= WAL_CHECKPOINT_INTERVAL:
+            self.database.checkpoint()
+            self._titles_since_checkpoint = 0
+    
+    def _complete_future(self, future, pending: Dict, parse_pool: Optional[ProcessPoolExecutor],
+                         results: Dict[int, int], pbar: tqdm):
+        """Handle a finished download or parse future from scrape_all_titles
+        
+        A download is handed to parse_pool when there is one, adding the
+        parse future to pending; otherwise the title is parsed here. Either
+        way the title ends up stored and its record count in results.
+        """
+        title_number, xml_file = pending.pop(future)
+        try:
+            records = None
+            if xml_file is None:
+                xml_file = future.result()
+                if xml_file is None:
+                    logger.error(f"Failed to download title {title_number}")
+                    results[title_number] = 0
+                    pbar.update(1)
+                    return
+                
+                if parse_pool is not None:
+                    parse = parse_pool.submit(parse_title_records, xml_file, title_number)
+                    pending[parse] = (title_number, xml_file)
+                    return
+            else:
+                records = future.result()
+            
+            pbar.set_description(f"Processing Title {title_number}")
+            
+            # Parse (unless a worker already did) and store data
+            records_count = self.parse_title_xml(xml_file, title_number, records)
+            results[title_number] = records_count
+            
+            logger.info(f"Completed title {title_number}: {records_count} records")
+            
+        except Exception as e:
+            logger.error(f"Failed to process title {title_number}: {e}")
+            results[title_number] = 0
+        
+        pbar.update(1)
     
     def scrape_all_titles(self, title_numbers: Optional[List[int]] = None, 
-                         force_download: bool = False) -> Dict[int, int]:
-        """Scrape all specified CFR titles"""
+                         force_download: bool = False,
+                         max_workers: int = DOWNLOAD_WORKERS,
+                         parse_workers: int = PARSE_WORKERS) -> Dict[int, int]:
+        """Scrape all specified CFR titles
+        
+        Downloads run on a thread pool. With more than one parse worker,
+        each downloaded title is parsed in a separate process; database
+        writes always stay on the calling thread so SQLite only ever sees a
+        single writer. A worker returns its title as one TitleRecords, so
+        peak memory grows with the largest titles in flight rather than the
+        largest part.
+        """
         titles_to_process = title_numbers or CFR_TITLES
         results = {}
         
-        logger.info(f"Starting scrape of {len(titles_to_process)} CFR titles")
-        
-        with tqdm(total=len(titles_to_process), desc="Processing titles") as pbar:
-            for title_number in titles_to_process:
-                try:
-                    pbar.set_description(f"Processing Title {title_number}")
-                    
-                    # Download XML file
-                    xml_file = self.download_title_xml(title_number, force_download)
-                    if xml_file is None:
-                        logger.error(f"Failed to download title {title_number}")
-                        results[title_number] = 0
-                        continue
-                    
-                    # Parse and store data
-                    records_count = self.parse_title_xml(xml_file, title_number)
-                    results[title_number] = records_count
-                    
-                    logger.info(f"Completed title {title_number}: {records_count} records")
-                    
-                except Exception as e:
-                    logger.error(f"Failed to process title {title_number}: {e}")
-                    results[title_number] = 0
+        logger.info(f"Starting scrape of {len(titles_to_process)} CFR titles "
+                   f"with {max_workers} download workers and {parse_workers} parse workers")
+        
+        parse_pool = log_listener = None
+        if parse_workers > 1:
+            # Spawned rather than forked: download threads are already running
+            context = multiprocessing.get_context('spawn')
+            log_queue = context.Queue()
+            log_listener = start_worker_log_listener(log_queue)
+            parse_pool = ProcessPoolExecutor(
+                max_workers=parse_workers,
+                mp_context=context,
+                initializer=_init_parse_worker,
+                initargs=(log_queue, logging.getLogger().getEffectiveLevel()),
+            )
+        # Each future maps to (title_number, xml_file); xml_file is None while downloading
+        pending = {}
+        
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="download") as executor, \
+                    tqdm(total=len(titles_to_process), desc="Processing titles") as pbar:
+                for title_number in titles_to_process:
+                    download = executor.submit(
+                        self.download_title_xml, title_number, force_download, validate=False
+                    )
+                    pending[download] = (title_number, None)
                 
-                finally:
-                    pbar.update(1)
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        self._complete_future(future, pending, parse_pool, results, pbar)
+        finally:
+            if parse_pool is not None:
+                for future in pending:
+                    future.cancel()
+                parse_pool.shutdown()
+                # Workers have exited, so every record they logged is queued
+                log_listener.stop()
         
         total_records = sum(results.values())
         successful_titles = sum(1 for count in results.values() if count > 0)
@@ -460,32 +936,145 @@ class ECFRScraper:
         return results
     
     def check_for_updates(self, title_number: int) -> bool:
-        """Check if a title has been updated since last scrape"""
+        """Check if a title has been updated since last scrape
+        
+        A conditional HEAD request answers when it can; the file is only
+        downloaded and hashed when the server's version is unavailable.
+        """
         try:
             metadata = self.database.get_scraping_metadata(title_number)
             if not metadata:
                 return True  # Never scraped before
             
+            _, version = self.head_title_version(title_number, metadata.get('etag'))
+            if version is not None:
+                return self._is_updated(metadata, version)
+            
             # Download current file to compare hash
             xml_file = self.download_title_xml(title_number, force_download=True)
             if not xml_file:
                 return False
             
-            current_hash = calculate_file_hash(xml_file)
+            current_hash = self._file_hashes.get(title_number) or calculate_file_hash(xml_file)
             return current_hash != metadata.get('file_hash')
             
         except Exception as e:
             logger.error(f"Error checking updates for title {title_number}: {e}")
             return True  # Assume updated on error
     
+    def head_title_version(self, title_number: int,
+                           etag: Optional[str] = None) -> Tuple[int, Optional[Dict[str, Any]]]:
+        """Fetch the remote version of a title's XML with a HEAD request
+        
+        Returns (title_number, version) where version holds the
+        Last-Modified time (UTC) and Content-Length, or None on failure.
+        With a stored etag the server can answer 304, reported as
+        version['not_modified'].
+        """
+        try:
+            headers = {'If-None-Match': etag} if etag else None
+            # Shared with downloads, so concurrent checks keep to the request rate
+            self._rate_limiter.wait()
+            response = self.session.head(
+                self._title_xml_url(title_number), headers=headers,
+                timeout=REQUEST_TIMEOUT, allow_redirects=True
+            )
+            if response.status_code == 304:
+                return title_number, {'not_modified': True}
+            response.raise_for_status()
+            
+            last_modified = response.headers.get('Last-Modified')
+            content_length = response.headers.get('Content-Length')
+            return title_number, {
+                'not_modified': False,
+                'etag': response.headers.get('ETag'),
+                'last_modified': parsedate_to_datetime(last_modified) if last_modified else None,
+                'content_length': int(content_length) if content_length else None,
+            }
+        
+        except (requests.exceptions.RequestException, TypeError, ValueError) as e:
+            logger.warning(f"HEAD check failed for title {title_number}: {e}")
+            return title_number, None
+    
+    def collection_modified_since(self, since: datetime) -> bool:
+        """Check whether the eCFR bulk data collection changed after a UTC time
+        
+        One conditional HEAD of the collection listing, so no body is
+        transferred; a 304 answers for every title at once. Any other
+        outcome counts as modified.
+        """
+        try:
+            self._rate_limiter.wait()
+            response = self.session.head(
+                GOVINFO_BASE_URL, timeout=REQUEST_TIMEOUT, allow_redirects=True,
+                headers={'If-Modified-Since': format_datetime(since.replace(tzinfo=timezone.utc), usegmt=True)},
+            )
+            return response.status_code != 304
+        
+        except requests.exceptions.RequestException as e:
+            logger.warning(f"Collection freshness check failed: {e}")
+            return True
+    
+    def check_titles_for_updates(self, title_numbers: Optional[List[int]] = None,
+                                 max_workers: int = UPDATE_CHECK_WORKERS) -> Dict[int, bool]:
+        """Check many titles for updates without downloading them
+        
+        Stored metadata is read with one query. When every title has been
+        scraped and the collection is unchanged since the oldest scrape, no
+        per-title requests are made. Otherwise conditional HEAD requests
+        run concurrently. A title counts as updated when it was never
+        scraped successfully, its ETag, size or modification time changed,
+        or its version could not be determined.
+        """
+        title_numbers = list(title_numbers or CFR_TITLES)
+        metadata = self.database.get_all_scraping_metadata(title_numbers)
+        
+        scraped = [metadata.get(t) for t in title_numbers]
+        if all(m and m.get('scraping_status') == 'completed' for m in scraped):
+            oldest = min(datetime.fromisoformat(str(m['last_scraped'])) for m in scraped)
+            if not self.collection_modified_since(oldest):
+                logger.info("eCFR collection unchanged since last scrape")
+                return dict.fromkeys(title_numbers, False)
+        
+        etags = [(metadata.get(t) or {}).get('etag') for t in title_numbers]
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="head") as executor:
+            versions = dict(executor.map(self.head_title_version, title_numbers, etags))
+        
+        return {
+            title_number: self._is_updated(metadata.get(title_number), versions[title_number])
+            for title_number in title_numbers
+        }
+    
+    def _is_updated(self, metadata: Optional[Dict[str, Any]],
+                    version: Optional[Dict[str, Any]]) -> bool:
+        """Compare stored scrape metadata with a remote version"""
+        if not metadata or metadata.get('scraping_status') != 'completed' or version is None:
+            return True
+        
+        if version['not_modified']:
+            return False
+        
+        if metadata.get('etag') and version['etag']:
+            return metadata['etag'] != version['etag']
+        
+        content_length = version['content_length']
+        if content_length is not None and content_length != metadata.get('file_size'):
+            return True
+        
+        last_modified = version['last_modified']
+        if last_modified is None:
+            return content_length is None
+        
+        # last_scraped is stored by SQLite as naive UTC
+        last_scraped = datetime.fromisoformat(str(metadata['last_scraped']))
+        return last_modified.astimezone(timezone.utc).replace(tzinfo=None) > last_scraped
+    
     def incremental_update(self) -> Dict[int, int]:
         """Perform incremental update of changed titles only"""
         logger.info("Starting incremental update check")
         
-        updated_titles = []
-        for title_number in CFR_TITLES:
-            if self.check_for_updates(title_number):
-                updated_titles.append(title_number)
+        updates = self.check_titles_for_updates(CFR_TITLES)
+        updated_titles = [t for t, updated in updates.items() if updated]
         
         if not updated_titles:
             logger.info("No titles need updating")
@@ -497,4 +1086,5 @@ class ECFRScraper:
     def close(self):
         """Clean up resources"""
         if self.session:
+            # Closes the pooled connections held by the mounted adapters
             self.session.close()
\ No newline at end of file
@@ -48,29 +48,29 @@ def populated_database(test_database):
     """Create a test database with sample data"""
     db = test_database
     
-    # Add test data
-    title_id = db.get_or_create_title(1, "Test Title 1")
-    chapter_id = db.get_or_create_chapter(title_id, "I", "Test Chapter I")
-    subchapter_id = db.get_or_create_subchapter(chapter_id, "A", "Test Subchapter A")
-    part_id = db.get_or_create_part(chapter_id, subchapter_id, 1, "Test Part 1")
-    
-    db.insert_section(
-        part_id, "1.1", "Test Section",
-        "This is a test section with sample content for testing purposes."
-    )
-    db.insert_section(
-        part_id, "1.2", "Another Section",
-        "This is another test section with different content and keywords."
-    )
-    
-    # Add more complex data
-    part_id_2 = db.get_or_create_part(chapter_id, subchapter_id, 2, "Test Part 2")
-    db.insert_section(
-        part_id_2, "2.1", "Definitions",
-        "This section contains important definitions for regulatory terms."
-    )
+    # Add test data in one transaction
+    with db.bulk_transaction():
+        title_id = db.get_or_create_title(1, "Test Title 1")
+        chapter_id = db.get_or_create_chapter(title_id, "I", "Test Chapter I")
+        subchapter_id = db.get_or_create_subchapter(chapter_id, "A", "Test Subchapter A")
+        part_id = db.get_or_create_part(chapter_id, subchapter_id, 1, "Test Part 1")
+        
+        db.insert_section(
+            part_id, "1.1", "Test Section",
+            "This is a test section with sample content for testing purposes."
+        )
+        db.insert_section(
+            part_id, "1.2", "Another Section",
+            "This is another test section with different content and keywords."
+        )
+        
+        # Add more complex data
+        part_id_2 = db.get_or_create_part(chapter_id, subchapter_id, 2, "Test Part 2")
+        db.insert_section(
+            part_id_2, "2.1", "Definitions",
+            "This section contains important definitions for regulatory terms."
+        )
     
-    db.connection.commit()
     yield db
 
 
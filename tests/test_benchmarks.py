@@ -0,0 +1,69 @@
+"""
+Microbenchmarks for hot paths, run with pytest-benchmark
+
+Save a baseline and compare later runs against it:
+    pytest tests/test_benchmarks.py --benchmark-autosave
+    pytest tests/test_benchmarks.py --benchmark-compare --benchmark-compare-fail=mean:10%
+
+Add --benchmark-cprofile=tottime to print a profile of each benchmark.
+"""
+
+import unittest
+
+try:
+    import pytest
+    import pytest_benchmark  # noqa: F401
+except ImportError:
+    # SkipTest skips the module under both pytest and unittest discovery
+    raise unittest.SkipTest("pytest-benchmark is not installed")
+
+from src.database import calculate_file_hash
+
+pytestmark = pytest.mark.slow
+
+
+def test_bench_calculate_file_hash(benchmark, temp_dir):
+    """Hash a 10 MB file"""
+    xml_file = temp_dir / "bench.xml"
+    xml_file.write_bytes(b"<P>" + b"x" * (10 * 1024 * 1024) + b"</P>")
+    
+    digest = benchmark(calculate_file_hash, xml_file)
+    assert len(digest) == 64
+
+
+def test_bench_search_sections(benchmark, populated_database):
+    """Full-text search over the sample sections"""
+    results = benchmark(populated_database.search_sections, "section")
+    assert results
+
+
+def test_bench_search_large_result_set(benchmark, test_database):
+    """Full-text search capped at 100 hits among 10,000 matching sections"""
+    db = test_database
+    with db.bulk_transaction():
+        title_id = db.get_or_create_title(1, "Test Title 1")
+        chapter_id = db.get_or_create_chapter(title_id, "I", "Test Chapter I")
+        part_id = db.get_or_create_part(chapter_id, None, 1, "Test Part 1")
+    db.bulk_insert_sections(
+        (part_id, f"1.{i}", f"Section {i}",
+         f"Agencies must keep record {i} and must report it within {i % 30} days.",
+         None, None, None)
+        for i in range(10000)
+    )
+    
+    results = benchmark(db.search_sections, "must", limit=100)
+    assert len(results) == 100
+
+
+def test_bench_get_or_create_existing(benchmark, populated_database):
+    """Look up an existing part through the title, chapter and subchapter"""
+    db = populated_database
+    
+    def lookup():
+        title_id = db.get_or_create_title(1, "Test Title 1")
+        chapter_id = db.get_or_create_chapter(title_id, "I", "Test Chapter I")
+        subchapter_id = db.get_or_create_subchapter(chapter_id, "A", "Test Subchapter A")
+        return db.get_or_create_part(chapter_id, subchapter_id, 1, "Test Part 1")
+    
+    part_id = benchmark(lookup)
+    assert part_id == lookup()
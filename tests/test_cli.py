@@ -5,11 +5,43 @@ Integration tests for CLI commands
 import unittest
 import tempfile
 import shutil
-import subprocess
 import json
+import logging
 from pathlib import Path
 from unittest.mock import patch
 
+import requests
+from click.testing import CliRunner
+
+from config.settings import settings
+from src.main import cli
+
+
+def _make_runner() -> CliRunner:
+    """Runner keeping stderr apart from stdout"""
+    try:
+        return CliRunner(mix_stderr=False)  # Click < 8.2 mixes them by default
+    except TypeError:
+        return CliRunner()
+
+
+def invoke_cli(args, env):
+    """Run the CLI in this interpreter, as `python -m src.main` would with env set
+    
+    Settings are resolved from the environment once per process, so the
+    cache is cleared around the call. The root logger handlers installed
+    by the command are removed afterwards.
+    """
+    root_logger = logging.getLogger()
+    handlers, level = root_logger.handlers[:], root_logger.level
+    settings.cache_clear()
+    try:
+        return _make_runner().invoke(cli, args, env=env, catch_exceptions=False)
+    finally:
+        settings.cache_clear()
+        root_logger.handlers[:] = handlers
+        root_logger.setLevel(level)
+
 
 class TestCLICommands(unittest.TestCase):
     """Test cases for CLI command integration"""
@@ -31,19 +63,13 @@ class TestCLICommands(unittest.TestCase):
     
     def run_cli_command(self, args, expect_success=True):
         """Helper to run CLI commands"""
-        cmd = ['python', '-m', 'src.main'] + args
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            env={**self.env_vars, 'PATH': subprocess.os.environ.get('PATH', '')}
-        )
+        result = invoke_cli(args, self.env_vars)
         
         if expect_success:
-            if result.returncode != 0:
+            if result.exit_code != 0:
                 print(f"STDOUT: {result.stdout}")
                 print(f"STDERR: {result.stderr}")
-            self.assertEqual(result.returncode, 0, f"Command failed: {' '.join(args)}")
+            self.assertEqual(result.exit_code, 0, f"Command failed: {' '.join(args)}")
         
         return result
     
@@ -68,45 +94,6 @@ class TestCLICommands(unittest.TestCase):
         result = self.run_cli_command(['init-db', '--force'])
         self.assertIn('Database initialized successfully', result.stdout)
     
-    def test_stats_empty_database(self):
-        """Test stats command on empty database"""
-        self.run_cli_command(['init-db'])
-        result = self.run_cli_command(['stats'])
-        
-        self.assertIn('Database Statistics', result.stdout)
-        self.assertIn('Titles      : 0', result.stdout)
-        self.assertIn('Chapters    : 0', result.stdout)
-        self.assertIn('Parts       : 0', result.stdout)
-        self.assertIn('Sections    : 0', result.stdout)
-    
-    def test_list_titles_empty(self):
-        """Test list-titles command on empty database"""
-        self.run_cli_command(['init-db'])
-        result = self.run_cli_command(['list-titles'])
-        
-        self.assertIn('CFR Titles in Database', result.stdout)
-        self.assertIn('Title  Sections   Status', result.stdout)
-    
-    def test_search_empty_database(self):
-        """Test search command on empty database"""
-        self.run_cli_command(['init-db'])
-        result = self.run_cli_command(['search', 'test'])
-        
-        self.assertIn('No results found', result.stdout)
-    
-    def test_search_json_format(self):
-        """Test search command with JSON output"""
-        self.run_cli_command(['init-db'])
-        result = self.run_cli_command(['search', 'test', '--format', 'json'])
-        
-        # Should be valid JSON (empty array)
-        try:
-            data = json.loads(result.stdout.strip())
-            self.assertIsInstance(data, list)
-            self.assertEqual(len(data), 0)
-        except json.JSONDecodeError:
-            self.fail("Output is not valid JSON")
-    
     def test_backup_command(self):
         """Test database backup command"""
         self.run_cli_command(['init-db'])
@@ -138,7 +125,7 @@ class TestCLICommands(unittest.TestCase):
     def test_invalid_command(self):
         """Test invalid command handling"""
         result = self.run_cli_command(['invalid-command'], expect_success=False)
-        self.assertNotEqual(result.returncode, 0)
+        self.assertNotEqual(result.exit_code, 0)
         self.assertIn('No such command', result.stderr)
     
     def test_scrape_invalid_titles(self):
@@ -146,31 +133,101 @@ class TestCLICommands(unittest.TestCase):
         self.run_cli_command(['init-db'])
         result = self.run_cli_command(['scrape', '--titles', '999'], expect_success=False)
         
-        self.assertNotEqual(result.returncode, 0)
+        self.assertNotEqual(result.exit_code, 0)
         self.assertIn('Invalid CFR titles', result.stderr)
     
-    def test_scrape_valid_titles_format(self):
+    @patch('src.scraper.RateLimiter.wait')
+    @patch('src.scraper.requests.Session.request',
+           side_effect=requests.exceptions.ConnectionError("offline"))
+    def test_scrape_valid_titles_format(self, mock_request, mock_wait):
         """Test scrape command with valid title format (without actual scraping)"""
         self.run_cli_command(['init-db'])
         
-        # This will fail because we don't have internet access in tests,
-        # but it should pass the title validation
+        # Requests fail immediately, but the titles should pass validation
         result = self.run_cli_command(['scrape', '--titles', '1,2,3'], expect_success=False)
         
         # Should not fail on title validation
         self.assertNotIn('Invalid CFR titles', result.stderr)
     
-    def test_check_updates_command(self):
+    @patch('src.scraper.requests.Session.request',
+           side_effect=requests.exceptions.ConnectionError("offline"))
+    def test_check_updates_command(self, mock_request):
         """Test check-updates command"""
         self.run_cli_command(['init-db'])
         
-        # This will fail due to network, but should validate titles
+        # Requests fail immediately, but the titles should be validated
         result = self.run_cli_command(['check-updates', '--titles', '1'], expect_success=False)
         self.assertNotIn('Invalid CFR titles', result.stderr)
+
+
+class TestCLIEmptyDatabase(unittest.TestCase):
+    """Read-only CLI commands against one initialized, empty database"""
+    
+    @classmethod
+    def setUpClass(cls):
+        """Initialize the database once for the whole class"""
+        cls.test_dir = Path(tempfile.mkdtemp())
+        cls.db_path = cls.test_dir / "test_ecfr.db"
+        cls.env_vars = {
+            'ECFR_DB_PATH': str(cls.db_path),
+            'ECFR_DATA_DIR': str(cls.test_dir)
+        }
+        result = invoke_cli(['init-db'], cls.env_vars)
+        assert result.exit_code == 0, result.stderr
+    
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up test environment"""
+        shutil.rmtree(cls.test_dir)
+    
+    def run_cli_command(self, args):
+        """Helper to run CLI commands"""
+        result = invoke_cli(args, self.env_vars)
+        
+        if result.exit_code != 0:
+            print(f"STDOUT: {result.stdout}")
+            print(f"STDERR: {result.stderr}")
+        self.assertEqual(result.exit_code, 0, f"Command failed: {' '.join(args)}")
+        
+        return result
+    
+    def test_stats_empty_database(self):
+        """Test stats command on empty database"""
+        result = self.run_cli_command(['stats'])
+        
+        self.assertIn('Database Statistics', result.stdout)
+        self.assertIn('Titles      : 0', result.stdout)
+        self.assertIn('Chapters    : 0', result.stdout)
+        self.assertIn('Parts       : 0', result.stdout)
+        self.assertIn('Sections    : 0', result.stdout)
+    
+    def test_list_titles_empty(self):
+        """Test list-titles command on empty database"""
+        result = self.run_cli_command(['list-titles'])
+        
+        self.assertIn('CFR Titles in Database', result.stdout)
+        self.assertIn('Title  Sections   Status', result.stdout)
+    
+    def test_search_empty_database(self):
+        """Test search command on empty database"""
+        result = self.run_cli_command(['search', 'test'])
+        
+        self.assertIn('No results found', result.stdout)
+    
+    def test_search_json_format(self):
+        """Test search command with JSON output"""
+        result = self.run_cli_command(['search', 'test', '--format', 'json'])
+        
+        # Should be valid JSON (empty array)
+        try:
+            data = json.loads(result.stdout.strip())
+            self.assertIsInstance(data, list)
+            self.assertEqual(len(data), 0)
+        except json.JSONDecodeError:
+            self.fail("Output is not valid JSON")
     
     def test_list_titles_specific(self):
         """Test list-titles command with specific title"""
-        self.run_cli_command(['init-db'])
         result = self.run_cli_command(['list-titles', '--title', '999'])
         
         self.assertIn('not found in database', result.stdout)
@@ -190,12 +247,7 @@ class TestCLIErrorHandling(unittest.TestCase):
     
     def run_cli_command(self, args, env_vars=None):
         """Helper to run CLI commands"""
-        cmd = ['python', '-m', 'src.main'] + args
-        env = env_vars or {}
-        env['PATH'] = subprocess.os.environ.get('PATH', '')
-        
-        result = subprocess.run(cmd, capture_output=True, text=True, env=env)
-        return result
+        return invoke_cli(args, env_vars or {})
     
     def test_stats_no_database(self):
         """Test stats command without database"""
@@ -205,7 +257,7 @@ class TestCLIErrorHandling(unittest.TestCase):
         }
         
         result = self.run_cli_command(['stats'], env_vars)
-        self.assertNotEqual(result.returncode, 0)
+        self.assertNotEqual(result.exit_code, 0)
     
     def test_search_no_database(self):
         """Test search command without database"""
@@ -215,7 +267,7 @@ class TestCLIErrorHandling(unittest.TestCase):
         }
         
         result = self.run_cli_command(['search', 'test'], env_vars)
-        self.assertNotEqual(result.returncode, 0)
+        self.assertNotEqual(result.exit_code, 0)
     
     def test_scrape_no_database(self):
         """Test scrape command without initialized database"""
@@ -225,33 +277,44 @@ class TestCLIErrorHandling(unittest.TestCase):
         }
         
         result = self.run_cli_command(['scrape', '--titles', '1'], env_vars)
-        self.assertNotEqual(result.returncode, 0)
+        self.assertNotEqual(result.exit_code, 0)
         self.assertIn('not initialized', result.stderr)
 
 
 class TestCLIWithMockData(unittest.TestCase):
     """Test CLI commands with mock data"""
     
-    def setUp(self):
-        """Set up test environment with data"""
-        self.test_dir = Path(tempfile.mkdtemp())
-        self.db_path = self.test_dir / "test_ecfr.db"
+    @classmethod
+    def setUpClass(cls):
+        """Build the test data once in a template database"""
+        cls.template_dir = Path(tempfile.mkdtemp())
+        cls.template_path = cls.template_dir / "template.db"
         
-        # Set up database with test data
         from src.database import ECFRDatabase
-        self.db = ECFRDatabase(self.db_path)
-        self.db.connect()
-        self.db.initialize_schema()
+        db = ECFRDatabase(cls.template_path)
+        db.connect()
+        db.initialize_schema()
         
-        # Add test data
-        title_id = self.db.get_or_create_title(1, "Test Title 1")
-        chapter_id = self.db.get_or_create_chapter(title_id, "I", "Test Chapter I")
-        part_id = self.db.get_or_create_part(chapter_id, None, 1, "Test Part 1")
-        self.db.insert_section(
-            part_id, "1.1", "Test Section", "This section contains test definitions and rules"
-        )
-        self.db.connection.commit()
-        self.db.disconnect()
+        # Add test data in one transaction
+        with db.bulk_transaction():
+            title_id = db.get_or_create_title(1, "Test Title 1")
+            chapter_id = db.get_or_create_chapter(title_id, "I", "Test Chapter I")
+            part_id = db.get_or_create_part(chapter_id, None, 1, "Test Part 1")
+            db.insert_section(
+                part_id, "1.1", "Test Section", "This section contains test definitions and rules"
+            )
+        db.disconnect()
+    
+    @classmethod
+    def tearDownClass(cls):
+        """Remove the template database"""
+        shutil.rmtree(cls.template_dir)
+    
+    def setUp(self):
+        """Set up test environment with a copy of the template data"""
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.db_path = self.test_dir / "test_ecfr.db"
+        shutil.copyfile(self.template_path, self.db_path)
         
         self.env_vars = {
             'ECFR_DB_PATH': str(self.db_path),
@@ -264,15 +327,9 @@ class TestCLIWithMockData(unittest.TestCase):
     
     def run_cli_command(self, args):
         """Helper to run CLI commands"""
-        cmd = ['python', '-m', 'src.main'] + args
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            env={**self.env_vars, 'PATH': subprocess.os.environ.get('PATH', '')}
-        )
+        result = invoke_cli(args, self.env_vars)
         
-        if result.returncode != 0:
+        if result.exit_code != 0:
             print(f"STDOUT: {result.stdout}")
             print(f"STDERR: {result.stderr}")
         
@@ -282,7 +339,7 @@ class TestCLIWithMockData(unittest.TestCase):
         """Test stats command with actual data"""
         result = self.run_cli_command(['stats'])
         
-        self.assertEqual(result.returncode, 0)
+        self.assertEqual(result.exit_code, 0)
         self.assertIn('Titles      : 1', result.stdout)
         self.assertIn('Chapters    : 1', result.stdout)
         self.assertIn('Parts       : 1', result.stdout)
@@ -292,7 +349,7 @@ class TestCLIWithMockData(unittest.TestCase):
         """Test list-titles command with actual data"""
         result = self.run_cli_command(['list-titles'])
         
-        self.assertEqual(result.returncode, 0)
+        self.assertEqual(result.exit_code, 0)
         self.assertIn('Test Title 1', result.stdout)
         self.assertIn('1      1', result.stdout)  # Title 1 with 1 section
     
@@ -300,7 +357,7 @@ class TestCLIWithMockData(unittest.TestCase):
         """Test list-titles command for specific title"""
         result = self.run_cli_command(['list-titles', '--title', '1'])
         
-        self.assertEqual(result.returncode, 0)
+        self.assertEqual(result.exit_code, 0)
         self.assertIn('CFR Title 1: Test Title 1', result.stdout)
         self.assertIn('Chapters: 1', result.stdout)
         self.assertIn('Parts: 1', result.stdout)
@@ -310,7 +367,7 @@ class TestCLIWithMockData(unittest.TestCase):
         """Test search command with actual data"""
         result = self.run_cli_command(['search', 'definitions'])
         
-        self.assertEqual(result.returncode, 0)
+        self.assertEqual(result.exit_code, 0)
         self.assertIn("Found 1 results for 'definitions'", result.stdout)
         self.assertIn('Test Section', result.stdout)
         self.assertIn('1.1', result.stdout)
@@ -319,7 +376,7 @@ class TestCLIWithMockData(unittest.TestCase):
         """Test search command with JSON output and data"""
         result = self.run_cli_command(['search', 'test', '--format', 'json'])
         
-        self.assertEqual(result.returncode, 0)
+        self.assertEqual(result.exit_code, 0)
         
         # Parse JSON output
         data = json.loads(result.stdout.strip())
@@ -3,24 +3,43 @@ Unit tests for database operations
 """
 
 import unittest
+import sqlite3
 import tempfile
 import shutil
 from pathlib import Path
 from datetime import datetime
 
-from src.database import ECFRDatabase, DatabaseError, calculate_file_hash
+from config.settings import DB_SCHEMA_PATH
+from src.database import (
+    ECFRDatabase, DatabaseError, SCHEMA_VERSION, calculate_file_hash
+)
 
 
 class TestECFRDatabase(unittest.TestCase):
     """Test cases for ECFRDatabase class"""
     
+    @classmethod
+    def setUpClass(cls):
+        """Initialize the schema once in a template database"""
+        cls.template_dir = Path(tempfile.mkdtemp())
+        cls.template_path = cls.template_dir / "template.db"
+        template = ECFRDatabase(cls.template_path)
+        template.connect()
+        template.initialize_schema()
+        template.disconnect()
+    
+    @classmethod
+    def tearDownClass(cls):
+        """Remove the template database"""
+        shutil.rmtree(cls.template_dir)
+    
     def setUp(self):
-        """Set up test database"""
+        """Set up test database as a copy of the template"""
         self.test_dir = Path(tempfile.mkdtemp())
         self.db_path = self.test_dir / "test_ecfr.db"
+        shutil.copyfile(self.template_path, self.db_path)
         self.db = ECFRDatabase(self.db_path)
         self.db.connect()
-        self.db.initialize_schema()
     
     def tearDown(self):
         """Clean up test database"""
@@ -43,6 +62,165 @@ class TestECFRDatabase(unittest.TestCase):
         
         self.assertTrue(expected_tables.issubset(tables))
     
+    def test_is_initialized(self):
+        """Test schema detection on initialized and empty databases"""
+        self.assertTrue(self.db.is_initialized())
+        
+        empty_db = ECFRDatabase(self.test_dir / "empty.db")
+        empty_db.connect()
+        self.assertFalse(empty_db.is_initialized())
+        empty_db.disconnect()
+    
+    def test_initialize_schema_idempotent(self):
+        """Test re-running schema setup keeps data and records the version"""
+        conn = self.db.connection
+        self.assertEqual(conn.execute("PRAGMA user_version").fetchone()[0], SCHEMA_VERSION)
+        
+        self.db.get_or_create_title(1, "Test Title")
+        self.assertTrue(self.db.initialize_schema())
+        
+        # Schema script is safe to replay over an existing database
+        conn.executescript(DB_SCHEMA_PATH.read_text(encoding='utf-8'))
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM titles").fetchone()[0], 1)
+        self.assertEqual(self.db.get_database_stats()['titles'], 1)
+    
+    def test_initialize_schema_force(self):
+        """Test forced schema setup drops existing data"""
+        title_id = self.db.get_or_create_title(1, "Test Title")
+        chapter_id = self.db.get_or_create_chapter(title_id, "I", "Test Chapter")
+        part_id = self.db.get_or_create_part(chapter_id, None, 1, "Test Part")
+        self.db.insert_section(part_id, "1.1", "Heading", "Searchable content")
+        
+        self.assertTrue(self.db.initialize_schema(force=True))
+        
+        stats = self.db.get_database_stats()
+        self.assertEqual(stats['titles'], 0)
+        self.assertEqual(stats['sections'], 0)
+        self.assertEqual(self.db.search_sections("Searchable"), [])
+        self.assertEqual(
+            self.db.connection.execute("PRAGMA foreign_keys").fetchone()[0], 1
+        )
+    
+    def test_title_counters(self):
+        """Test per-title counters follow inserts and cascading deletes"""
+        title_id = self.db.get_or_create_title(1, "Test Title")
+        chapter_id = self.db.get_or_create_chapter(title_id, "I", "Test Chapter")
+        subchapter_id = self.db.get_or_create_subchapter(chapter_id, "A", "Test Subchapter")
+        part_id = self.db.get_or_create_part(chapter_id, subchapter_id, 1, "Test Part")
+        self.db.insert_section(part_id, "1.1", "First", "Content")
+        self.db.insert_section(part_id, "1.2", "Second", "Content")
+        
+        counts_sql = """SELECT chapters_count, subchapters_count, parts_count, sections_count
+                        FROM titles WHERE id = ?"""
+        conn = self.db.connection
+        self.assertEqual(tuple(conn.execute(counts_sql, (title_id,)).fetchone()), (1, 1, 1, 2))
+        
+        conn.execute("DELETE FROM sections WHERE section_number = '1.2'")
+        self.assertEqual(tuple(conn.execute(counts_sql, (title_id,)).fetchone()), (1, 1, 1, 1))
+        
+        conn.execute("DELETE FROM chapters WHERE id = ?", (chapter_id,))
+        self.assertEqual(tuple(conn.execute(counts_sql, (title_id,)).fetchone()), (0, 0, 0, 0))
+    
+    def test_migrate_title_counters(self):
+        """Test a version 1 database is migrated, with backfilled title counters"""
+        if sqlite3.sqlite_version_info < (3, 35, 0):
+            self.skipTest("ALTER TABLE DROP COLUMN requires SQLite 3.35")
+        
+        title_id = self.db.get_or_create_title(1, "Test Title")
+        chapter_id = self.db.get_or_create_chapter(title_id, "I", "Test Chapter")
+        part_id = self.db.get_or_create_part(chapter_id, None, 1, "Test Part")
+        self.db.insert_section(part_id, "1.1", "First", "Content")
+        
+        # Rebuild the version 1 layout of titles
+        conn = self.db.connection
+        triggers = conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE '%title_count%'"
+        ).fetchall()
+        for (name,) in triggers:
+            conn.execute(f"DROP TRIGGER {name}")
+        for column in ('chapters_count', 'subchapters_count', 'parts_count', 'sections_count'):
+            conn.execute(f"ALTER TABLE titles DROP COLUMN {column}")
+        conn.execute("ALTER TABLE scraping_metadata DROP COLUMN etag")
+        conn.execute("ALTER TABLE scraping_metadata DROP COLUMN file_mtime_ns")
+        conn.execute("PRAGMA user_version=1")
+        
+        self.assertTrue(self.db.initialize_schema())
+        
+        self.assertEqual(conn.execute("PRAGMA user_version").fetchone()[0], SCHEMA_VERSION)
+        row = conn.execute(
+            "SELECT chapters_count, parts_count, sections_count FROM titles WHERE id = ?",
+            (title_id,)
+        ).fetchone()
+        self.assertEqual(tuple(row), (1, 1, 1))
+        
+        # Triggers are back in place after the migration
+        self.db.insert_section(part_id, "1.2", "Second", "Content")
+        self.assertEqual(
+            conn.execute("SELECT sections_count FROM titles WHERE id = ?", (title_id,)).fetchone()[0], 2
+        )
+    
+    def test_migrate_recreates_fts_index(self):
+        """Test a pre-trigram FTS table and its triggers are replaced and rebuilt"""
+        title_id = self.db.get_or_create_title(1, "Test Title")
+        chapter_id = self.db.get_or_create_chapter(title_id, "I", "Test Chapter")
+        part_id = self.db.get_or_create_part(chapter_id, None, 1, "Test Part")
+        self.db.insert_section(part_id, "1.1", "Definitions", "Rulemaking procedures")
+        
+        # Rebuild the version 6 layout: unicode61 tokens, unfiltered update trigger
+        conn = self.db.connection
+        conn.executescript("""
+            DROP TRIGGER sections_fts_insert;
+            DROP TRIGGER sections_fts_update;
+            DROP TRIGGER sections_fts_delete;
+            DROP TABLE sections_fts;
+            CREATE VIRTUAL TABLE sections_fts USING fts5(
+                section_heading, section_content, content='sections', content_rowid='id'
+            );
+            CREATE TRIGGER sections_fts_update AFTER UPDATE ON sections BEGIN
+                SELECT 1;
+            END;
+            PRAGMA user_version=6;
+        """)
+        
+        self.assertTrue(self.db.initialize_schema())
+        
+        schema = dict(conn.execute(
+            "SELECT name, sql FROM sqlite_master WHERE name LIKE 'sections_fts%'"
+        ).fetchall())
+        self.assertIn("trigram", schema['sections_fts'])
+        self.assertIn("UPDATE OF section_heading, section_content", schema['sections_fts_update'])
+        self.assertIn('sections_fts_insert', schema)
+        
+        # Existing rows are indexed, substring matches work
+        results = self.db.search_sections("making")
+        self.assertEqual([r['section_number'] for r in results], ["1.1"])
+    
+    def test_migrate_drops_redundant_indexes(self):
+        """Test indexes duplicating a UNIQUE constraint's leading column are dropped"""
+        conn = self.db.connection
+        conn.execute("CREATE INDEX idx_sections_part ON sections(part_id)")
+        conn.execute("PRAGMA user_version=5")
+        
+        self.assertTrue(self.db.initialize_schema())
+        
+        indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        self.assertNotIn('idx_sections_part', indexes)
+        self.assertIn('sqlite_autoindex_sections_1', indexes)
+        self.assertIn('idx_parts_subchapter', indexes)
+    
+    def test_connection_pragmas(self):
+        """Test connection-level PRAGMAs are applied"""
+        conn = self.db.connection
+        self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+        self.assertEqual(conn.execute("PRAGMA foreign_keys").fetchone()[0], 1)
+        self.assertEqual(conn.execute("PRAGMA cache_size").fetchone()[0], -262144)
+        self.assertEqual(conn.execute("PRAGMA busy_timeout").fetchone()[0], 30000)
+    
+    def test_lookup_queries_use_indexes(self):
+        """Test hierarchy lookups are served by indexes"""
+        # Raises DatabaseError if any lookup falls back to a table scan
+        self.db._assert_indexes()
+    
     def test_get_or_create_title(self):
         """Test title creation and retrieval"""
         # Create new title
@@ -135,6 +313,128 @@ class TestECFRDatabase(unittest.TestCase):
         self.assertEqual(row['section_heading'], "Updated Section")
         self.assertEqual(row['section_content'], "Updated content")
     
+    def test_bulk_insert_sections(self):
+        """Test bulk section insertion and updates"""
+        title_id = self.db.get_or_create_title(1, "Test Title")
+        chapter_id = self.db.get_or_create_chapter(title_id, "I", "Test Chapter")
+        part_id = self.db.get_or_create_part(chapter_id, None, 1, "Test Part")
+        
+        rows = [
+            (part_id, "1.1", "First Section", "First content", None, None, None),
+            (part_id, "1.2", "Second Section", "Second content", None, None, None),
+        ]
+        self.assertEqual(self.db.bulk_insert_sections(rows), 2)
+        
+        # Re-inserting updates rows in place
+        self.db.bulk_insert_sections([
+            (part_id, "1.1", "Updated Section", "Updated content", None, None, None)
+        ])
+        
+        cursor = self.db.connection.cursor()
+        cursor.execute(
+            "SELECT section_number, section_heading FROM sections ORDER BY section_number"
+        )
+        rows = [tuple(row) for row in cursor.fetchall()]
+        self.assertEqual(rows, [("1.1", "Updated Section"), ("1.2", "Second Section")])
+    
+    def test_bulk_insert_sections_rebuild_fts(self):
+        """Test bulk loading with a deferred full-text index rebuild"""
+        title_id = self.db.get_or_create_title(1, "Test Title")
+        chapter_id = self.db.get_or_create_chapter(title_id, "I", "Test Chapter")
+        part_id = self.db.get_or_create_part(chapter_id, None, 1, "Test Part")
+        
+        self.db.bulk_insert_sections([
+            (part_id, "1.1", "Definitions", "Important definitions", None, None, None),
+            (part_id, "1.2", "Scope", "General administrative rules", None, None, None),
+        ], rebuild_fts=True)
+        
+        results = self.db.search_sections("administrative")
+        self.assertEqual([r['section_number'] for r in results], ["1.2"])
+        
+        # Triggers are restored, so later single-row writes stay indexed
+        self.db.insert_section(part_id, "1.3", "Records", "Administrative records")
+        results = self.db.search_sections("administrative")
+        self.assertEqual(len(results), 2)
+    
+    def test_bulk_transaction(self):
+        """Test bulk transactions commit, roll back and nest"""
+        with self.db.bulk_transaction():
+            self.db.get_or_create_title(1, "Committed Title")
+        self.assertFalse(self.db.connection.in_transaction)
+        
+        with self.assertRaises(RuntimeError):
+            with self.db.bulk_transaction():
+                self.db.get_or_create_title(2, "Rolled Back Title")
+                raise RuntimeError("abort")
+        
+        with self.db.bulk_transaction():
+            self.db.get_or_create_title(3, "Outer Title")
+            with self.assertRaises(RuntimeError):
+                with self.db.bulk_transaction():
+                    self.db.get_or_create_title(4, "Inner Title")
+                    raise RuntimeError("abort inner")
+        
+        cursor = self.db.connection.cursor()
+        cursor.execute("SELECT title_number FROM titles ORDER BY title_number")
+        self.assertEqual([row[0] for row in cursor.fetchall()], [1, 3])
+    
+    def test_full_rebuild(self):
+        """Test full_rebuild relaxes durability and restores it afterwards"""
+        conn = self.db.connection
+        
+        with self.db.full_rebuild():
+            self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "off")
+            self.assertEqual(conn.execute("PRAGMA synchronous").fetchone()[0], 0)
+            self.assertEqual(conn.execute("PRAGMA foreign_keys").fetchone()[0], 0)
+            with self.db.bulk_transaction():
+                self.db.get_or_create_title(1, "Test Title")
+        
+        self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+        self.assertEqual(conn.execute("PRAGMA synchronous").fetchone()[0], 1)
+        self.assertEqual(conn.execute("PRAGMA foreign_keys").fetchone()[0], 1)
+        self.assertEqual(self.db.get_database_stats()['titles'], 1)
+        
+        # Settings are restored even when the rebuild fails
+        with self.assertRaises(RuntimeError):
+            with self.db.full_rebuild():
+                raise RuntimeError("boom")
+        self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+    
+    def test_fast_ingest(self):
+        """Test fast_ingest skips fsync but keeps WAL rollback for failed titles"""
+        conn = self.db.connection
+        
+        with self.db.fast_ingest():
+            self.assertEqual(conn.execute("PRAGMA main.journal_mode").fetchone()[0], "wal")
+            self.assertEqual(conn.execute("PRAGMA main.synchronous").fetchone()[0], 0)
+            with self.db.bulk_transaction():
+                self.db.get_or_create_title(1, "Test Title")
+            with self.assertRaises(RuntimeError):
+                with self.db.bulk_transaction():
+                    self.db.get_or_create_title(2, "Failed Title")
+                    raise RuntimeError("abort title")
+        
+        self.assertEqual(conn.execute("PRAGMA main.synchronous").fetchone()[0], 1)
+        self.assertEqual(conn.execute("PRAGMA integrity_check").fetchone()[0], "ok")
+        cursor = conn.execute("SELECT title_number FROM titles")
+        self.assertEqual([row[0] for row in cursor.fetchall()], [1])
+    
+    def test_full_rebuild_with_bulk_insert(self):
+        """Test full_rebuild exits cleanly after bulk_insert_sections created its temp table"""
+        with self.db.bulk_transaction():
+            title_id = self.db.get_or_create_title(1, "Test Title")
+            chapter_id = self.db.get_or_create_chapter(title_id, "I", "Test Chapter")
+            part_id = self.db.get_or_create_part(chapter_id, None, 1, "Test Part")
+        
+        with self.db.full_rebuild():
+            self.db.bulk_insert_sections([
+                (part_id, "1.1", "First", "Content", None, None, None),
+            ])
+        
+        conn = self.db.connection
+        self.assertEqual(conn.execute("PRAGMA main.journal_mode").fetchone()[0], "wal")
+        self.assertEqual(self.db.get_database_stats()['sections'], 1)
+    
     def test_scraping_metadata(self):
         """Test scraping metadata operations"""
         # Update metadata
@@ -155,6 +455,19 @@ class TestECFRDatabase(unittest.TestCase):
         no_metadata = self.db.get_scraping_metadata(999)
         self.assertIsNone(no_metadata)
     
+    def test_get_all_scraping_metadata(self):
+        """Test batched scraping metadata lookup"""
+        self.db.update_scraping_metadata(1, 'completed', 1024, 'hash-1', None, 10)
+        self.db.update_scraping_metadata(2, 'failed', None, None, 'Error', 0)
+        self.db.update_scraping_metadata(3, 'completed', 2048, 'hash-3', None, 20)
+        
+        metadata = self.db.get_all_scraping_metadata([1, 2, 999])
+        self.assertEqual(set(metadata), {1, 2})
+        self.assertEqual(metadata[1]['file_hash'], 'hash-1')
+        self.assertEqual(metadata[2]['scraping_status'], 'failed')
+        
+        self.assertEqual(set(self.db.get_all_scraping_metadata()), {1, 2, 3})
+    
     def test_database_stats(self):
         """Test database statistics"""
         # Add some test data
@@ -169,6 +482,21 @@ class TestECFRDatabase(unittest.TestCase):
         self.assertEqual(stats['parts'], 1)
         self.assertEqual(stats['sections'], 1)
     
+    def test_database_stats_after_delete(self):
+        """Test statistics follow cascading deletes"""
+        title_id = self.db.get_or_create_title(1, "Test Title")
+        chapter_id = self.db.get_or_create_chapter(title_id, "I", "Test Chapter")
+        part_id = self.db.get_or_create_part(chapter_id, None, 1, "Test Part")
+        self.db.insert_section(part_id, "1.1", "Test Section", "Test content")
+        
+        self.db.connection.execute("DELETE FROM titles WHERE id = ?", (title_id,))
+        
+        stats = self.db.get_database_stats()
+        self.assertEqual(stats['titles'], 0)
+        self.assertEqual(stats['chapters'], 0)
+        self.assertEqual(stats['parts'], 0)
+        self.assertEqual(stats['sections'], 0)
+    
     def test_search_sections(self):
         """Test full-text search functionality"""
         # Add test data
@@ -218,10 +546,77 @@ class TestECFRDatabase(unittest.TestCase):
         self.assertEqual(stats['titles'], 1)
         backup_db.disconnect()
     
+    def test_backup_database_overwrites(self):
+        """Test backup replaces an existing file and rejects the live database"""
+        backup_path = self.test_dir / "backup.db"
+        backup_path.write_bytes(b"stale")
+        
+        self.db.get_or_create_title(1, "Test Title")
+        self.db.backup_database(backup_path)
+        
+        backup_db = ECFRDatabase(backup_path)
+        backup_db.connect()
+        self.assertEqual(backup_db.get_database_stats()['titles'], 1)
+        backup_db.disconnect()
+        
+        with self.assertRaises(DatabaseError):
+            self.db.backup_database(self.db_path)
+    
+    def test_backup_database_online(self):
+        """Test incremental backup reports progress up to the full page count"""
+        self.db.get_or_create_title(1, "Test Title")
+        backup_path = self.test_dir / "backup.db"
+        reports = []
+        
+        self.db.backup_database(backup_path, progress=lambda copied, total: reports.append((copied, total)))
+        
+        self.assertTrue(reports)
+        copied, total = reports[-1]
+        self.assertEqual(copied, total)
+        
+        backup_db = ECFRDatabase(backup_path)
+        backup_db.connect()
+        self.assertEqual(backup_db.get_database_stats()['titles'], 1)
+        backup_db.disconnect()
+    
+    def test_failed_backup_keeps_previous(self):
+        """Test an interrupted backup leaves the previous backup in place"""
+        self.db.get_or_create_title(1, "Test Title")
+        backup_path = self.test_dir / "backup.db"
+        self.db.backup_database(backup_path)
+        previous = backup_path.read_bytes()
+        
+        def interrupt(copied, total):
+            raise KeyboardInterrupt
+        
+        self.db.get_or_create_title(2, "Second Title")
+        with self.assertRaises(KeyboardInterrupt):
+            self.db.backup_database(backup_path, progress=interrupt)
+        
+        self.assertEqual(backup_path.read_bytes(), previous)
+        self.assertFalse(backup_path.with_suffix('.db.tmp').exists())
+    
     def test_vacuum_database(self):
         """Test database vacuum operation"""
         # This should not raise an exception
         self.db.vacuum_database()
+    
+    def test_incremental_vacuum(self):
+        """Test new databases use incremental auto-vacuum and release free pages"""
+        conn = self.db.connection
+        self.assertEqual(conn.execute("PRAGMA auto_vacuum").fetchone()[0], 2)
+        
+        title_id = self.db.get_or_create_title(1, "Test Title")
+        chapter_id = self.db.get_or_create_chapter(title_id, "I", "Test Chapter")
+        part_id = self.db.get_or_create_part(chapter_id, None, 1, "Test Part")
+        self.db.bulk_insert_sections(
+            (part_id, f"1.{i}", "Heading", "x" * 2000, None, None, None) for i in range(200)
+        )
+        conn.execute("DELETE FROM sections")
+        self.assertGreater(conn.execute("PRAGMA freelist_count").fetchone()[0], 0)
+        
+        self.db.vacuum_database()
+        self.assertEqual(conn.execute("PRAGMA freelist_count").fetchone()[0], 0)
 
 
 class TestDatabaseUtilities(unittest.TestCase):
@@ -241,7 +636,7 @@ class TestDatabaseUtilities(unittest.TestCase):
         """Test file hash calculation"""
         hash1 = calculate_file_hash(self.test_file)
         self.assertIsInstance(hash1, str)
-        self.assertEqual(len(hash1), 32)  # MD5 hash length
+        self.assertEqual(len(hash1), 64)  # SHA-256 hash length
         
         # Same file should produce same hash
         hash2 = calculate_file_hash(self.test_file)
@@ -252,6 +647,13 @@ class TestDatabaseUtilities(unittest.TestCase):
         hash3 = calculate_file_hash(self.test_file)
         self.assertNotEqual(hash1, hash3)
     
+    def test_calculate_file_hash_empty(self):
+        """Test file hash calculation for an empty file"""
+        import hashlib
+        empty = self.test_dir / "empty.txt"
+        empty.touch()
+        self.assertEqual(calculate_file_hash(empty), hashlib.sha256(b"").hexdigest())
+    
     def test_calculate_file_hash_nonexistent(self):
         """Test file hash calculation for non-existent file"""
         nonexistent = self.test_dir / "nonexistent.txt"
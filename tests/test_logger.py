@@ -0,0 +1,49 @@
+"""
+Tests for logging setup
+"""
+
+import os
+import unittest
+import logging
+from unittest.mock import patch
+
+from config.settings import settings
+from src.logger import setup_logging
+
+
+class TestSetupLogging(unittest.TestCase):
+    """Test cases for setup_logging"""
+    
+    def setUp(self):
+        """Keep the root logger configuration to restore after each test"""
+        root_logger = logging.getLogger()
+        self.handlers, self.level = root_logger.handlers[:], root_logger.level
+        settings.cache_clear()
+    
+    def tearDown(self):
+        """Restore the root logger and drop settings resolved by the test"""
+        settings.cache_clear()
+        root_logger = logging.getLogger()
+        root_logger.handlers[:] = self.handlers
+        root_logger.setLevel(self.level)
+    
+    def test_default_level_from_settings(self):
+        """Test setup_logging without a level uses the level from settings"""
+        with patch.dict(os.environ, {'ECFR_DEBUG': ''}):
+            with self.assertLogs('src.logger', 'INFO') as logs:
+                setup_logging(log_to_file=False)
+        
+        self.assertEqual(logging.getLogger().level, logging.INFO)
+        self.assertIn('Logging initialized - Level: INFO', logs.output[0])
+    
+    def test_explicit_level(self):
+        """Test an explicit level overrides settings"""
+        with self.assertLogs('src.logger', 'INFO') as logs:
+            setup_logging('debug', log_to_file=False)
+        
+        self.assertEqual(logging.getLogger().level, logging.DEBUG)
+        self.assertIn('Logging initialized - Level: DEBUG', logs.output[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,32 +2,55 @@
 Unit tests for scraper functionality
 """
 
+import io
 import unittest
 import tempfile
 import shutil
+import threading
+import time
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from unittest.mock import Mock, patch, MagicMock
-import xml.etree.ElementTree as ET
+from lxml import etree as ET
 import requests
 
-from src.scraper import ECFRScraper, ScrapingError
+from src.scraper import ECFRScraper, RateLimiter, ScrapingError
 from src.database import ECFRDatabase
 
 
 class TestECFRScraper(unittest.TestCase):
     """Test cases for ECFRScraper class"""
     
+    @classmethod
+    def setUpClass(cls):
+        """Initialize the schema once in a template database"""
+        cls.template_dir = Path(tempfile.mkdtemp())
+        cls.template_path = cls.template_dir / "template.db"
+        template = ECFRDatabase(cls.template_path)
+        template.connect()
+        template.initialize_schema()
+        template.disconnect()
+    
+    @classmethod
+    def tearDownClass(cls):
+        """Remove the template database"""
+        shutil.rmtree(cls.template_dir)
+    
     def setUp(self):
-        """Set up test environment"""
+        """Set up test environment with a copy of the template database"""
         self.test_dir = Path(tempfile.mkdtemp())
         self.db_path = self.test_dir / "test_ecfr.db"
+        shutil.copyfile(self.template_path, self.db_path)
         self.db = ECFRDatabase(self.db_path)
         self.db.connect()
-        self.db.initialize_schema()
+        # Durability is irrelevant here; skip the fsyncs at WAL checkpoints
+        self.db.connection.execute("PRAGMA synchronous=OFF")
         
         self.scraper = ECFRScraper(self.db)
         self.scraper.download_dir = self.test_dir / "xml_files"
         self.scraper.download_dir.mkdir()
+        # Mocked requests need no spacing; TestRateLimiter covers the limiter
+        self.scraper._rate_limiter = RateLimiter(0)
     
     def tearDown(self):
         """Clean up test environment"""
@@ -42,126 +65,125 @@ class TestECFRScraper(unittest.TestCase):
         self.assertTrue(self.scraper.download_dir.exists())
     
     @patch('src.scraper.requests.Session.get')
-    def test_make_request_success(self, mock_get):
-        """Test successful HTTP request"""
+    def test_download_hashes_while_writing(self, mock_get):
+        """Test the file hash is computed during download and reused by the parse"""
+        from src.database import calculate_file_hash
+        body = b'<?xml version="1.0"?><root><HEAD>Title 7</HEAD></root>'
         mock_response = Mock()
         mock_response.raise_for_status.return_value = None
+        mock_response.headers = {'content-length': str(len(body))}
+        mock_response.iter_content.return_value = [body[:20], body[20:]]
         mock_get.return_value = mock_response
         
-        result = self.scraper._make_request("http://example.com")
-        self.assertEqual(result, mock_response)
-        mock_get.assert_called_once()
-    
-    @patch('src.scraper.requests.Session.get')
-    def test_make_request_retry(self, mock_get):
-        """Test HTTP request with retry logic"""
-        # First call fails, second succeeds
-        mock_response_fail = Mock()
-        mock_response_fail.raise_for_status.side_effect = requests.exceptions.RequestException("Error")
-        
-        mock_response_success = Mock()
-        mock_response_success.raise_for_status.return_value = None
+        xml_file = self.scraper.download_title_xml(7, force_download=True)
+        self.assertEqual(self.scraper._file_hashes[7], calculate_file_hash(xml_file))
         
-        mock_get.side_effect = [mock_response_fail, mock_response_success]
-        
-        result = self.scraper._make_request("http://example.com")
-        self.assertEqual(result, mock_response_success)
-        self.assertEqual(mock_get.call_count, 2)
+        with patch('src.scraper.calculate_file_hash') as mock_hash:
+            self.scraper.parse_title_xml(xml_file, 7)
+        mock_hash.assert_not_called()
+        self.assertEqual(self.db.get_scraping_metadata(7)['file_hash'],
+                         calculate_file_hash(xml_file))
     
+    @patch('src.scraper.DOWNLOAD_LOG_INTERVAL', 16)
     @patch('src.scraper.requests.Session.get')
-    def test_make_request_max_retries(self, mock_get):
-        """Test HTTP request max retries exceeded"""
+    def test_download_logs_progress_without_terminal(self, mock_get):
+        """Test downloads log periodic progress lines when stderr is not a terminal"""
+        body = b'<?xml version="1.0"?><root><HEAD>Title 7</HEAD></root>'
         mock_response = Mock()
-        mock_response.raise_for_status.side_effect = requests.exceptions.RequestException("Error")
+        mock_response.raise_for_status.return_value = None
+        mock_response.headers = {'content-length': str(len(body))}
+        mock_response.iter_content.return_value = [body[i:i + 8] for i in range(0, len(body), 8)]
         mock_get.return_value = mock_response
         
-        with self.assertRaises(ScrapingError):
-            self.scraper._make_request("http://example.com")
+        with patch('src.scraper.sys.stderr.isatty', return_value=False), \
+                self.assertLogs('src.scraper', level='INFO') as logs:
+            self.scraper.download_title_xml(7, force_download=True)
         
-        self.assertEqual(mock_get.call_count, 3)  # MAX_RETRIES = 3
+        progress = [line for line in logs.output if 'MB downloaded' in line]
+        self.assertEqual(len(progress), len(body) // 16)
     
-    def test_validate_xml_valid(self):
-        """Test XML validation with valid XML"""
-        xml_file = self.test_dir / "valid.xml"
-        xml_file.write_text('<?xml version="1.0"?><root><child>content</child></root>')
+    @patch('src.scraper.RANGE_DOWNLOAD_MIN_SIZE', 16)
+    @patch('src.scraper.requests.Session.get')
+    def test_download_parallel_ranges(self, mock_get):
+        """Test large uncompressed files are fetched as byte ranges at their offsets"""
+        from src.database import calculate_file_hash
+        body = b'<?xml version="1.0"?><root><HEAD>Title 7</HEAD>' + b'<P>text</P>' * 10 + b'</root>'
         
-        result = self.scraper._validate_xml(xml_file)
-        self.assertTrue(result)
-    
-    def test_validate_xml_invalid(self):
-        """Test XML validation with invalid XML"""
-        xml_file = self.test_dir / "invalid.xml"
-        xml_file.write_text('<root><child>unclosed tag</root>')
+        def fake_get(url, headers=None, **kwargs):
+            response = MagicMock()
+            response.raise_for_status.return_value = None
+            if headers and 'Range' in headers:
+                start, end = map(int, headers['Range'][len('bytes='):].split('-'))
+                response.status_code = 206
+                response.iter_content.return_value = [body[start:end + 1]]
+            else:
+                response.status_code = 200
+                response.headers = {'content-length': str(len(body)), 'Accept-Ranges': 'bytes'}
+                response.iter_content.return_value = [body]
+            return response
+        mock_get.side_effect = fake_get
         
-        result = self.scraper._validate_xml(xml_file)
-        self.assertFalse(result)
+        xml_file = self.scraper.download_title_xml(7, force_download=True)
+        self.assertEqual(xml_file.read_bytes(), body)
+        self.assertEqual(mock_get.call_count, 1 + 4)  # RANGE_DOWNLOAD_PARTS = 4
+        self.assertEqual(self.scraper._file_hashes[7], calculate_file_hash(xml_file))
     
-    def test_clean_text(self):
-        """Test text cleaning functionality"""
-        test_cases = [
-            ("  multiple   spaces  ", "multiple spaces"),
-            ("text&amp;more", "text&more"),
-            ("&lt;tag&gt;", "<tag>"),
-            ("&quot;quoted&quot;", '"quoted"'),
-            ("line1\n\nline2", "line1 line2"),
-            ("", ""),
-        ]
+    @patch('src.scraper.RANGE_DOWNLOAD_MIN_SIZE', 16)
+    @patch('src.scraper.requests.Session.get')
+    def test_download_ranges_fallback(self, mock_get):
+        """Test a server ignoring Range headers gets the file as one stream"""
+        body = b'<?xml version="1.0"?><root><HEAD>Title 7</HEAD></root>'
+        mock_response = MagicMock()
+        mock_response.raise_for_status.return_value = None
+        mock_response.status_code = 200
+        mock_response.headers = {'content-length': str(len(body)), 'Accept-Ranges': 'bytes'}
+        mock_response.iter_content.side_effect = lambda chunk_size: iter([body])
+        mock_get.return_value = mock_response
         
-        for input_text, expected in test_cases:
-            result = self.scraper._clean_text(input_text)
-            self.assertEqual(result, expected)
+        xml_file = self.scraper.download_title_xml(7, force_download=True)
+        self.assertEqual(xml_file.read_bytes(), body)
     
-    def test_extract_element_text(self):
-        """Test XML element text extraction"""
-        xml_content = '''
-        <root>
-            Text before
-            <child>Child text</child>
-            Text after
-            <nested>
-                <deep>Deep text</deep>
-            </nested>
-        </root>
-        '''
-        root = ET.fromstring(xml_content)
+    @patch('src.scraper.RANGE_DOWNLOAD_MIN_SIZE', 16)
+    @patch('src.scraper.requests.Session.get')
+    def test_failed_range_keeps_existing_file(self, mock_get):
+        """Test a failed range leaves neither a partial file nor a changed target"""
+        body = b'<?xml version="1.0"?><root><HEAD>Title 7</HEAD>' + b'<P>text</P>' * 10 + b'</root>'
         
-        result = self.scraper._extract_element_text(root)
-        self.assertIn("Text before", result)
-        self.assertIn("Child text", result)
-        self.assertIn("Text after", result)
-        self.assertIn("Deep text", result)
-    
-    def test_extract_authority(self):
-        """Test authority citation extraction"""
-        xml_content = '''
-        <section>
-            <AUTH>
-                <HED>Authority:</HED>
-                <PSPACE>44 U.S.C. 1506; sec. 6, E.O. 10530</PSPACE>
-            </AUTH>
-        </section>
-        '''
-        element = ET.fromstring(xml_content)
+        def fake_get(url, headers=None, **kwargs):
+            response = MagicMock()
+            response.raise_for_status.return_value = None
+            if headers and 'Range' in headers:
+                start, end = map(int, headers['Range'][len('bytes='):].split('-'))
+                response.status_code = 206
+                # The last range is cut short
+                response.iter_content.return_value = [body[start:end if end + 1 == len(body) else end + 1]]
+            else:
+                response.status_code = 200
+                response.headers = {'content-length': str(len(body)), 'Accept-Ranges': 'bytes'}
+            return response
+        mock_get.side_effect = fake_get
         
-        result = self.scraper._extract_authority(element)
-        self.assertIn("44 U.S.C. 1506", result)
-        self.assertIn("E.O. 10530", result)
+        xml_file = self.scraper.download_dir / "ECFR-title7.xml"
+        xml_file.write_bytes(b'<root>previous</root>')
+        with self.assertRaises(ScrapingError):
+            self.scraper.download_title_xml(7, force_download=True)
+        
+        self.assertEqual(xml_file.read_bytes(), b'<root>previous</root>')
+        self.assertEqual([path.name for path in self.scraper.download_dir.iterdir()], [xml_file.name])
     
-    def test_extract_source(self):
-        """Test source citation extraction"""
-        xml_content = '''
-        <section>
-            <SOURCE>
-                <HED>Source:</HED>
-                <PSPACE>37 FR 23607, Nov. 4, 1972</PSPACE>
-            </SOURCE>
-        </section>
-        '''
-        element = ET.fromstring(xml_content)
+    @patch('src.scraper.requests.Session.get')
+    def test_short_stream_leaves_no_file(self, mock_get):
+        """Test a stream shorter than its Content-Length is not kept"""
+        body = b'<?xml version="1.0"?><root><HEAD>Title 7</HEAD></root>'
+        mock_response = Mock()
+        mock_response.raise_for_status.return_value = None
+        mock_response.headers = {'content-length': str(len(body) + 10)}
+        mock_response.iter_content.return_value = [body]
+        mock_get.return_value = mock_response
         
-        result = self.scraper._extract_source(element)
-        self.assertIn("37 FR 23607", result)
-        self.assertIn("Nov. 4, 1972", result)
+        with self.assertRaises(ScrapingError):
+            self.scraper.download_title_xml(7, force_download=True)
+        self.assertEqual(list(self.scraper.download_dir.iterdir()), [])
     
     def test_process_chapter(self):
         """Test chapter processing"""
@@ -283,7 +305,8 @@ class TestECFRScraper(unittest.TestCase):
         self.db.update_scraping_metadata(1, 'completed', 1024, 'old-hash', None, 10)
         mock_hash.return_value = "new-hash"
         
-        with patch.object(self.scraper, 'download_title_xml') as mock_download:
+        with patch.object(self.scraper, 'head_title_version', return_value=(1, None)), \
+                patch.object(self.scraper, 'download_title_xml') as mock_download:
             mock_download.return_value = Path("test.xml")
             
             result = self.scraper.check_for_updates(1)
@@ -296,18 +319,333 @@ class TestECFRScraper(unittest.TestCase):
         self.db.update_scraping_metadata(1, 'completed', 1024, 'same-hash', None, 10)
         mock_hash.return_value = "same-hash"
         
-        with patch.object(self.scraper, 'download_title_xml') as mock_download:
+        with patch.object(self.scraper, 'head_title_version', return_value=(1, None)), \
+                patch.object(self.scraper, 'download_title_xml') as mock_download:
             mock_download.return_value = Path("test.xml")
             
             result = self.scraper.check_for_updates(1)
             self.assertFalse(result)
     
+    def test_check_for_updates_head_not_modified(self):
+        """Test a 304 from the HEAD check answers without downloading"""
+        self.db.update_scraping_metadata(1, 'completed', 1024, 'hash', None, 10, '"v1"')
+        
+        with patch.object(self.scraper, 'head_title_version',
+                          return_value=(1, {'not_modified': True})) as mock_head, \
+                patch.object(self.scraper, 'download_title_xml') as mock_download:
+            self.assertFalse(self.scraper.check_for_updates(1))
+        
+        mock_head.assert_called_once_with(1, '"v1"')
+        mock_download.assert_not_called()
+    
+    def test_scrape_all_titles_parallel_downloads(self):
+        """Test downloads fan out while parsing stays on the calling thread"""
+        caller = threading.current_thread()
+        parse_threads = []
+        
+        def fake_parse(xml_file, title_number, records=None):
+            parse_threads.append(threading.current_thread())
+            return title_number * 10
+        
+        def fake_download(title_number, force_download=False, validate=True):
+            # Parsing validates the XML, so the download skips its own pass
+            self.assertFalse(validate)
+            if title_number == 3:
+                raise ScrapingError("Download failed")
+            return Path(f"title{title_number}.xml")
+        
+        with patch.object(self.scraper, 'download_title_xml', side_effect=fake_download), \
+                patch.object(self.scraper, 'parse_title_xml', side_effect=fake_parse):
+            results = self.scraper.scrape_all_titles([1, 2, 3, 4], max_workers=3, parse_workers=1)
+        
+        self.assertEqual(results, {1: 10, 2: 20, 3: 0, 4: 40})
+        self.assertTrue(all(thread is caller for thread in parse_threads))
+    
+    def test_check_titles_for_updates(self):
+        """Test batched update check against HEAD versions"""
+        self.db.update_scraping_metadata(1, 'completed', 1024, 'hash', None, 10)
+        self.db.update_scraping_metadata(2, 'completed', 1024, 'hash', None, 10)
+        self.db.update_scraping_metadata(3, 'completed', 1024, 'hash', None, 10)
+        self.db.update_scraping_metadata(4, 'failed', None, None, 'Error', 0)
+        
+        long_ago = datetime.now(timezone.utc) - timedelta(days=30)
+        tomorrow = datetime.now(timezone.utc) + timedelta(days=1)
+        def version(last_modified, content_length, etag=None):
+            return {'not_modified': False, 'etag': etag,
+                    'last_modified': last_modified, 'content_length': content_length}
+        
+        versions = {
+            1: version(long_ago, 1024),  # unchanged
+            2: version(long_ago, 2048),  # size changed
+            3: version(tomorrow, 1024),  # modified since
+            4: version(long_ago, 1024),  # last scrape failed
+            5: version(long_ago, 1024),  # never scraped
+            6: None,                     # HEAD failed
+        }
+        
+        with patch.object(self.scraper, 'head_title_version',
+                          side_effect=lambda t, etag=None: (t, versions[t])):
+            updates = self.scraper.check_titles_for_updates([1, 2, 3, 4, 5, 6])
+        
+        self.assertEqual(updates, {1: False, 2: True, 3: True, 4: True, 5: True, 6: True})
+    
+    def test_check_titles_for_updates_etag(self):
+        """Test stored ETags are sent and decide freshness"""
+        self.db.update_scraping_metadata(1, 'completed', 1024, 'hash', None, 10, '"v1"')
+        self.db.update_scraping_metadata(2, 'completed', 1024, 'hash', None, 10, '"v1"')
+        self.db.update_scraping_metadata(3, 'completed', 1024, 'hash', None, 10, '"v1"')
+        
+        versions = {
+            1: {'not_modified': True},
+            2: {'not_modified': False, 'etag': '"v2"', 'last_modified': None, 'content_length': 1024},
+            3: {'not_modified': False, 'etag': '"v1"', 'last_modified': None, 'content_length': 1024},
+        }
+        seen_etags = {}
+        
+        def fake_head(title_number, etag=None):
+            seen_etags[title_number] = etag
+            return title_number, versions[title_number]
+        
+        with patch.object(self.scraper, 'collection_modified_since', return_value=True), \
+                patch.object(self.scraper, 'head_title_version', side_effect=fake_head):
+            updates = self.scraper.check_titles_for_updates([1, 2, 3])
+        
+        self.assertEqual(updates, {1: False, 2: True, 3: False})
+        self.assertEqual(seen_etags, {1: '"v1"', 2: '"v1"', 3: '"v1"'})
+    
+    def test_check_titles_for_updates_collection_unchanged(self):
+        """Test an unchanged collection skips the per-title checks"""
+        self.db.update_scraping_metadata(1, 'completed', 1024, 'hash', None, 10)
+        self.db.update_scraping_metadata(2, 'completed', 1024, 'hash', None, 10)
+        
+        with patch.object(self.scraper, 'collection_modified_since', return_value=False), \
+                patch.object(self.scraper, 'head_title_version') as mock_head:
+            updates = self.scraper.check_titles_for_updates([1, 2])
+        
+        self.assertEqual(updates, {1: False, 2: False})
+        mock_head.assert_not_called()
+    
+    @patch('src.scraper.requests.Session.head')
+    def test_head_title_version(self, mock_head):
+        """Test HEAD response headers are parsed into a version"""
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.raise_for_status.return_value = None
+        mock_response.headers = {
+            'Last-Modified': 'Wed, 01 Jan 2025 12:00:00 GMT',
+            'Content-Length': '4096',
+        }
+        mock_head.return_value = mock_response
+        
+        title_number, version = self.scraper.head_title_version(7)
+        self.assertEqual(title_number, 7)
+        self.assertEqual(version['content_length'], 4096)
+        self.assertEqual(version['last_modified'].year, 2025)
+        
+        mock_response.status_code = 304
+        self.assertEqual(self.scraper.head_title_version(7, '"v1"'), (7, {'not_modified': True}))
+        self.assertEqual(mock_head.call_args.kwargs['headers'], {'If-None-Match': '"v1"'})
+        
+        mock_head.side_effect = requests.exceptions.ConnectionError("offline")
+        self.assertEqual(self.scraper.head_title_version(7), (7, None))
+    
+    @patch('src.scraper.requests.Session.head')
+    def test_head_title_version_rate_limited(self, mock_head):
+        """Test HEAD checks wait on the shared rate limiter"""
+        mock_head.return_value = Mock(status_code=304)
+        with patch.object(self.scraper._rate_limiter, 'wait') as mock_wait:
+            self.scraper.check_titles_for_updates([1, 2, 3])
+        self.assertEqual(mock_wait.call_count, 3)
+    
+    @patch('src.scraper.requests.Session.get')
+    @patch('src.scraper.requests.Session.head')
+    def test_collection_modified_since(self, mock_head, mock_get):
+        """Test the collection check is a rate-limited conditional HEAD"""
+        mock_head.return_value = Mock(status_code=304)
+        since = datetime(2025, 1, 1, 12, 0)
+        with patch.object(self.scraper._rate_limiter, 'wait') as mock_wait:
+            self.assertFalse(self.scraper.collection_modified_since(since))
+        mock_wait.assert_called_once()
+        mock_get.assert_not_called()
+        self.assertEqual(mock_head.call_args.kwargs['headers'],
+                         {'If-Modified-Since': 'Wed, 01 Jan 2025 12:00:00 GMT'})
+        
+        mock_head.return_value = Mock(status_code=200)
+        self.assertTrue(self.scraper.collection_modified_since(since))
+    
     def test_scraper_close(self):
         """Test scraper cleanup"""
         # Should not raise an exception
         self.scraper.close()
 
 
+class TestECFRScraperStateless(unittest.TestCase):
+    """Test cases for ECFRScraper methods that keep no state between calls"""
+    
+    @classmethod
+    def setUpClass(cls):
+        """Share one scraper; these tests never touch its database"""
+        cls.test_dir = Path(tempfile.mkdtemp())
+        cls.scraper = ECFRScraper(ECFRDatabase(cls.test_dir / "test_ecfr.db"))
+        cls.scraper.download_dir = cls.test_dir
+        cls.scraper._rate_limiter = RateLimiter(0)
+    
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up test environment"""
+        cls.scraper.close()
+        shutil.rmtree(cls.test_dir)
+    
+    def test_session_adapter(self):
+        """Test the session keeps a sized connection pool"""
+        adapter = self.scraper.session.get_adapter('https://www.govinfo.gov/')
+        self.assertEqual(adapter._pool_maxsize, 20)
+        self.assertIn('gzip', self.scraper.session.headers['Accept-Encoding'])
+    
+    @patch('src.scraper.requests.Session.get')
+    def test_make_request_success(self, mock_get):
+        """Test successful HTTP request"""
+        mock_response = Mock()
+        mock_response.raise_for_status.return_value = None
+        mock_get.return_value = mock_response
+        
+        result = self.scraper._make_request("http://example.com")
+        self.assertEqual(result, mock_response)
+        mock_get.assert_called_once()
+    
+    def test_make_request_retry(self):
+        """Test HTTP request retry policy on the session adapter"""
+        retries = self.scraper.session.get_adapter('http://example.com').max_retries
+        self.assertEqual(retries.total, 3)  # MAX_RETRIES = 3
+        self.assertGreater(retries.backoff_factor, 0)
+        self.assertTrue(retries.is_retry('GET', 503))
+        self.assertFalse(retries.is_retry('GET', 404))
+    
+    @patch('src.scraper.requests.Session.get')
+    def test_make_request_max_retries(self, mock_get):
+        """Test HTTP request max retries exceeded"""
+        # The adapter has already retried by the time an error reaches _make_request
+        mock_response = Mock()
+        mock_response.raise_for_status.side_effect = requests.exceptions.RequestException("Error")
+        mock_get.return_value = mock_response
+        
+        with self.assertRaises(ScrapingError):
+            self.scraper._make_request("http://example.com")
+        
+        mock_get.assert_called_once()
+    
+    def test_validate_xml_valid(self):
+        """Test XML validation with valid XML"""
+        xml = io.BytesIO(b'<?xml version="1.0"?><root><child>content</child></root>')
+        
+        result = self.scraper._validate_xml(xml)
+        self.assertTrue(result)
+    
+    def test_validate_xml_invalid(self):
+        """Test XML validation with invalid XML"""
+        xml = io.BytesIO(b'<root><child>unclosed tag</root>')
+        
+        result = self.scraper._validate_xml(xml)
+        self.assertFalse(result)
+    
+    def test_clean_text(self):
+        """Test text cleaning functionality"""
+        test_cases = [
+            ("  multiple   spaces  ", "multiple spaces"),
+            ("text&amp;more", "text&more"),
+            ("&lt;tag&gt;", "<tag>"),
+            ("&quot;quoted&quot;", '"quoted"'),
+            ("line1\n\nline2", "line1 line2"),
+            ("", ""),
+        ]
+        
+        for input_text, expected in test_cases:
+            with self.subTest(input=input_text):
+                result = self.scraper._clean_text(input_text)
+                self.assertEqual(result, expected)
+    
+    def test_extract_element_text(self):
+        """Test XML element text extraction"""
+        xml_content = '''
+        <root>
+            Text before
+            <child>Child text</child>
+            Text after
+            <nested>
+                <deep>Deep text</deep>
+            </nested>
+        </root>
+        '''
+        root = ET.fromstring(xml_content)
+        
+        result = self.scraper._extract_element_text(root)
+        self.assertIn("Text before", result)
+        self.assertIn("Child text", result)
+        self.assertIn("Text after", result)
+        self.assertIn("Deep text", result)
+    
+    def test_extract_authority(self):
+        """Test authority citation extraction"""
+        xml_content = '''
+        <section>
+            <AUTH>
+                <HED>Authority:</HED>
+                <PSPACE>44 U.S.C. 1506; sec. 6, E.O. 10530</PSPACE>
+            </AUTH>
+        </section>
+        '''
+        element = ET.fromstring(xml_content)
+        
+        result = self.scraper._extract_authority(element)
+        self.assertIn("44 U.S.C. 1506", result)
+        self.assertIn("E.O. 10530", result)
+    
+    def test_extract_source(self):
+        """Test source citation extraction"""
+        xml_content = '''
+        <section>
+            <SOURCE>
+                <HED>Source:</HED>
+                <PSPACE>37 FR 23607, Nov. 4, 1972</PSPACE>
+            </SOURCE>
+        </section>
+        '''
+        element = ET.fromstring(xml_content)
+        
+        result = self.scraper._extract_source(element)
+        self.assertIn("37 FR 23607", result)
+        self.assertIn("Nov. 4, 1972", result)
+
+
+class TestRateLimiter(unittest.TestCase):
+    """Test the request rate limiter shared by download threads"""
+    
+    def test_waits_are_spaced_across_threads(self):
+        """Test concurrent callers are released one interval apart"""
+        limiter = RateLimiter(0.05)
+        released = []
+        
+        def call():
+            limiter.wait()
+            released.append(time.monotonic())
+        
+        threads = [threading.Thread(target=call) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        released.sort()
+        self.assertGreaterEqual(released[-1] - released[0], 0.14)
+    
+    def test_first_wait_does_not_sleep(self):
+        """Test an idle limiter lets the next call through immediately"""
+        limiter = RateLimiter(10)
+        with patch('src.scraper.time.sleep') as mock_sleep:
+            limiter.wait()
+        mock_sleep.assert_not_called()
+
+
 class TestScrapingError(unittest.TestCase):
     """Test ScrapingError exception"""
     
@@ -13,98 +13,125 @@ from src.database import ECFRDatabase
 class TestSearchFunctionality(unittest.TestCase):
     """Test full-text search capabilities"""
     
+    @classmethod
+    def setUpClass(cls):
+        """Build the sample data once in a template database"""
+        cls.template_dir = Path(tempfile.mkdtemp())
+        cls.template_path = cls.template_dir / "template.db"
+        template = ECFRDatabase(cls.template_path)
+        template.connect()
+        template.initialize_schema()
+        
+        # Add comprehensive test data, committed once
+        with template.bulk_transaction():
+            cls._setup_test_data(template)
+        template.disconnect()
+    
+    @classmethod
+    def tearDownClass(cls):
+        """Remove the template database"""
+        shutil.rmtree(cls.template_dir)
+    
     def setUp(self):
-        """Set up test environment with sample data"""
+        """Set up test environment with a copy of the sample data"""
         self.test_dir = Path(tempfile.mkdtemp())
         self.db_path = self.test_dir / "test_ecfr.db"
+        shutil.copyfile(self.template_path, self.db_path)
         self.db = ECFRDatabase(self.db_path)
         self.db.connect()
-        self.db.initialize_schema()
-        
-        # Add comprehensive test data
-        self._setup_test_data()
     
     def tearDown(self):
         """Clean up test environment"""
         self.db.disconnect()
         shutil.rmtree(self.test_dir)
     
-    def _setup_test_data(self):
+    @staticmethod
+    def _setup_test_data(db):
         """Set up comprehensive test data for search testing"""
+        sections = []
+        
         # Title 1: Administrative Procedures
-        title1_id = self.db.get_or_create_title(1, "Administrative Procedures")
-        chapter1_id = self.db.get_or_create_chapter(title1_id, "I", "General Provisions")
-        part1_id = self.db.get_or_create_part(chapter1_id, None, 1, "Definitions and General Rules")
+        title1_id = db.get_or_create_title(1, "Administrative Procedures")
+        chapter1_id = db.get_or_create_chapter(title1_id, "I", "General Provisions")
+        part1_id = db.get_or_create_part(chapter1_id, None, 1, "Definitions and General Rules")
         
-        self.db.insert_section(
+        sections.append((
             part1_id, "1.1", "Definitions",
             "This section contains important definitions for administrative procedures. "
             "The term 'agency' means any department, independent establishment, commission, "
             "administration, authority, board, or other establishment in the executive branch. "
-            "The term 'rule' means any agency statement of general applicability that implements law."
-        )
+            "The term 'rule' means any agency statement of general applicability that implements law.",
+            None, None, None  # authority, source, xml_node_id
+        ))
         
-        self.db.insert_section(
+        sections.append((
             part1_id, "1.2", "Scope and Application",
             "These procedures apply to all federal agencies unless specifically exempted. "
             "The scope includes rulemaking, adjudication, and licensing procedures. "
-            "Administrative law judges must follow these procedural requirements."
-        )
+            "Administrative law judges must follow these procedural requirements.",
+            None, None, None
+        ))
         
-        self.db.insert_section(
+        sections.append((
             part1_id, "1.3", "Public Participation",
             "Agencies must provide meaningful opportunity for public participation in rulemaking. "
             "This includes notice and comment procedures, public hearings when appropriate, "
-            "and access to relevant documents and data used in decision-making."
-        )
+            "and access to relevant documents and data used in decision-making.",
+            None, None, None
+        ))
         
         # Title 2: Privacy and Information
-        title2_id = self.db.get_or_create_title(2, "Privacy and Information Access")
-        chapter2_id = self.db.get_or_create_chapter(title2_id, "I", "Privacy Protection")
-        part2_id = self.db.get_or_create_part(chapter2_id, None, 10, "Privacy Act Regulations")
+        title2_id = db.get_or_create_title(2, "Privacy and Information Access")
+        chapter2_id = db.get_or_create_chapter(title2_id, "I", "Privacy Protection")
+        part2_id = db.get_or_create_part(chapter2_id, None, 10, "Privacy Act Regulations")
         
-        self.db.insert_section(
+        sections.append((
             part2_id, "10.1", "Privacy Policy Framework",
             "Federal agencies must establish comprehensive privacy policies to protect "
             "personally identifiable information (PII). Privacy impact assessments are "
-            "required for systems that collect, store, or process personal data."
-        )
+            "required for systems that collect, store, or process personal data.",
+            None, None, None
+        ))
         
-        self.db.insert_section(
+        sections.append((
             part2_id, "10.2", "Data Security Requirements",
             "Agencies must implement appropriate security measures to protect sensitive data. "
             "This includes encryption, access controls, audit logging, and incident response procedures. "
-            "Data breaches must be reported within 24 hours of discovery."
-        )
+            "Data breaches must be reported within 24 hours of discovery.",
+            None, None, None
+        ))
         
-        self.db.insert_section(
+        sections.append((
             part2_id, "10.3", "Freedom of Information Access",
             "The Freedom of Information Act (FOIA) provides public access to federal agency records. "
             "Agencies must process FOIA requests promptly and provide information unless "
-            "specifically exempted under the statute. Electronic records are subject to FOIA."
-        )
+            "specifically exempted under the statute. Electronic records are subject to FOIA.",
+            None, None, None
+        ))
         
         # Title 3: Environmental Regulations
-        title3_id = self.db.get_or_create_title(3, "Environmental Protection")
-        chapter3_id = self.db.get_or_create_chapter(title3_id, "I", "Environmental Standards")
-        part3_id = self.db.get_or_create_part(chapter3_id, None, 20, "Air Quality Standards")
+        title3_id = db.get_or_create_title(3, "Environmental Protection")
+        chapter3_id = db.get_or_create_chapter(title3_id, "I", "Environmental Standards")
+        part3_id = db.get_or_create_part(chapter3_id, None, 20, "Air Quality Standards")
         
-        self.db.insert_section(
+        sections.append((
             part3_id, "20.1", "National Ambient Air Quality Standards",
             "The Environmental Protection Agency establishes national ambient air quality standards "
             "for criteria pollutants including ozone, particulate matter, carbon monoxide, "
-            "nitrogen dioxide, sulfur dioxide, and lead. These standards protect public health."
-        )
+            "nitrogen dioxide, sulfur dioxide, and lead. These standards protect public health.",
+            None, None, None
+        ))
         
-        self.db.insert_section(
+        sections.append((
             part3_id, "20.2", "State Implementation Plans",
             "States must develop and implement plans to achieve and maintain air quality standards. "
             "State implementation plans (SIPs) must include emission control strategies, "
-            "monitoring requirements, and enforcement mechanisms."
-        )
+            "monitoring requirements, and enforcement mechanisms.",
+            None, None, None
+        ))
         
-        # Commit all changes for FTS to work properly
-        self.db.connection.commit()
+        # One executemany through the scraper's bulk load path
+        db.bulk_insert_sections(sections)
     
     def test_search_basic_terms(self):
         """Test basic term searches"""
@@ -269,6 +296,23 @@ class TestSearchFunctionality(unittest.TestCase):
             self.assertIn(field, result)
             self.assertIsNotNone(result[field])
     
+    def test_iter_search_sections(self):
+        """Test streamed search yields the same rows as search_sections"""
+        rows = self.db.iter_search_sections("privacy")
+        self.assertNotIsInstance(rows, list)
+        self.assertEqual(list(rows), self.db.search_sections("privacy"))
+    
+    def test_search_preview_length(self):
+        """Test previews are truncated in SQL and flagged"""
+        full = self.db.search_sections("privacy")
+        previews = self.db.search_sections("privacy", preview_length=20)
+        self.assertEqual(len(previews), len(full))
+        
+        for result, preview in zip(full, previews):
+            self.assertNotIn('section_content', preview)
+            self.assertEqual(preview['section_content_preview'], result['section_content'][:20])
+            self.assertEqual(bool(preview['is_truncated']), len(result['section_content']) > 20)
+    
     def test_search_relevance_ranking(self):
         """Test that search results are ranked by relevance"""
         # Search for a term that appears with different frequencies
@@ -280,6 +324,15 @@ class TestSearchFunctionality(unittest.TestCase):
             self.assertIsInstance(results[0], dict)
             self.assertIn('section_content', results[0])
     
+    def test_search_ranking_sorted_by_fts(self):
+        """Test FTS hits are ordered by FTS5 itself rather than a separate sort"""
+        from src.database import _SEARCH_SQL
+        cte = _SEARCH_SQL.split(")\n", 1)[0].split("AS (", 1)[1]
+        plan = self.db.connection.execute(f"EXPLAIN QUERY PLAN {cte}", ("privacy", 10)).fetchall()
+        details = " ".join(row[3] for row in plan)
+        self.assertIn("VIRTUAL TABLE", details)
+        self.assertNotIn("TEMP B-TREE", details)
+    
     def test_search_with_numbers(self):
         """Test search with numeric content"""
         # Search for "24 hours"
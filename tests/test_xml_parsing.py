@@ -6,34 +6,16 @@ import unittest
 import tempfile
 import shutil
 from pathlib import Path
-import xml.etree.ElementTree as ET
+from unittest.mock import patch
+from lxml import etree as ET
 
-from src.scraper import ECFRScraper
+from src.scraper import ECFRScraper, parse_title_records
 from src.database import ECFRDatabase
 
 
-class TestXMLParsing(unittest.TestCase):
-    """Test XML parsing with real eCFR XML structure"""
-    
-    def setUp(self):
-        """Set up test environment"""
-        self.test_dir = Path(tempfile.mkdtemp())
-        self.db_path = self.test_dir / "test_ecfr.db"
-        self.db = ECFRDatabase(self.db_path)
-        self.db.connect()
-        self.db.initialize_schema()
-        
-        self.scraper = ECFRScraper(self.db)
-    
-    def tearDown(self):
-        """Clean up test environment"""
-        self.scraper.close()
-        self.db.disconnect()
-        shutil.rmtree(self.test_dir)
-    
-    def create_sample_xml(self, title_number=1):
-        """Create a sample eCFR XML file for testing"""
-        xml_content = f'''<?xml version="1.0" encoding="UTF-8" ?>
+def write_sample_xml(directory, title_number=1):
+    """Create a sample eCFR XML file for testing"""
+    xml_content = f'''<?xml version="1.0" encoding="UTF-8" ?>
 <DLPSTEXTCLASS>
 <HEADER>
 <FILEDESC>
@@ -144,10 +126,51 @@ class TestXMLParsing(unittest.TestCase):
 </BODY>
 </TEXT>
 </DLPSTEXTCLASS>'''
+    
+    xml_file = directory / f"test_title_{title_number}.xml"
+    xml_file.write_text(xml_content)
+    return xml_file
+
+
+class TestXMLParsing(unittest.TestCase):
+    """Test XML parsing with real eCFR XML structure"""
+    
+    @classmethod
+    def setUpClass(cls):
+        """Initialize the schema once in a template database"""
+        cls.template_dir = Path(tempfile.mkdtemp())
+        cls.template_path = cls.template_dir / "template.db"
+        template = ECFRDatabase(cls.template_path)
+        template.connect()
+        template.initialize_schema()
+        template.disconnect()
+    
+    @classmethod
+    def tearDownClass(cls):
+        """Remove the template database"""
+        shutil.rmtree(cls.template_dir)
+    
+    def setUp(self):
+        """Set up test environment with a copy of the template database"""
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.db_path = self.test_dir / "test_ecfr.db"
+        shutil.copyfile(self.template_path, self.db_path)
+        self.db = ECFRDatabase(self.db_path)
+        self.db.connect()
+        # Durability is irrelevant here; skip the fsyncs at WAL checkpoints
+        self.db.connection.execute("PRAGMA synchronous=OFF")
         
-        xml_file = self.test_dir / f"test_title_{title_number}.xml"
-        xml_file.write_text(xml_content)
-        return xml_file
+        self.scraper = ECFRScraper(self.db)
+    
+    def tearDown(self):
+        """Clean up test environment"""
+        self.scraper.close()
+        self.db.disconnect()
+        shutil.rmtree(self.test_dir)
+    
+    def create_sample_xml(self, title_number=1):
+        """Create a sample eCFR XML file for testing"""
+        return write_sample_xml(self.test_dir, title_number)
     
     def test_parse_complete_xml_structure(self):
         """Test parsing a complete XML structure"""
@@ -168,6 +191,99 @@ class TestXMLParsing(unittest.TestCase):
         self.assertEqual(stats['parts'], 4)  # Parts 1, 2, 10, 50
         self.assertEqual(stats['sections'], 5)  # 5 sections total
     
+    def test_parse_with_small_batch_size(self):
+        """Test sections are flushed in batches smaller than a title"""
+        xml_file = self.create_sample_xml(1)
+        self.scraper.batch_size = 2
+        
+        with patch.object(self.db, 'bulk_insert_sections',
+                          wraps=self.db.bulk_insert_sections) as mock_bulk:
+            records_processed = self.scraper.parse_title_xml(xml_file, 1)
+        
+        self.assertEqual(records_processed, 5)
+        self.assertEqual(mock_bulk.call_count, 3)
+        self.assertEqual(self.db.get_database_stats()['sections'], 5)
+    
+    def _dump_structure(self, db):
+        """Rows of every structural table, without ids"""
+        return [
+            sorted(tuple(row) for row in db.connection.execute(sql))
+            for sql in (
+                "SELECT title_number, title_name, chapters_count, subchapters_count, "
+                "parts_count, sections_count FROM titles",
+                "SELECT chapter_number, chapter_name FROM chapters",
+                "SELECT subchapter_letter, subchapter_name FROM subchapters",
+                "SELECT part_number, part_name, authority_citation, source_citation FROM parts",
+                "SELECT s.section_number, s.section_heading, s.section_content, s.xml_node_id, "
+                "p.part_number FROM sections s JOIN parts p ON p.id = s.part_id",
+            )
+        ]
+    
+    def test_parse_in_worker_matches_direct_parse(self):
+        """Test rows parsed into TitleRecords are stored like a direct parse"""
+        xml_file = self.create_sample_xml(1)
+        records = parse_title_records(xml_file, 1)
+        self.assertIsNone(records.error)
+        
+        records_processed = self.scraper.parse_title_xml(xml_file, 1, records)
+        self.assertEqual(records_processed, 5)
+        
+        direct_db = ECFRDatabase(self.test_dir / "direct.db")
+        direct_db.connect()
+        try:
+            direct_db.initialize_schema()
+            ECFRScraper(direct_db).parse_title_xml(xml_file, 1)
+            self.assertEqual(self._dump_structure(self.db), self._dump_structure(direct_db))
+        finally:
+            direct_db.disconnect()
+    
+    def test_scrape_with_parse_workers(self):
+        """Test titles parsed in worker processes are stored by the caller"""
+        xml_files = {1: self.create_sample_xml(1), 2: self.create_sample_xml(2)}
+        xml_files[3] = self.test_dir / "malformed.xml"
+        xml_files[3].write_text("<DLPSTEXTCLASS><unclosed></DLPSTEXTCLASS>")
+        
+        with patch.object(self.scraper, 'download_title_xml',
+                          side_effect=lambda title_number, force_download=False, validate=True: xml_files[title_number]):
+            results = self.scraper.scrape_all_titles([1, 2, 3], parse_workers=2)
+        
+        self.assertEqual(results, {1: 5, 2: 5, 3: 0})
+        self.assertEqual(self.db.get_database_stats()['sections'], 10)
+        self.assertEqual(self.db.get_scraping_metadata(3)['scraping_status'], 'failed')
+    
+    def test_parse_worker_logs_reach_parent(self):
+        """Test warnings logged in a parse worker are handled by the caller's loggers"""
+        xml_file = self.create_sample_xml(1)
+        xml_file.write_text(xml_file.read_text(encoding='utf-8')
+                            .replace('<DIV5 N="50"', '<DIV5 N="L"')
+                            .replace('PART 50—SPECIAL PROVISIONS', 'SPECIAL PROVISIONS'),
+                            encoding='utf-8')
+        
+        with patch.object(self.scraper, 'download_title_xml', return_value=xml_file):
+            with self.assertLogs('src.scraper', 'WARNING') as logs:
+                self.scraper.scrape_all_titles([1], parse_workers=2)
+        
+        self.assertTrue(any('Could not parse part number from: SPECIAL PROVISIONS' in message
+                            for message in logs.output))
+    
+    def test_reparse_unchanged_file_skips_hash(self):
+        """Test an unchanged file reuses the stored hash and a modified one is rehashed"""
+        import os
+        xml_file = self.create_sample_xml(1)
+        self.scraper.parse_title_xml(xml_file, 1)
+        stored_hash = self.db.get_scraping_metadata(1)['file_hash']
+        
+        with patch('src.scraper.calculate_file_hash') as mock_hash:
+            self.scraper.parse_title_xml(xml_file, 1)
+        mock_hash.assert_not_called()
+        self.assertEqual(self.db.get_scraping_metadata(1)['file_hash'], stored_hash)
+        
+        stat = xml_file.stat()
+        os.utime(xml_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        with patch('src.scraper.calculate_file_hash', return_value=stored_hash) as mock_hash:
+            self.scraper.parse_title_xml(xml_file, 1)
+        mock_hash.assert_called_once_with(xml_file)
+    
     def test_parse_title_extraction(self):
         """Test title name extraction from XML"""
         xml_file = self.create_sample_xml(5)
@@ -180,12 +296,88 @@ class TestXMLParsing(unittest.TestCase):
         row = cursor.fetchone()
         self.assertIn("Title 5—Test Provisions", row['title_name'])
     
-    def test_parse_chapter_extraction(self):
-        """Test chapter extraction from XML"""
-        xml_file = self.create_sample_xml(1)
+    def test_parse_malformed_xml(self):
+        """Test handling of malformed XML"""
+        malformed_xml = '''<?xml version="1.0"?>
+        <DLPSTEXTCLASS>
+            <unclosed_tag>
+            <BODY>Content</BODY>
+        </DLPSTEXTCLASS>'''
         
-        self.scraper.parse_title_xml(xml_file, 1)
+        xml_file = self.test_dir / "malformed.xml"
+        xml_file.write_text(malformed_xml)
+        
+        # Should handle gracefully and update metadata as failed
+        with self.assertRaises(Exception):
+            self.scraper.parse_title_xml(xml_file, 99)
+        
+        # Check that metadata shows failure
+        metadata = self.db.get_scraping_metadata(99)
+        self.assertEqual(metadata['scraping_status'], 'failed')
+        self.assertIsNotNone(metadata['error_message'])
+    
+    def test_parse_truncated_xml_rolls_back(self):
+        """Test parts stored before a parse error are rolled back"""
+        xml_content = self.create_sample_xml(1).read_text()
+        xml_file = self.test_dir / "truncated.xml"
+        xml_file.write_text(xml_content[:xml_content.index('<DIV3 N="II"')])
+        
+        with self.assertRaises(Exception):
+            self.scraper.parse_title_xml(xml_file, 1)
+        
+        stats = self.db.get_database_stats()
+        self.assertEqual(stats['parts'], 0)
+        self.assertEqual(stats['sections'], 0)
+        self.assertEqual(self.db.get_scraping_metadata(1)['scraping_status'], 'failed')
+    
+    def test_parse_empty_xml(self):
+        """Test handling of empty/minimal XML"""
+        empty_xml = '''<?xml version="1.0"?>
+        <DLPSTEXTCLASS>
+            <HEADER><TITLE>Empty Title</TITLE></HEADER>
+            <TEXT><BODY></BODY></TEXT>
+        </DLPSTEXTCLASS>'''
         
+        xml_file = self.test_dir / "empty.xml"
+        xml_file.write_text(empty_xml)
+        
+        records_processed = self.scraper.parse_title_xml(xml_file, 98)
+        
+        # Should process successfully but with 0 records
+        self.assertEqual(records_processed, 0)
+        
+        # Should still create the title
+        stats = self.db.get_database_stats()
+        self.assertEqual(stats['titles'], 1)
+        self.assertEqual(stats['sections'], 0)
+
+
+class TestParsedSampleTitle(unittest.TestCase):
+    """Test the rows stored from the sample title, parsed once for the class"""
+    
+    @classmethod
+    def setUpClass(cls):
+        """Parse the sample title into a database shared by the read-only tests"""
+        cls.test_dir = Path(tempfile.mkdtemp())
+        cls.db = ECFRDatabase(cls.test_dir / "test_ecfr.db")
+        cls.db.connect()
+        cls.db.connection.execute("PRAGMA synchronous=OFF")
+        cls.db.initialize_schema()
+        
+        scraper = ECFRScraper(cls.db)
+        try:
+            scraper.parse_title_xml(write_sample_xml(cls.test_dir, 1), 1)
+        finally:
+            scraper.close()
+    
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up test environment"""
+        cls.db.disconnect()
+        shutil.rmtree(cls.test_dir)
+    
+    def test_parse_chapter_extraction(self):
+        """Test chapter extraction from XML"""
         # Check chapters were created
         cursor = self.db.connection.cursor()
         cursor.execute("SELECT chapter_number, chapter_name FROM chapters ORDER BY chapter_number")
@@ -199,10 +391,6 @@ class TestXMLParsing(unittest.TestCase):
     
     def test_parse_subchapter_extraction(self):
         """Test subchapter extraction from XML"""
-        xml_file = self.create_sample_xml(1)
-        
-        self.scraper.parse_title_xml(xml_file, 1)
-        
         # Check subchapters were created
         cursor = self.db.connection.cursor()
         cursor.execute("SELECT subchapter_letter, subchapter_name FROM subchapters ORDER BY subchapter_letter")
@@ -216,10 +404,6 @@ class TestXMLParsing(unittest.TestCase):
     
     def test_parse_part_extraction(self):
         """Test part extraction from XML"""
-        xml_file = self.create_sample_xml(1)
-        
-        self.scraper.parse_title_xml(xml_file, 1)
-        
         # Check parts were created
         cursor = self.db.connection.cursor()
         cursor.execute("""
@@ -243,10 +427,6 @@ class TestXMLParsing(unittest.TestCase):
     
     def test_parse_section_extraction(self):
         """Test section extraction from XML"""
-        xml_file = self.create_sample_xml(1)
-        
-        self.scraper.parse_title_xml(xml_file, 1)
-        
         # Check sections were created
         cursor = self.db.connection.cursor()
         cursor.execute("""
@@ -293,10 +473,6 @@ class TestXMLParsing(unittest.TestCase):
     
     def test_parse_content_formatting(self):
         """Test that section content is properly formatted"""
-        xml_file = self.create_sample_xml(1)
-        
-        self.scraper.parse_title_xml(xml_file, 1)
-        
         # Get section 1.2 which has structured content
         cursor = self.db.connection.cursor()
         cursor.execute("SELECT section_content FROM sections WHERE section_number = ?", ("1.2",))
@@ -312,10 +488,6 @@ class TestXMLParsing(unittest.TestCase):
     
     def test_parse_hierarchical_relationships(self):
         """Test that hierarchical relationships are maintained"""
-        xml_file = self.create_sample_xml(1)
-        
-        self.scraper.parse_title_xml(xml_file, 1)
-        
         # Verify relationships using JOINs
         cursor = self.db.connection.cursor()
         
@@ -352,67 +524,22 @@ class TestXMLParsing(unittest.TestCase):
         self.assertIn("OFFICE OF THE FEDERAL REGISTER", row[1])  # chapter
         self.assertIn("SPECIAL PROVISIONS", row[2])  # part
         self.assertEqual("Special requirements.", row[3])  # section
-    
-    def test_parse_malformed_xml(self):
-        """Test handling of malformed XML"""
-        malformed_xml = '''<?xml version="1.0"?>
-        <DLPSTEXTCLASS>
-            <unclosed_tag>
-            <BODY>Content</BODY>
-        </DLPSTEXTCLASS>'''
-        
-        xml_file = self.test_dir / "malformed.xml"
-        xml_file.write_text(malformed_xml)
-        
-        # Should handle gracefully and update metadata as failed
-        with self.assertRaises(Exception):
-            self.scraper.parse_title_xml(xml_file, 99)
-        
-        # Check that metadata shows failure
-        metadata = self.db.get_scraping_metadata(99)
-        self.assertEqual(metadata['scraping_status'], 'failed')
-        self.assertIsNotNone(metadata['error_message'])
-    
-    def test_parse_empty_xml(self):
-        """Test handling of empty/minimal XML"""
-        empty_xml = '''<?xml version="1.0"?>
-        <DLPSTEXTCLASS>
-            <HEADER><TITLE>Empty Title</TITLE></HEADER>
-            <TEXT><BODY></BODY></TEXT>
-        </DLPSTEXTCLASS>'''
-        
-        xml_file = self.test_dir / "empty.xml"
-        xml_file.write_text(empty_xml)
-        
-        records_processed = self.scraper.parse_title_xml(xml_file, 98)
-        
-        # Should process successfully but with 0 records
-        self.assertEqual(records_processed, 0)
-        
-        # Should still create the title
-        stats = self.db.get_database_stats()
-        self.assertEqual(stats['titles'], 1)
-        self.assertEqual(stats['sections'], 0)
 
 
 class TestXMLElementParsing(unittest.TestCase):
     """Test individual XML element parsing functions"""
     
-    def setUp(self):
-        """Set up test environment"""
-        self.test_dir = Path(tempfile.mkdtemp())
-        self.db_path = self.test_dir / "test_ecfr.db"
-        self.db = ECFRDatabase(self.db_path)
-        self.db.connect()
-        self.db.initialize_schema()
-        
-        self.scraper = ECFRScraper(self.db)
+    @classmethod
+    def setUpClass(cls):
+        """Share one scraper; the extractors never touch its database"""
+        cls.test_dir = Path(tempfile.mkdtemp())
+        cls.scraper = ECFRScraper(ECFRDatabase(cls.test_dir / "test_ecfr.db"))
     
-    def tearDown(self):
+    @classmethod
+    def tearDownClass(cls):
         """Clean up test environment"""
-        self.scraper.close()
-        self.db.disconnect()
-        shutil.rmtree(self.test_dir)
+        cls.scraper.close()
+        shutil.rmtree(cls.test_dir)
     
     def test_extract_section_content_complex(self):
         """Test extraction of complex section content"""